@@ -0,0 +1,37 @@
+"""Add Item Search Indexes
+
+Revision ID: 3f1c9a7d2b64
+Revises: 670649d93ce8
+Create Date: 2026-10-18 10:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, None] = '670649d93ce8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Kept in sync by Postgres itself; the text search config must match
+    # SEARCH_CONFIG in app/crud/item.py.
+    op.execute(
+        """
+        ALTER TABLE items ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+    op.create_index('ix_items_search_vector', 'items', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_items_category_price', 'items', ['category', 'price'])
+
+
+def downgrade():
+    op.drop_index('ix_items_category_price', table_name='items')
+    op.drop_index('ix_items_search_vector', table_name='items')
+    op.drop_column('items', 'search_vector')
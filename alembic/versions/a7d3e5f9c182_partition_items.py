@@ -0,0 +1,151 @@
+"""Partition Items
+
+Revision ID: a7d3e5f9c182
+Revises: e2b7c9a4d615
+Create Date: 2026-10-18 21:37:05.218734
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5f9c182'
+down_revision: Union[str, None] = 'e2b7c9a4d615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Opt in with `alembic -x items_partitioning=hash:16 upgrade head`; without
+# it this revision changes nothing and items stays a plain table. Once the
+# upgrade has run, set ITEMS_PARTITIONED=true for the app.
+#
+# items is hash partitioned on id, so lookups, updates and deletes by id
+# prune to a single partition. A unique index on a partitioned table must
+# include the partition key, so name uniqueness moves to the item_names
+# registry, kept in sync by a row trigger.
+
+COLUMNS = "id, name, description, category, quantity, price, version, updated_at"
+
+
+def _partitions() -> Optional[int]:
+    layout = context.get_x_argument(as_dictionary=True).get("items_partitioning")
+    if not layout:
+        return None
+    method, _, count = layout.partition(":")
+    if method != "hash" or not count.isdigit() or int(count) < 2:
+        raise ValueError(f"items_partitioning must be hash:N with N >= 2, got {layout!r}")
+    return int(count)
+
+
+def _is_partitioned() -> bool:
+    return op.get_bind().scalar(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'items'::regclass)")
+    )
+
+
+# Builds the new table under another name, copies the rows over and swaps it
+# in; the id sequence is handed over first so dropping the old table keeps it.
+# partitions=0 builds a plain table again.
+def _swap_items(partitions: int) -> None:
+    op.execute("LOCK TABLE items IN ACCESS EXCLUSIVE MODE")
+    op.execute(
+        "CREATE TABLE items_swap (LIKE items INCLUDING DEFAULTS INCLUDING GENERATED)"
+        + (" PARTITION BY HASH (id)" if partitions else "")
+    )
+    for remainder in range(partitions):
+        op.execute(
+            f"CREATE TABLE items_p{remainder} PARTITION OF items_swap "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+    op.execute(f"INSERT INTO items_swap ({COLUMNS}) SELECT {COLUMNS} FROM items")
+    op.execute("ALTER SEQUENCE items_id_seq OWNED BY items_swap.id")
+    op.execute("DROP TABLE items")
+    op.execute("ALTER TABLE items_swap RENAME TO items")
+    op.execute("ALTER TABLE items ADD CONSTRAINT items_pkey PRIMARY KEY (id)")
+    op.create_index('ix_items_category_price', 'items', ['category', 'price'])
+    op.create_index('ix_items_search_vector', 'items', ['search_vector'], postgresql_using='gin')
+
+
+# The category_stats functions outlive the old table; only the triggers
+# pointing them at it need creating again.
+def _category_stats_triggers() -> None:
+    op.execute(
+        """
+        CREATE TRIGGER category_stats_insert AFTER INSERT ON items
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION category_stats_insert()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER category_stats_update AFTER UPDATE ON items
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION category_stats_update()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER category_stats_delete AFTER DELETE ON items
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION category_stats_delete()
+        """
+    )
+
+
+def upgrade():
+    partitions = _partitions()
+    if partitions is None or op.get_bind().dialect.name != "postgresql" or _is_partitioned():
+        return
+
+    _swap_items(partitions)
+
+    # Not unique: uniqueness is enforced by item_names.
+    op.create_index('ix_items_name', 'items', ['name'])
+    op.create_table(
+        'item_names',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.execute("INSERT INTO item_names (name, item_id) SELECT name, id FROM items WHERE name IS NOT NULL")
+
+    # A second row claiming a name fails on the item_names primary key, so
+    # the writer sees the same unique violation the old index raised.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION item_names_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                IF TG_OP = 'UPDATE' AND NEW.name IS NOT DISTINCT FROM OLD.name THEN
+                    RETURN NULL;
+                END IF;
+                DELETE FROM item_names WHERE name = OLD.name;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.name IS NOT NULL THEN
+                INSERT INTO item_names (name, item_id) VALUES (NEW.name, NEW.id);
+            END IF;
+            RETURN NULL;
+        END $$
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER item_names_sync AFTER INSERT OR UPDATE OF name OR DELETE ON items
+        FOR EACH ROW EXECUTE FUNCTION item_names_sync()
+        """
+    )
+    _category_stats_triggers()
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql" or not _is_partitioned():
+        return
+
+    _swap_items(0)
+
+    op.create_index('ix_items_id', 'items', ['id'])
+    op.create_index('ix_items_name', 'items', ['name'], unique=True)
+    _category_stats_triggers()
+    op.drop_table('item_names')
+    op.execute("DROP FUNCTION IF EXISTS item_names_sync()")
@@ -0,0 +1,28 @@
+"""Add Item Updated At
+
+Revision ID: c5a1e7d3b920
+Revises: 8b2e4d6f1a93
+Create Date: 2026-10-18 14:21:09.513772
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5a1e7d3b920'
+down_revision: Union[str, None] = '8b2e4d6f1a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column(
+        'items',
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_column('items', 'updated_at')
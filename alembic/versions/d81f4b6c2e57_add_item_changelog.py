@@ -0,0 +1,46 @@
+"""Add Item Changelog
+
+Revision ID: d81f4b6c2e57
+Revises: c5a1e7d3b920
+Create Date: 2026-10-18 15:40:33.208164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f4b6c2e57'
+down_revision: Union[str, None] = 'c5a1e7d3b920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'item_changes',
+        sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.Column('op', sa.String(length=16), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+    )
+    op.create_index(op.f('ix_item_changes_item_id'), 'item_changes', ['item_id'], unique=False)
+    op.create_index(op.f('ix_item_changes_changed_at'), 'item_changes', ['changed_at'], unique=False)
+
+    changelog_state = op.create_table(
+        'changelog_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('compacted_seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(changelog_state, [{'id': 1, 'compacted_seq': 0}])
+
+
+def downgrade():
+    op.drop_table('changelog_state')
+    op.drop_index(op.f('ix_item_changes_changed_at'), table_name='item_changes')
+    op.drop_index(op.f('ix_item_changes_item_id'), table_name='item_changes')
+    op.drop_table('item_changes')
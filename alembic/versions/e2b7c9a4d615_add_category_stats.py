@@ -0,0 +1,98 @@
+"""Add Category Stats
+
+Revision ID: e2b7c9a4d615
+Revises: d81f4b6c2e57
+Create Date: 2026-10-18 17:12:54.660391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c9a4d615'
+down_revision: Union[str, None] = 'd81f4b6c2e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _function(operation, sources):
+    changes = " UNION ALL ".join(
+        f"SELECT category, {sign}1 AS n, {sign}quantity AS q, {sign}(quantity * price) AS v, {sign}price AS p "
+        f"FROM {table}"
+        for table, sign in sources
+    )
+    return f"""
+        CREATE OR REPLACE FUNCTION category_stats_{operation}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO category_stats AS s (category, item_count, total_quantity, total_value, price_sum)
+            SELECT category, sum(n), sum(q), sum(v), sum(p) FROM ({changes}) AS changes
+            GROUP BY category ORDER BY category
+            ON CONFLICT (category) DO UPDATE SET
+                item_count = s.item_count + excluded.item_count,
+                total_quantity = s.total_quantity + excluded.total_quantity,
+                total_value = s.total_value + excluded.total_value,
+                price_sum = s.price_sum + excluded.price_sum;
+            UPDATE category_stats AS s SET
+                min_price = (SELECT min(price) FROM items WHERE items.category = s.category),
+                max_price = (SELECT max(price) FROM items WHERE items.category = s.category)
+            WHERE s.category IN (SELECT category FROM ({changes}) AS touched);
+            DELETE FROM category_stats WHERE item_count = 0;
+            RETURN NULL;
+        END $$
+    """
+
+
+def upgrade():
+    op.create_table(
+        'category_stats',
+        sa.Column('category', sa.String(length=255), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('total_quantity', sa.BigInteger(), nullable=False),
+        sa.Column('total_value', sa.Float(), nullable=False),
+        sa.Column('price_sum', sa.Float(), nullable=False),
+        sa.Column('min_price', sa.Float(), nullable=True),
+        sa.Column('max_price', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('category'),
+    )
+    op.execute(
+        """
+        INSERT INTO category_stats
+            (category, item_count, total_quantity, total_value, price_sum, min_price, max_price)
+        SELECT category, count(*), sum(quantity), sum(quantity * price), sum(price), min(price), max(price)
+        FROM items GROUP BY category
+        """
+    )
+
+    op.execute(_function("insert", [("new_rows", "")]))
+    op.execute(_function("update", [("new_rows", ""), ("old_rows", "-")]))
+    op.execute(_function("delete", [("old_rows", "-")]))
+    op.execute(
+        """
+        CREATE TRIGGER category_stats_insert AFTER INSERT ON items
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION category_stats_insert()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER category_stats_update AFTER UPDATE ON items
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION category_stats_update()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER category_stats_delete AFTER DELETE ON items
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION category_stats_delete()
+        """
+    )
+
+
+def downgrade():
+    for operation in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER IF EXISTS category_stats_{operation} ON items")
+        op.execute(f"DROP FUNCTION IF EXISTS category_stats_{operation}()")
+    op.drop_table('category_stats')
@@ -0,0 +1,205 @@
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Callable
+
+from fastapi import Depends, HTTPException, status
+
+from app.core import metrics
+from app.core.auth import get_current_account
+from app.core.cache import LRUCache, redis_client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _take(tokens: float, elapsed: float, rate: float, burst: float, cost: float) -> tuple[float, float]:
+    """Refills a bucket for `elapsed` seconds and takes `cost` tokens from it.
+
+    Returns the new token count and how long to wait before `cost` tokens
+    are available (0 when they were taken).
+    """
+    tokens = min(burst, tokens + max(0.0, elapsed) * rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / rate
+
+
+# Rate stores share one async interface, like the item cache backends: take()
+# returns 0 when the request may proceed, else the seconds until it may.
+
+class MemoryRateStore:
+    """Buckets held in this worker; each worker enforces the limit on its own."""
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self._buckets = LRUCache(max_keys)
+        self._clock = clock
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        now = self._clock()
+        tokens, updated = self._buckets.get(key) or (burst, now)
+        tokens, retry_after = _take(tokens, now - updated, rate, burst, cost)
+        self._buckets.set(key, (tokens, now))
+        return retry_after
+
+
+# Same arithmetic as _take, run atomically in Redis on the server's clock so
+# every worker and host draws from one bucket per account.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+class RedisRateStore:
+    """Shared buckets on any client exposing the redis.asyncio eval API."""
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self._client = client
+        self._prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1) -> float:
+        raw = await self._client.eval(TOKEN_BUCKET_SCRIPT, 1, f"{self._prefix}{key}", rate, burst, cost)
+        return float(raw)
+
+
+def build_rate_store(backend: str = settings.RATE_LIMIT_BACKEND):
+    if backend == "memory":
+        return MemoryRateStore(settings.RATE_LIMIT_MAX_KEYS)
+    if backend == "redis":
+        return RedisRateStore(redis_client(settings.REDIS_URL))
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+class RateLimiter:
+    def __init__(self, store, rate: float, burst: float):
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+
+    async def check(self, key: str) -> None:
+        if self.rate <= 0:
+            return
+        try:
+            retry_after = await self.store.take(key, self.rate, self.burst)
+        except Exception:
+            # A shared store that is down must not take the API with it.
+            logger.warning("rate limit store unavailable, admitting request", exc_info=True)
+            return
+        if retry_after > 0:
+            metrics.ADMISSION_REJECTED.inc(reason="rate_limited")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+
+class InFlightLimiter:
+    """Caps concurrent requests in this worker.
+
+    Requests over the cap queue in arrival order, but only for up to
+    max_wait seconds and only while fewer than max_queue are waiting; the
+    rest are shed with a 503 straight away instead of piling up behind the
+    database pool until they time out.
+    """
+
+    def __init__(self, limit: int, max_queue: int, max_wait: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _shed(self) -> HTTPException:
+        metrics.ADMISSION_REJECTED.inc(reason="overloaded")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is overloaded",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+
+    async def acquire(self) -> None:
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue or self.max_wait <= 0:
+            raise self._shed()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait([waiter], timeout=self.max_wait)
+        except BaseException:
+            # Cancelled while queued: give back a slot that was already
+            # handed over, or leave the queue.
+            if waiter.done():
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+            raise
+        finally:
+            metrics.ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - started)
+
+        if not waiter.done():
+            self._waiters.remove(waiter)
+            raise self._shed()
+
+    def release(self) -> None:
+        # Hand the slot straight to the oldest waiter so it can't be taken
+        # by a request that arrived later.
+        if self._waiters:
+            self._waiters.popleft().set_result(None)
+        else:
+            self.in_flight -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self.limit <= 0:
+            yield
+            return
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+rate_limiter = RateLimiter(build_rate_store(), settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+in_flight = InFlightLimiter(
+    settings.ADMISSION_MAX_IN_FLIGHT, settings.ADMISSION_MAX_QUEUE, settings.ADMISSION_QUEUE_TIMEOUT
+)
+
+
+# Used by the item endpoints in place of get_current_account. The request
+# is admitted before the endpoint runs any query, and holds its slot until
+# the endpoint returns; streamed bodies don't keep it. Endpoints declare it
+# ahead of their session so a rejected request never opens one.
+async def get_admitted_account(current_account: dict = Depends(get_current_account)) -> AsyncIterator[dict]:
+    await rate_limiter.check(current_account["email"])
+    async with in_flight.slot():
+        yield current_account
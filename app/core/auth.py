@@ -1,9 +1,14 @@
-from typing import Optional
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import LRUCache
 from app.core.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -11,12 +16,16 @@ from sqlalchemy import or_
 
 from app.models.account import User
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing; hashes made with a different cost are flagged for rehash
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 # authentification scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Claims of tokens that already passed signature and expiry checks, keyed by
+# a digest of the token so raw credentials are never held in memory.
+token_cache = LRUCache(settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -26,6 +35,48 @@ def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHashPool:
+    # bcrypt releases the GIL, so a small thread pool gives real parallelism
+    # while keeping the event loop free. Work beyond max_pending is refused
+    # with a 503 instead of queueing behind a login storm.
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many pending authentication requests",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)},
+            )
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+
+async def hash_password(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
+
+
+# Returns (valid, new_hash); new_hash is set when the stored hash was made
+# with outdated settings and should replace it.
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    return await password_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -37,7 +88,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_account(token: str = Depends(oauth2_scheme)) -> dict:
+async def get_current_account(token: str = Depends(oauth2_scheme)) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    account = token_cache.get(key)
+    if account is not None:
+        return dict(account)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -48,10 +104,23 @@ def get_current_account(token: str = Depends(oauth2_scheme)) -> dict:
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        return {"email": email}
     except JWTError:
         raise credentials_exception
 
+    account = {"email": email}
+    expires_at = None
+    if payload.get("exp") is not None:
+        # exp is wall-clock time, the cache runs on the monotonic clock.
+        expires_at = time.monotonic() + min(payload["exp"] - time.time(), settings.TOKEN_CACHE_TTL)
+    token_cache.set(key, account, expires_at)
+    return dict(account)
+
+
+async def get_current_admin(current_account: dict = Depends(get_current_account)) -> dict:
+    if current_account["email"] not in settings.ADMIN_ACCOUNTS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_account
+
 
 async def get_account_by_email_or_name(db: AsyncSession, email: str, name: str):
     result = await db.execute(
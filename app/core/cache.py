@@ -0,0 +1,230 @@
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Hashable, Optional
+
+from app.core.config import settings
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class LRUCache:
+    """Size-bounded in-process LRU with per-entry expiry.
+
+    Not thread-safe: it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[Any, Optional[float]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        if expires_at is None and self.ttl is not None:
+            expires_at = self._clock() + self.ttl
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Item cache backends share one async interface so a shared store can replace
+# the in-process one without touching the callers.
+
+class MemoryBackend:
+    def __init__(self, max_size: int, ttl: Optional[float]):
+        self._lru = LRUCache(max_size, ttl)
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._lru.stats
+
+    async def get(self, key: Hashable) -> Optional[dict[str, Any]]:
+        value = self._lru.get(key)
+        return dict(value) if value is not None else None
+
+    async def get_many(self, keys: list[Hashable]) -> dict[Hashable, dict[str, Any]]:
+        found = {}
+        for key in keys:
+            value = self._lru.get(key)
+            if value is not None:
+                found[key] = dict(value)
+        return found
+
+    async def set(self, key: Hashable, value: dict[str, Any]) -> None:
+        self._lru.set(key, dict(value))
+
+    async def set_many(self, values: dict[Hashable, dict[str, Any]]) -> None:
+        for key, value in values.items():
+            self._lru.set(key, dict(value))
+
+    async def delete(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._lru.delete(key)
+
+    async def clear(self) -> None:
+        self._lru.clear()
+
+
+# JSON has no datetime type; tag them so cached values round-trip unchanged.
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Cannot cache {type(value).__name__}")
+
+
+def _decode(value: dict[str, Any]) -> Any:
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    return value
+
+
+def _dumps(value: dict[str, Any]) -> str:
+    return json.dumps(value, default=_encode)
+
+
+def _loads(raw: Any) -> dict[str, Any]:
+    return json.loads(raw, object_hook=_decode)
+
+
+class RedisBackend:
+    """Shared cache on any client exposing the redis.asyncio get/set/delete/scan_iter API."""
+
+    def __init__(self, client, ttl: Optional[float], prefix: str = "items:"):
+        self.stats = CacheStats()
+        self._client = client
+        self._ttl = int(ttl) if ttl else None
+        self._prefix = prefix
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self._prefix}{key}"
+
+    async def get(self, key: Hashable) -> Optional[dict[str, Any]]:
+        raw = await self._client.get(self._key(key))
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return _loads(raw)
+
+    async def get_many(self, keys: list[Hashable]) -> dict[Hashable, dict[str, Any]]:
+        if not keys:
+            return {}
+        found = {}
+        for key, raw in zip(keys, await self._client.mget([self._key(key) for key in keys])):
+            if raw is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+                found[key] = _loads(raw)
+        return found
+
+    async def set(self, key: Hashable, value: dict[str, Any]) -> None:
+        await self._client.set(self._key(key), _dumps(value), ex=self._ttl)
+
+    async def set_many(self, values: dict[Hashable, dict[str, Any]]) -> None:
+        if not values:
+            return
+        pipeline = self._client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipeline.set(self._key(key), _dumps(value), ex=self._ttl)
+        await pipeline.execute()
+
+    async def delete(self, *keys: Hashable) -> None:
+        if keys:
+            await self._client.delete(*(self._key(key) for key in keys))
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._client.scan_iter(match=f"{self._prefix}*")]
+        if keys:
+            await self._client.delete(*keys)
+
+
+class NullBackend:
+    def __init__(self):
+        self.stats = CacheStats()
+
+    async def get(self, key: Hashable) -> None:
+        self.stats.misses += 1
+        return None
+
+    async def get_many(self, keys: list[Hashable]) -> dict[Hashable, dict[str, Any]]:
+        self.stats.misses += len(keys)
+        return {}
+
+    async def set(self, key: Hashable, value: dict[str, Any]) -> None:
+        pass
+
+    async def set_many(self, values: dict[Hashable, dict[str, Any]]) -> None:
+        pass
+
+    async def delete(self, *keys: Hashable) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+
+def redis_client(url: str):
+    try:
+        from redis import asyncio as aioredis
+    except ImportError:
+        raise RuntimeError("The redis package is required for the redis cache backend")
+    return aioredis.from_url(url)
+
+
+def build_item_cache(backend: str = settings.ITEM_CACHE_BACKEND):
+    if backend == "memory":
+        return MemoryBackend(settings.ITEM_CACHE_MAX_SIZE, settings.ITEM_CACHE_TTL)
+    if backend == "redis":
+        return RedisBackend(redis_client(settings.REDIS_URL), settings.ITEM_CACHE_TTL)
+    if backend == "none":
+        return NullBackend()
+    raise ValueError(f"Unknown item cache backend: {backend}")
+
+
+item_cache = build_item_cache()
@@ -0,0 +1,232 @@
+import re
+import zlib
+from typing import Any, Callable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/msgpack",
+    "text/csv",
+    "text/plain",
+)
+
+
+# Each compressor flushes after every chunk, so a streamed body reaches the
+# client as it is produced instead of when the compressor's buffer fills.
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        chunk = self._compressor.compress(data)
+        return chunk + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else chunk
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        chunk = self._compressor.process(data)
+        return chunk + self._compressor.flush() if flush else chunk
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, flush: bool = True) -> bytes:
+        chunk = self._compressor.compress(data)
+        return chunk + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK) if flush else chunk
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_codings() -> dict[str, Callable[[], Any]]:
+    codings = {"gzip": lambda: GzipCompressor(settings.COMPRESSION_GZIP_LEVEL)}
+    if brotli is not None:
+        codings["br"] = lambda: BrotliCompressor(settings.COMPRESSION_BROTLI_LEVEL)
+    if zstandard is not None:
+        codings["zstd"] = lambda: ZstdCompressor(settings.COMPRESSION_ZSTD_LEVEL)
+    return codings
+
+
+def negotiate(accept_encoding: Optional[str], preference: list[str]) -> Optional[str]:
+    """Picks the coding from `preference` the client weighs highest.
+
+    Ties go to the earlier entry in `preference`; q=0 refuses a coding.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in preference:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    # An encoded body is a different representation, so it can't share the
+    # identity body's strong tag: the coding goes inside the quotes.
+    if not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{coding}"'
+
+
+def strip_etag_codings(header: str, codings: list[str]) -> str:
+    """Turns tags this middleware handed out back into the application's."""
+    if not codings:
+        return header
+    return re.sub(r'-(?:%s)"' % "|".join(map(re.escape, codings)), '"', header)
+
+
+def _compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    media_type = headers.get("content-type", "").split(";")[0].strip()
+    return media_type in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    """Compresses response bodies with the best coding the client accepts.
+
+    Single-message bodies under minimum_size are sent as they are, the
+    framing would eat the savings. Streamed bodies are compressed chunk by
+    chunk. Server-sent events are left alone (text/event-stream is not in
+    COMPRESSIBLE_TYPES): a proxy buffering a compressed stream would hold
+    events back.
+
+    An encoded response's ETag gets the coding as a suffix ("3" becomes
+    "3-gzip"). The suffix is stripped from If-None-Match and If-Match before
+    the application sees them, so item versions still match, and a 304 echoes
+    the tag the client revalidated with.
+    """
+
+    def __init__(self, app, minimum_size: int = settings.COMPRESSION_MIN_SIZE, codings: Optional[list[str]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.factories = available_codings()
+        self.preference = [coding for coding in codings or settings.COMPRESSION_CODINGS if coding in self.factories]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        coding = negotiate(request_headers.get("accept-encoding"), self.preference)
+        codings = list(self.factories)
+        if_none_match = request_headers.get("if-none-match", "")
+        # In place: outer middleware read what routing adds to this scope.
+        scope["headers"] = [
+            (name, strip_etag_codings(value.decode("latin-1"), codings).encode("latin-1"))
+            if name in (b"if-none-match", b"if-match") else (name, value)
+            for name, value in scope["headers"]
+        ]
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if message["status"] == 304:
+                    # Carries the Vary of the 200 it stands in for; every
+                    # revalidated representation here is a compressible one.
+                    if "accept-encoding" not in headers.get("vary", "").lower():
+                        headers.add_vary_header("Accept-Encoding")
+                    etag = headers.get("etag")
+                    if etag is not None and coding is not None and encoded_etag(etag, coding) in if_none_match:
+                        headers["ETag"] = encoded_etag(etag, coding)
+                    passthrough = True
+                    await send(message)
+                    return
+                if not _compressible(headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                if coding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                # Held back until the first body chunk shows whether the
+                # response is worth compressing.
+                start = message
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start is not None:
+                start_message, start = start, None
+                if not more_body and (not body or len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = coding
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], coding)
+                compressor = self.factories[coding]()
+                if not more_body:
+                    body = compressor.compress(body, flush=False) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                await send(start_message)
+
+            chunk = compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,71 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional
+
+# Clients are expected to revalidate every time; a 304 makes that cheap.
+CACHE_CONTROL = "private, no-cache"
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive timestamps; the database clock is UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def parse_http_date(header: Optional[str]) -> Optional[datetime]:
+    if not header:
+        return None
+    try:
+        parsed = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return None
+    return _utc(parsed) if parsed is not None else None
+
+
+def list_etag(items: Iterable[dict[str, Any]], representation: Optional[str] = None) -> str:
+    # A page is unchanged as long as the same items at the same versions are
+    # on it, so the tag is derived from those alone. Representations other
+    # than JSON get their own tag, so a cache never reuses one body as the
+    # other.
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        digest.update(f"{item['id']}:{item['version']};".encode())
+    if representation is not None:
+        return f'"{digest.hexdigest()}-{representation}"'
+    return f'"{digest.hexdigest()}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison.
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def not_modified(
+        if_none_match: Optional[str],
+        if_modified_since: Optional[str],
+        etag: str,
+        last_modified: Optional[datetime] = None,
+) -> bool:
+    # If-Modified-Since is only consulted when If-None-Match is absent (RFC 9110).
+    if if_none_match is not None:
+        return _matches(if_none_match, etag)
+
+    since = parse_http_date(if_modified_since)
+    if since is None or last_modified is None:
+        return False
+    return _utc(last_modified).replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
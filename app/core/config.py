@@ -1,14 +1,48 @@
 import os
+import uuid
+from typing import Any
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+def env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+def unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
 class Settings:
+    # server (python -m app.server); WEB_CONCURRENCY=0 runs one worker per
+    # CPU the process may use. Every worker has its own pools, so a host opens
+    # up to workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections per database.
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", 8000))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", 0))
+    # how long a stopping worker waits for in-flight requests before closing them
+    GRACEFUL_SHUTDOWN_SECONDS: int = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", 30))
+    SERVER_KEEPALIVE_SECONDS: int = int(os.getenv("SERVER_KEEPALIVE_SECONDS", 5))
+    SERVER_ACCESS_LOG: bool = env_flag("SERVER_ACCESS_LOG", True)
+
     # auth
     SECRET_KEY: str = os.getenv("SECRET_KEY", "default_secret_key")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30)
+    # password hashing runs on a bounded thread pool off the event loop
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+    PASSWORD_HASH_RETRY_AFTER: int = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))
+    # validated token -> claims cache; entries never outlive the token's exp
+    TOKEN_CACHE_MAX_SIZE: int = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+    TOKEN_CACHE_TTL: float = float(os.getenv("TOKEN_CACHE_TTL", 600))
+    # accounts (token subjects) allowed to use the /admin endpoints
+    ADMIN_ACCOUNTS: list[str] = [
+        account.strip() for account in os.getenv("ADMIN_ACCOUNTS", "").split(",") if account.strip()
+    ]
 
     # database
     DATABASE_URL = "postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}".format(
@@ -17,6 +51,135 @@ class Settings:
         DB_HOST=os.getenv("DB_HOST", "fastapi-postgresql:5432"),
         DB_NAME=os.getenv("DB_NAME", "fastapi"),
     )
+    # comma separated replica URLs; reads fall back to the primary
+    DATABASE_REPLICA_URLS: list[str] = [
+        url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+    ]
+    DB_REPLICA_STRATEGY: str = os.getenv("DB_REPLICA_STRATEGY", "round_robin")
+    DB_REPLICA_RETRY_SECONDS: float = float(os.getenv("DB_REPLICA_RETRY_SECONDS", 30))
+    DB_REPLICA_HEALTH_INTERVAL: float = float(os.getenv("DB_REPLICA_HEALTH_INTERVAL", 10))
+    # engine and pool profile, see engine_options()
+    DB_ECHO: bool = env_flag("DB_ECHO", False)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = env_flag("DB_POOL_PRE_PING", True)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", 100))
+    # compiled statements SQLAlchemy keeps per engine
+    DB_QUERY_CACHE_SIZE: int = int(os.getenv("DB_QUERY_CACHE_SIZE", 500))
+    # behind pgbouncer in transaction mode a connection's prepared statements
+    # may belong to another server session, so none are cached and each gets
+    # a unique name
+    DB_PGBOUNCER: bool = env_flag("DB_PGBOUNCER", False)
+    DB_COMMAND_TIMEOUT: float = float(os.getenv("DB_COMMAND_TIMEOUT", 60))
+    DB_CONNECT_TIMEOUT: float = float(os.getenv("DB_CONNECT_TIMEOUT", 10))
+    # connections each worker opens at startup (capped at the pool size); 0 disables
+    DB_POOL_WARMUP: int = int(os.getenv("DB_POOL_WARMUP", 5))
+    # set once items has been hash partitioned on id (alembic upgrade with
+    # -x items_partitioning=hash:N); names are then kept unique through the
+    # item_names registry
+    ITEMS_PARTITIONED: bool = env_flag("ITEMS_PARTITIONED", False)
+    # statements slower than this are logged with the request that ran them; 0 disables
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", 500))
+
+    # admission control in front of /items: a token bucket per account
+    # (RATE_LIMIT_BACKEND is memory or redis; RATE_LIMIT_PER_SECOND=0 disables)
+    # and a per-worker in-flight cap that sheds requests which would queue
+    # longer than ADMISSION_QUEUE_TIMEOUT (ADMISSION_MAX_IN_FLIGHT=0 disables)
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_PER_SECOND: float = float(os.getenv("RATE_LIMIT_PER_SECOND", 50))
+    RATE_LIMIT_BURST: float = float(os.getenv("RATE_LIMIT_BURST", 100))
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", 10000))
+    ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", DB_POOL_SIZE + DB_MAX_OVERFLOW))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", 100))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 1))
+    ADMISSION_RETRY_AFTER: int = int(os.getenv("ADMISSION_RETRY_AFTER", 1))
+
+    # response compression: codings in order of preference (gzip, br, zstd;
+    # br and zstd need the brotli and zstandard packages) and the smallest
+    # body worth compressing
+    COMPRESSION_CODINGS: list[str] = [
+        coding.strip() for coding in os.getenv("COMPRESSION_CODINGS", "zstd,br,gzip").split(",") if coding.strip()
+    ]
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_LEVEL: int = int(os.getenv("COMPRESSION_BROTLI_LEVEL", 4))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+
+    # caching: ITEM_CACHE_BACKEND is one of memory, redis, none; memory is
+    # per worker, and app.server turns it off when running several
+    ITEM_CACHE_BACKEND: str = os.getenv("ITEM_CACHE_BACKEND", "memory")
+    ITEM_CACHE_MAX_SIZE: int = int(os.getenv("ITEM_CACHE_MAX_SIZE", 10000))
+    ITEM_CACHE_TTL: float = float(os.getenv("ITEM_CACHE_TTL", 60))
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # export
+    EXPORT_CHUNK_SIZE: int = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+
+    # bulk writes
+    BULK_BATCH_SIZE: int = int(os.getenv("BULK_BATCH_SIZE", 1000))
+    LOAD_CHUNK_SIZE: int = int(os.getenv("LOAD_CHUNK_SIZE", 5000))
+    LOAD_REJECT_SAMPLE: int = int(os.getenv("LOAD_REJECT_SAMPLE", 100))
+
+    # Serialize item list pages straight from database rows instead of
+    # revalidating every item against ItemResponse.
+    ITEM_TRUSTED_SERIALIZATION: bool = env_flag("ITEM_TRUSTED_SERIALIZATION", False)
+
+    # largest id list accepted by POST /items/batch_get
+    BATCH_GET_MAX_IDS: int = int(os.getenv("BATCH_GET_MAX_IDS", 500))
+
+    # change feed: page size for GET /items/changes, how long the stream
+    # waits between polls, and how long changelog entries are kept
+    CHANGES_PAGE_SIZE: int = int(os.getenv("CHANGES_PAGE_SIZE", 500))
+    CHANGES_POLL_SECONDS: float = float(os.getenv("CHANGES_POLL_SECONDS", 15))
+    CHANGELOG_RETENTION_SECONDS: int = int(os.getenv("CHANGELOG_RETENTION_SECONDS", 7 * 24 * 3600))
+    CHANGELOG_COMPACT_INTERVAL: float = float(os.getenv("CHANGELOG_COMPACT_INTERVAL", 3600))
+
+    # background jobs (POST /jobs/...): the runner in each process uses at
+    # most JOBS_POOL_SHARE of the primary pool (pool size + overflow), one
+    # connection per running job; 0 keeps this process from running jobs
+    JOBS_POOL_SHARE: float = float(os.getenv("JOBS_POOL_SHARE", 0.2))
+    JOBS_CHUNK_SIZE: int = int(os.getenv("JOBS_CHUNK_SIZE", 1000))
+    JOBS_POLL_SECONDS: float = float(os.getenv("JOBS_POLL_SECONDS", 5))
+    # a running job with no chunk committed for this long is taken over
+    JOBS_STALE_SECONDS: float = float(os.getenv("JOBS_STALE_SECONDS", 120))
+    # a step failing on a deadlock, serialization failure or lost connection
+    # is retried this many times, JOBS_RETRY_SECONDS apart (growing), before
+    # the job fails
+    JOBS_RETRIES: int = int(os.getenv("JOBS_RETRIES", 3))
+    JOBS_RETRY_SECONDS: float = float(os.getenv("JOBS_RETRY_SECONDS", 0.5))
+
+    # stock adjustments: how long to wait on a locked row before shedding
+    STOCK_LOCK_TIMEOUT_MS: int = int(os.getenv("STOCK_LOCK_TIMEOUT_MS", 2000))
+    STOCK_ADJUST_MAX_ITEMS: int = int(os.getenv("STOCK_ADJUST_MAX_ITEMS", 500))
+
+    def engine_options(self) -> dict[str, Any]:
+        return {
+            "echo": self.DB_ECHO,
+            "pool_size": self.DB_POOL_SIZE,
+            "max_overflow": self.DB_MAX_OVERFLOW,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "pool_recycle": self.DB_POOL_RECYCLE,
+            "pool_pre_ping": self.DB_POOL_PRE_PING,
+            "query_cache_size": self.DB_QUERY_CACHE_SIZE,
+            "connect_args": self.connect_args(),
+        }
+
+    # asyncpg driver options
+    def connect_args(self) -> dict[str, Any]:
+        args = {
+            "prepared_statement_cache_size": self.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "command_timeout": self.DB_COMMAND_TIMEOUT,
+            "timeout": self.DB_CONNECT_TIMEOUT,
+        }
+        if self.DB_PGBOUNCER:
+            args.update({
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": unique_statement_name,
+            })
+        return args
 
 
 settings = Settings()
@@ -0,0 +1,29 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+
+def item_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+# Parses an If-Match header into the item versions it accepts. None means no
+# precondition ("*" or no header); a malformed tag can never match.
+def parse_if_match(header: Optional[str]) -> Optional[list[int]]:
+    if header is None or header.strip() == "*":
+        return None
+
+    versions = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            # If-Match requires strong comparison.
+            continue
+        try:
+            versions.append(int(tag.strip('"')))
+        except ValueError:
+            continue
+
+    if not versions:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Item version does not match")
+    return versions
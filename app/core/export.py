@@ -0,0 +1,100 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Sequence
+
+import orjson
+from fastapi.responses import Response
+from sqlalchemy import Row
+
+from app.core.compression import negotiate
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+EXPORT_FIELDS = ("id", "name", "description", "category", "quantity", "price", "version", "updated_at")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "msgpack": "application/msgpack",
+}
+
+
+# Each encoder turns one partition of rows into one chunk of the response
+# body, so memory stays bounded by the partition size.
+async def ndjson_chunks(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        lines = [orjson.dumps(dict(zip(EXPORT_FIELDS, row))) for row in rows]
+        lines.append(b"")
+        yield b"\n".join(lines)
+
+
+async def csv_chunks(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+# ItemResponse.price is an int while the column is a float. Responses that
+# skip ItemResponse send whole-number prices as ints too, so they match the
+# validated representation byte for byte.
+def response_item(item: dict[str, Any]) -> dict[str, Any]:
+    price = item["price"]
+    if isinstance(price, float) and price.is_integer():
+        return {**item, "price": int(price)}
+    return item
+
+
+# Timestamps go out as ISO 8601 strings, the same as in the JSON
+# representation, so both decode to the same values.
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def packb(value: Any) -> bytes:
+    return msgpack.packb(value, default=_msgpack_default)
+
+
+# A sequence of maps, one per item, is itself a valid msgpack stream.
+async def msgpack_chunks(partitions: AsyncIterator[Sequence[Row]]) -> AsyncIterator[bytes]:
+    packer = msgpack.Packer(default=_msgpack_default)
+    async for rows in partitions:
+        yield b"".join(packer.pack(dict(zip(EXPORT_FIELDS, row))) for row in rows)
+
+
+ENCODERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+    "msgpack": msgpack_chunks,
+}
+
+
+def available_formats() -> list[str]:
+    return [format for format in ENCODERS if format != "msgpack" or msgpack is not None]
+
+
+# JSON unless the client ranks msgpack higher and the package is installed.
+def wants_msgpack(accept: Optional[str]) -> bool:
+    if msgpack is None:
+        return False
+    return negotiate(accept, [MEDIA_TYPES["msgpack"], "application/json"]) == MEDIA_TYPES["msgpack"]
+
+
+class MsgpackResponse(Response):
+    media_type = MEDIA_TYPES["msgpack"]
+
+    def render(self, content: Any) -> bytes:
+        return packb(content)
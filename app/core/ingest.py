@@ -0,0 +1,54 @@
+import csv
+import json
+from typing import Any, AsyncIterator
+
+from pydantic import ValidationError
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def iter_ndjson_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    # Undecodable lines are passed through as bytes so callers can reject
+    # them individually instead of aborting the whole stream.
+    async for line in iter_lines(chunks):
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict[str, str]]:
+    header = None
+    pending = ""
+    async for line in iter_lines(chunks):
+        pending += line.decode("utf-8-sig" if header is None and not pending else "utf-8").rstrip("\r")
+        # A quoted field may contain newlines: keep joining lines until the
+        # quotes balance out.
+        if pending.count('"') % 2:
+            pending += "\n"
+            continue
+
+        values = next(csv.reader([pending]))
+        pending = ""
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        yield dict(zip(header, values))
+
+
+def validation_detail(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(map(str, err['loc'])) or 'item'}: {err['msg']}" for err in error.errors()
+        )
+    return "Item must be a JSON object"
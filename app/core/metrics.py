@@ -0,0 +1,233 @@
+import contextvars
+import logging
+import math
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, Any] = {}
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for key, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        counts = state[0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    def samples(self) -> Iterator[tuple[str, dict[str, str], float]]:
+        for key, (counts, total, count) in self._values.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+
+class Registry:
+    """Process-local metrics rendered in the Prometheus text format.
+
+    Collectors are called at scrape time and return metrics built from
+    state that lives elsewhere (cache and pool statistics).
+    """
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "Time spent handling a request.", ("method", "route", "status")
+))
+REQUEST_DB_DURATION = registry.register(Histogram(
+    "http_request_db_duration_seconds", "Time spent executing SQL per request.", ("method", "route")
+))
+REQUEST_DB_STATEMENTS = registry.register(Histogram(
+    "http_request_db_statements", "SQL statements executed per request.", ("method", "route"), COUNT_BUCKETS
+))
+REQUEST_POOL_WAIT = registry.register(Histogram(
+    "http_request_db_pool_wait_seconds", "Time spent waiting for pooled connections per request.", ("method", "route")
+))
+DB_STATEMENTS = registry.register(Counter("db_statements_total", "SQL statements executed."))
+DB_DURATION = registry.register(Counter("db_statement_seconds_total", "Time spent executing SQL."))
+DB_SLOW_STATEMENTS = registry.register(Counter(
+    "db_slow_statements_total", "SQL statements slower than SLOW_QUERY_MS."
+))
+
+ADMISSION_REJECTED = registry.register(Counter(
+    "admission_rejected_total", "Requests refused by admission control.", ("reason",)
+))
+ADMISSION_QUEUE_WAIT = registry.register(Histogram(
+    "admission_queue_wait_seconds", "Time requests spent queued for an in-flight slot."
+))
+
+DB_COMPILED_CACHE = registry.register(Counter(
+    "db_compiled_cache_total",
+    "SQL statements by compiled cache outcome (hit, miss, disabled, no_key).",
+    ("result",),
+))
+
+
+class RequestStats:
+    def __init__(self, scope: dict[str, Any]):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.pool_wait_seconds = 0.0
+
+
+# Set by the middleware for the duration of a request; engine and pool hooks
+# add to it. SQLAlchemy runs those hooks in greenlets that share the caller's
+# context, so they see the request that issued the query.
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request", default=None
+)
+
+
+def record_statement(seconds: float) -> None:
+    DB_STATEMENTS.inc()
+    DB_DURATION.inc(seconds)
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += seconds
+
+
+def record_compiled_cache(result: str) -> None:
+    DB_COMPILED_CACHE.inc(result=result)
+
+
+def record_slow_statement(seconds: float, statement: str) -> None:
+    DB_SLOW_STATEMENTS.inc()
+    stats = current_request.get()
+    origin = f"{stats.scope['method']} {stats.scope['path']}" if stats is not None else "outside a request"
+    # Parameters are left out on purpose: they carry user data and hashes.
+    logger.warning("slow query (%.1f ms, %s): %s", seconds * 1e3, origin, " ".join(statement.split()))
+
+
+def record_pool_wait(seconds: float) -> None:
+    stats = current_request.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            # Label by route template, not raw path, to keep cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, method=method, route=route, status=status_code)
+            REQUEST_DB_DURATION.observe(stats.db_seconds, method=method, route=route)
+            REQUEST_DB_STATEMENTS.observe(stats.statements, method=method, route=route)
+            REQUEST_POOL_WAIT.observe(stats.pool_wait_seconds, method=method, route=route)
@@ -0,0 +1,52 @@
+import base64
+import binascii
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+
+NEXT = "next"
+PREV = "prev"
+
+
+def encode_cursor(sort: str, values: list[Any], direction: str = NEXT) -> str:
+    payload = json.dumps({"s": sort, "v": values, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _is_value(value: Any, value_type: type, nullable: bool) -> bool:
+    if value is None:
+        return nullable
+    # bool is an int subclass, but never a key value
+    return isinstance(value, value_type) and not isinstance(value, bool)
+
+
+# value_type and nullable describe the sort column; the second value is
+# always the integer id tie-breaker.
+def decode_cursor(cursor: str, sort: str, value_type: type = int, nullable: bool = False) -> tuple[list[Any], str]:
+    invalid_cursor = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise invalid_cursor
+
+    if not isinstance(payload, dict) or payload.get("d") not in (NEXT, PREV):
+        raise invalid_cursor
+    if not isinstance(payload.get("v"), list) or len(payload["v"]) != 2:
+        raise invalid_cursor
+    value, item_id = payload["v"]
+    if not _is_value(value, value_type, nullable) or not _is_value(item_id, int, False):
+        raise invalid_cursor
+    if payload.get("s") != sort:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor was issued for a different sort order",
+        )
+
+    return payload["v"], payload["d"]
+
+
+def cursor_for(item: dict[str, Any], sort: str, direction: str) -> str:
+    key = sort.lstrip("-")
+    return encode_cursor(sort, [item[key], item["id"]], direction)
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Optional, Union
+
+import orjson
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.item_change import ChangelogState, ItemChange
+
+logger = logging.getLogger(__name__)
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+# Arbitrary application-wide key for pg_advisory_xact_lock.
+CHANGELOG_LOCK_KEY = 7320118001
+
+CHANGE_COLUMNS = (ItemChange.seq, ItemChange.item_id, ItemChange.op, ItemChange.data, ItemChange.changed_at)
+
+
+class ChangeNotifier:
+    """Wakes change streams in this process when a write commits.
+
+    Other processes are picked up by the streams' periodic poll.
+    """
+
+    def __init__(self):
+        self._event: Optional[asyncio.Event] = None
+
+    def waiter(self) -> asyncio.Event:
+        # Taken before querying, so a commit between the query and the wait
+        # is not missed.
+        if self._event is None:
+            self._event = asyncio.Event()
+        return self._event
+
+    def notify(self) -> None:
+        if self._event is not None:
+            self._event.set()
+            self._event = None
+
+
+notifier = ChangeNotifier()
+
+
+def _dialect_name(db: Union[AsyncSession, AsyncConnection]) -> str:
+    if isinstance(db, AsyncConnection):
+        return db.dialect.name
+    return db.get_bind().dialect.name
+
+
+def upsert_change(item: dict[str, Any]) -> dict[str, Any]:
+    data = {key: value.isoformat() if isinstance(value, datetime) else value for key, value in item.items()}
+    return {"item_id": item["id"], "op": UPSERT, "data": data}
+
+
+def delete_change(item_id: int) -> dict[str, Any]:
+    return {"item_id": item_id, "op": DELETE, "data": None}
+
+
+# Appends to the changelog in the caller's transaction. A Postgres sequence
+# hands out values at insert time, not at commit, so two writers could commit
+# out of seq order and a reader that has moved past the later seq would never
+# see the earlier one. The transaction-scoped advisory lock makes changelog
+# writers take their seqs and commit one at a time.
+#
+# That lock is database-wide, so it must be the last thing a write does:
+# callers record their changes after every other statement and commit
+# straight away. Item writes still run concurrently up to that point, but
+# their commits (the changelog insert plus the commit's WAL flush) happen one
+# at a time, which caps item writes at roughly one commit per flush.
+async def record_changes(db: Union[AsyncSession, AsyncConnection], changes: list[dict[str, Any]]) -> None:
+    if not changes:
+        return
+    if _dialect_name(db) == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(CHANGELOG_LOCK_KEY)))
+    await db.execute(insert(ItemChange), changes)
+
+
+async def _compacted_seq(db: AsyncSession) -> int:
+    return await db.scalar(select(ChangelogState.compacted_seq).where(ChangelogState.id == 1)) or 0
+
+
+def _gone(compacted_seq: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_410_GONE,
+        detail="Changes since this point have expired; resync from GET /items",
+        headers={"X-Compacted-Seq": str(compacted_seq)},
+    )
+
+
+async def list_changes(db: AsyncSession, since: int, limit: int) -> dict[str, Any]:
+    result = await db.execute(
+        select(*CHANGE_COLUMNS).where(ItemChange.seq > since).order_by(ItemChange.seq).limit(limit)
+    )
+    changes = [row._asdict() for row in result]
+
+    # Checked after reading: if retention ran in between, the rows above were
+    # still read before it deleted them.
+    compacted_seq = await _compacted_seq(db)
+    if since < compacted_seq:
+        raise _gone(compacted_seq)
+
+    latest_seq = await db.scalar(select(func.max(ItemChange.seq))) or compacted_seq
+    return {
+        "changes": changes,
+        "next_since": changes[-1]["seq"] if changes else max(since, 0),
+        "latest_seq": latest_seq,
+    }
+
+
+def _event(change: dict[str, Any]) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (change["seq"], change["op"].encode(), orjson.dumps(change))
+
+
+# Server-sent events: drains the changelog from ``since`` and then waits for
+# a local commit, or polls every poll_seconds for commits made elsewhere. A
+# comment line on every idle poll keeps proxies from closing the stream.
+async def stream_changes(
+        session_factory: Callable, since: int, poll_seconds: float, page_size: int
+) -> AsyncIterator[bytes]:
+    while True:
+        waiter = notifier.waiter()
+        try:
+            async with session_factory() as db:
+                page = await list_changes(db, since, page_size)
+        except HTTPException:
+            # Retention overtook this reader; ending the stream makes the
+            # client reconnect and get the 410.
+            return
+
+        if page["changes"]:
+            yield b"".join(_event(change) for change in page["changes"])
+            since = page["next_since"]
+            continue
+
+        try:
+            await asyncio.wait_for(waiter.wait(), poll_seconds)
+        except asyncio.TimeoutError:
+            yield b": keepalive\n\n"
+
+
+# Two passes: entries superseded by a later change to the same item are
+# dropped outright, since replaying the latest one gives the same result.
+# Entries older than the retention period are dropped too, which moves
+# compacted_seq forward; readers behind it get 410 and must resync.
+async def compact_changes(db: AsyncSession, retention: Optional[timedelta]) -> dict[str, int]:
+    later = aliased(ItemChange)
+    superseded = await db.execute(
+        delete(ItemChange)
+        .where(select(later.seq).where(later.item_id == ItemChange.item_id, later.seq > ItemChange.seq).exists())
+        .execution_options(synchronize_session=False)
+    )
+
+    expired = 0
+    if retention is not None:
+        cutoff = datetime.now(timezone.utc) - retention
+        horizon = await db.scalar(select(func.max(ItemChange.seq)).where(ItemChange.changed_at < cutoff))
+        if horizon is not None:
+            result = await db.execute(
+                delete(ItemChange).where(ItemChange.seq <= horizon).execution_options(synchronize_session=False)
+            )
+            expired = result.rowcount
+            result = await db.execute(
+                update(ChangelogState)
+                .where(ChangelogState.id == 1)
+                .values(compacted_seq=horizon)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                await db.execute(insert(ChangelogState).values(id=1, compacted_seq=horizon))
+
+    compacted_seq = await _compacted_seq(db)
+    await db.commit()
+    return {"superseded": superseded.rowcount, "expired": expired, "compacted_seq": compacted_seq}
+
+
+async def run_compaction(session_factory: Callable, interval: float, retention: timedelta) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                report = await compact_changes(db, retention)
+            logger.info("changelog compacted: %s", report)
+        except Exception:
+            logger.exception("changelog compaction failed")
@@ -1,11 +1,35 @@
-from typing import Any
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Sequence
 from fastapi import HTTPException, status
+from sqlalchemy import (
+    Row,
+    case,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    text,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.core import cache, pagination
+from app.core.config import settings
+from app.crud import changes, queries
+from app.crud.queries import ITEM_COLUMNS, SORT_KEYS, SORT_ORDERS
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemUpdate
 
+# Must match the text search config of the search_vector column.
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR = literal_column("items.search_vector", type_=postgresql.TSVECTOR)
+
+UPSERT_COLUMNS = ("description", "category", "quantity", "price")
+
 
 def item_dict(item):
     return {
@@ -14,15 +38,17 @@ def item_dict(item):
         "description": item.description,
         "category": item.category,
         "quantity": item.quantity,
-        "price": item.price
+        "price": item.price,
+        "version": item.version,
+        "updated_at": item.updated_at,
     }
 
 
 async def create_item(db: AsyncSession, item_schema: ItemCreate) -> dict[str, Any]:
-    result = await db.execute(select(Item).filter(Item.name == item_schema.name))
-    existing_item = result.scalars().first()
+    by_name = queries.REGISTERED_ITEM_ID if settings.ITEMS_PARTITIONED else queries.ITEM_ID_BY_NAME
+    existing_item = await db.scalar(by_name, {"name": item_schema.name})
 
-    if existing_item:
+    if existing_item is not None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Item already exists")
 
     new_item = Item(
@@ -34,57 +60,467 @@ async def create_item(db: AsyncSession, item_schema: ItemCreate) -> dict[str, An
     )
 
     db.add(new_item)
-    await db.commit()
+    await db.flush()
     await db.refresh(new_item)
+    data = item_dict(new_item)
+    await changes.record_changes(db, [changes.upsert_change(data)])
+    await db.commit()
+    await cache.item_cache.delete(data["id"])
+    changes.notifier.notify()
+
+    return data
+
+
+def _dialect_insert(db: AsyncSession):
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+# Multi-row INSERT ... ON CONFLICT (name): one statement per batch, and the
+# unique index arbitrates duplicates instead of a racy SELECT beforehand.
+async def _upsert_on_conflict(
+        db: AsyncSession, rows: list[dict[str, Any]], on_conflict: str
+) -> tuple[dict[str, Row], set[str]]:
+    names = [row["name"] for row in rows]
+    postgres = db.get_bind().dialect.name == "postgresql"
+    stmt = _dialect_insert(db)(Item).values(rows)
+
+    if on_conflict == "update":
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Item.name],
+            # ON CONFLICT DO UPDATE skips column onupdate defaults.
+            set_={
+                **{column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+                "version": Item.version + 1,
+                "updated_at": func.now(),
+            },
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Item.name])
+
+    existing = set()
+    if postgres:
+        # xmax is zero only for rows this statement inserted.
+        stmt = stmt.returning(*ITEM_COLUMNS, literal_column("xmax = 0").label("inserted"))
+    else:
+        stmt = stmt.returning(*ITEM_COLUMNS)
+        if on_conflict == "update":
+            result = await db.execute(select(Item.name).where(Item.name.in_(names)))
+            existing = set(result.scalars().all())
+
+    result = await db.execute(stmt)
+    returned = {row.name: row for row in result.all()}
+    if postgres:
+        inserted = {name for name, row in returned.items() if row.inserted}
+    else:
+        inserted = set(returned) - existing
+    return returned, inserted
+
+
+# A hash partitioned items table has no unique index on name to conflict on.
+# Existing names are looked up (and locked) in the registry and updated by
+# id, the rest are inserted; the registry trigger rejects a name inserted
+# concurrently, and the caller retries.
+async def _upsert_partitioned(
+        db: AsyncSession, rows: list[dict[str, Any]], on_conflict: str
+) -> tuple[dict[str, Row], set[str]]:
+    result = await db.execute(queries.REGISTERED_NAMES, {"names": [row["name"] for row in rows]})
+    existing = dict(result.all())
+
+    returned = {}
+    updates = [row for row in rows if row["name"] in existing]
+    if updates and on_conflict == "update":
+        await db.execute(queries.UPDATE_ITEM_FIELDS, [
+            {"item_id": existing[row["name"]], **{f"new_{column}": row[column] for column in UPSERT_COLUMNS}}
+            for row in updates
+        ])
+        result = await db.execute(queries.ITEMS_BY_ID_LIST, {"item_ids": [existing[row["name"]] for row in updates]})
+        returned.update((row.name, row) for row in result)
+
+    inserts = [row for row in rows if row["name"] not in existing]
+    if inserts:
+        result = await db.execute(insert(Item).values(inserts).returning(*ITEM_COLUMNS))
+        returned.update((row.name, row) for row in result)
+
+    return returned, {row["name"] for row in inserts}
+
+
+async def upsert_items(
+        db: AsyncSession, item_schemas: list[ItemCreate], on_conflict: str = "update"
+) -> list[dict[str, Any]]:
+    if not item_schemas:
+        return []
+
+    rows = [item_schema.model_dump() for item_schema in item_schemas]
+    names = [row["name"] for row in rows]
+
+    if settings.ITEMS_PARTITIONED:
+        try:
+            returned, inserted = await _upsert_partitioned(db, rows, on_conflict)
+        except IntegrityError:
+            # Lost a race for a new name; it is registered now, so a second
+            # pass updates or skips it.
+            await db.rollback()
+            returned, inserted = await _upsert_partitioned(db, rows, on_conflict)
+    else:
+        returned, inserted = await _upsert_on_conflict(db, rows, on_conflict)
 
-    return item_dict(new_item)
+    await changes.record_changes(db, [changes.upsert_change(item_dict(row)) for row in returned.values()])
+    await db.commit()
+    await cache.item_cache.delete(*(row.id for row in returned.values()))
+    changes.notifier.notify()
+
+    outcomes = []
+    for name in names:
+        row = returned.get(name)
+        if row is None:
+            outcomes.append({"name": name, "id": None, "status": "skipped"})
+            continue
+        outcomes.append({"name": name, "id": row.id, "status": "inserted" if name in inserted else "updated"})
+
+    return outcomes
 
 
 async def get_item(db: AsyncSession, item_id: int) -> dict[str, Any]:
-    result = await db.execute(select(Item).where(Item.id == item_id))
-    item = result.scalar()
+    cached = await cache.item_cache.get(item_id)
+    if cached is not None:
+        return cached
 
-    if not item:
+    row = (await db.execute(queries.ITEM_BY_ID, {"item_id": item_id})).first()
+
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
 
-    return item_dict(item)
+    data = row._asdict()
+    await cache.item_cache.set(item_id, data)
+    return data
+
+
+# Only what conditional requests compare, so a 304 never loads the full row.
+async def get_item_validators(db: AsyncSession, item_id: int) -> tuple[int, datetime]:
+    cached = await cache.item_cache.get(item_id)
+    if cached is not None:
+        return cached["version"], cached["updated_at"]
+
+    row = (await db.execute(queries.ITEM_VALIDATORS_BY_ID, {"item_id": item_id})).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    return row.version, row.updated_at
+
+
+# Cache hits are served first; the rest come back in one query. Postgres gets
+# a single array parameter, so the statement text (and its prepared plan) is
+# the same whatever the number of ids.
+async def get_items_by_ids(db: AsyncSession, item_ids: list[int]) -> tuple[list[dict[str, Any]], list[int]]:
+    item_ids = list(dict.fromkeys(item_ids))
+    found = await cache.item_cache.get_many(item_ids)
+    pending = [item_id for item_id in item_ids if item_id not in found]
+
+    if pending:
+        if db.get_bind().dialect.name == "postgresql":
+            stmt = queries.ITEMS_BY_ID_ARRAY
+        else:
+            stmt = queries.ITEMS_BY_ID_LIST
+        loaded = {row.id: row._asdict() for row in await db.execute(stmt, {"item_ids": pending})}
+        await cache.item_cache.set_many(loaded)
+        found.update(loaded)
 
+    items = [found[item_id] for item_id in item_ids if item_id in found]
+    missing = [item_id for item_id in item_ids if item_id not in found]
+    return items, missing
 
-async def get_items(db: AsyncSession, limit: int, offset: int) -> list[dict[str, Any]]:
-    result = await db.execute(select(Item).limit(limit).offset(offset))
-    items = result.scalars().all()
+
+def _check_sort(sort: str) -> None:
+    if sort not in SORT_ORDERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported sort key, expected one of: {', '.join(SORT_KEYS)}",
+        )
+
+
+async def get_items(db: AsyncSession, limit: int, offset: int, sort: str = "id") -> list[dict[str, Any]]:
+    _check_sort(sort)
+    # Plain column rows skip ORM identity-map bookkeeping for read-only pages.
+    result = await db.execute(queries.items_page(sort), {"limit": limit, "offset": offset})
+    items = [row._asdict() for row in result]
 
     if not items:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Items not found")
 
-    return [item_dict(item) for item in items]
+    return items
 
 
-async def update_item(db: AsyncSession, item_id: int, item_schema: ItemUpdate) -> dict[str, Any]:
-    result = await db.execute(select(Item).filter(Item.id == item_id))
-    item = result.scalars().first()
+# Keyset pagination: seek past the cursor position instead of scanning and
+# discarding ``offset`` rows, so deep pages cost the same as the first one.
+async def get_items_page(
+        db: AsyncSession, limit: int, cursor: Optional[str] = None, sort: str = "id"
+) -> tuple[list[dict[str, Any]], Optional[str], Optional[str]]:
+    _check_sort(sort)
+    descending = sort.startswith("-")
+    direction = pagination.NEXT
+    seek = None
+    params = {"limit": limit + 1}
 
-    if not item:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    if cursor is not None:
+        column = SORT_KEYS[sort.lstrip("-")]
+        values, direction = pagination.decode_cursor(cursor, sort, column.type.python_type, column.nullable)
+        params.update(cursor_value=values[0], cursor_id=values[1])
+        # Walking backwards over an ascending sort is the same seek as walking
+        # forwards over the descending one, and vice versa.
+        seek = ">" if (direction == pagination.NEXT) != descending else "<"
+
+    backwards = direction == pagination.PREV
+    result = await db.execute(queries.items_seek(sort, seek, descending != backwards), params)
+    items = [row._asdict() for row in result]
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backwards:
+        items.reverse()
+
+    if not items:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Items not found")
+
+    if backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, cursor is not None
+
+    next_cursor = pagination.cursor_for(items[-1], sort, pagination.NEXT) if has_next else None
+    prev_cursor = pagination.cursor_for(items[0], sort, pagination.PREV) if has_prev else None
 
-    for attribute, value in item_schema.dict(exclude_unset=True).items():
-        if value is not None:
-            setattr(item, attribute, value)
+    return items, next_cursor, prev_cursor
 
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+async def search_items(
+        db: AsyncSession,
+        q: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: bool = False,
+        limit: int = 10,
+        offset: int = 0,
+) -> dict[str, Any]:
+    filters = []
+    order_by = [Item.id]
+
+    if q:
+        if db.get_bind().dialect.name == "postgresql":
+            query = func.websearch_to_tsquery(literal(SEARCH_CONFIG, postgresql.REGCONFIG), q)
+            filters.append(SEARCH_VECTOR.op("@@")(query))
+            order_by.insert(0, func.ts_rank(SEARCH_VECTOR, query).desc())
+        else:
+            # Portable fallback: every term must appear in name or description.
+            for term in q.split():
+                pattern = _like_pattern(term)
+                filters.append(or_(
+                    Item.name.ilike(pattern, escape="\\"),
+                    Item.description.ilike(pattern, escape="\\"),
+                ))
+    if min_price is not None:
+        filters.append(Item.price >= min_price)
+    if max_price is not None:
+        filters.append(Item.price <= max_price)
+    if in_stock:
+        filters.append(Item.quantity > 0)
+
+    # Facets ignore the category filter so clients can see the alternatives;
+    # the selected category's facet count doubles as the total.
+    result = await db.execute(
+        select(Item.category, func.count()).where(*filters)
+        .group_by(Item.category).order_by(func.count().desc(), Item.category)
+    )
+    facets = [{"value": value, "count": count} for value, count in result.all()]
+    if category is not None:
+        filters.append(Item.category == category)
+        total = next((facet["count"] for facet in facets if facet["value"] == category), 0)
+    else:
+        total = sum(facet["count"] for facet in facets)
+
+    items = []
+    if total > offset:
+        result = await db.execute(select(Item).where(*filters).order_by(*order_by).limit(limit).offset(offset))
+        items = [item_dict(item) for item in result.scalars().all()]
+
+    return {"total": total, "items": items, "facets": {"category": facets}}
+
+
+async def _missing_or_conflict(db: AsyncSession, item_id: int) -> HTTPException:
+    # Only reached when the guarded statement matched nothing: tell a missing
+    # item apart from a stale version.
+    if await db.scalar(queries.ITEM_ID_BY_ID, {"item_id": item_id}) is None:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    return HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Item version does not match")
+
+
+# Single UPDATE ... RETURNING; expected_versions turns it into an optimistic
+# concurrency check against the version column.
+async def update_item(
+        db: AsyncSession, item_id: int, item_schema: ItemUpdate, expected_versions: Optional[list[int]] = None
+) -> dict[str, Any]:
+    values = {
+        attribute: value
+        for attribute, value in item_schema.model_dump(exclude_unset=True).items()
+        if value is not None
+    }
+    stmt = update(Item).where(Item.id == item_id)
+    if expected_versions is not None:
+        stmt = stmt.where(Item.version.in_(expected_versions))
+    stmt = (
+        stmt.values(**values, version=Item.version + 1)
+        .returning(*ITEM_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+
+    try:
+        row = (await db.execute(stmt)).first()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Item already exists")
+
+    if row is None:
+        error = await _missing_or_conflict(db, item_id)
+        await db.rollback()
+        raise error
+
+    item = item_dict(row)
+    await changes.record_changes(db, [changes.upsert_change(item)])
     await db.commit()
-    await db.refresh(item)
+    await cache.item_cache.delete(item_id)
+    changes.notifier.notify()
 
-    return item_dict(item)
+    return item
 
 
-async def delete_item(db: AsyncSession, item_id: int) -> dict[str, Any]:
-    result = await db.execute(select(Item).where(Item.id == item_id))
-    item = result.scalar()
+async def delete_item(
+        db: AsyncSession, item_id: int, expected_versions: Optional[list[int]] = None
+) -> dict[str, Any]:
+    if expected_versions is None:
+        result = await db.execute(queries.DELETE_ITEM, {"item_id": item_id})
+    else:
+        result = await db.execute(queries.DELETE_ITEM_IF_VERSION, {"item_id": item_id, "versions": expected_versions})
+    row = result.first()
+    if row is None:
+        error = await _missing_or_conflict(db, item_id)
+        await db.rollback()
+        raise error
 
-    if not item:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+    await changes.record_changes(db, [changes.delete_change(item_id)])
+    await db.commit()
+    await cache.item_cache.delete(item_id)
+    changes.notifier.notify()
+
+    return item_dict(row)
 
-    await db.delete(item)
+
+# Postgres SQLSTATEs raised when a row lock can't be taken in time.
+LOCK_CONTENTION_STATES = {"55P03", "40P01"}
+
+
+async def _set_lock_timeout(db: AsyncSession) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"SET LOCAL lock_timeout = {int(settings.STOCK_LOCK_TIMEOUT_MS)}"))
+
+
+def _contention_error(error: DBAPIError) -> Exception:
+    state = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    if state in LOCK_CONTENTION_STATES:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Item is busy, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    return error
+
+
+# One guarded UPDATE, see queries.ADJUST_STOCK.
+async def adjust_stock(db: AsyncSession, item_id: int, delta: int) -> dict[str, Any]:
+    try:
+        await _set_lock_timeout(db)
+        row = (await db.execute(queries.ADJUST_STOCK, {"item_id": item_id, "delta": delta})).first()
+    except DBAPIError as e:
+        await db.rollback()
+        raise _contention_error(e)
+
+    if row is None:
+        exists = await db.scalar(queries.ITEM_ID_BY_ID, {"item_id": item_id}) is not None
+        await db.rollback()
+        if not exists:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Insufficient stock")
+
+    item = item_dict(row)
+    await changes.record_changes(db, [changes.upsert_change(item)])
+    await db.commit()
+    await cache.item_cache.delete(item_id)
+    changes.notifier.notify()
+
+    return item
+
+
+# All-or-nothing adjustment of several items. Rows are locked in id order, so
+# concurrent reservations over overlapping items queue up instead of
+# deadlocking, then one UPDATE applies every delta.
+async def adjust_stock_batch(db: AsyncSession, deltas: dict[int, int]) -> list[dict[str, Any]]:
+    item_ids = sorted(deltas)
+    try:
+        await _set_lock_timeout(db)
+        result = await db.execute(
+            select(Item.id, Item.quantity).where(Item.id.in_(item_ids)).order_by(Item.id).with_for_update()
+        )
+        quantities = dict(result.all())
+
+        failures = []
+        for item_id in item_ids:
+            if item_id not in quantities:
+                failures.append({"item_id": item_id, "reason": "not_found"})
+            elif quantities[item_id] + deltas[item_id] < 0:
+                failures.append({"item_id": item_id, "reason": "insufficient_stock"})
+        if failures:
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=failures)
+
+        delta = case(deltas, value=Item.id)
+        result = await db.execute(
+            update(Item)
+            .where(Item.id.in_(item_ids), Item.quantity + delta >= 0)
+            .values(quantity=Item.quantity + delta, version=Item.version + 1)
+            .returning(*ITEM_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        rows = sorted(result.all(), key=lambda row: row.id)
+    except DBAPIError as e:
+        await db.rollback()
+        raise _contention_error(e)
+
+    # Without row locks (SQLite) stock can still move between the check and
+    # the update; the guard in the UPDATE catches that.
+    if len(rows) != len(item_ids):
+        await db.rollback()
+        changed = {row.id for row in rows}
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=[{"item_id": item_id, "reason": "insufficient_stock"} for item_id in item_ids if item_id not in changed],
+        )
+
+    items = [item_dict(row) for row in rows]
+    await changes.record_changes(db, [changes.upsert_change(item) for item in items])
     await db.commit()
+    await cache.item_cache.delete(*item_ids)
+    changes.notifier.notify()
+
+    return items
 
-    return item_dict(item)
+
+async def stream_item_rows(db: AsyncSession, chunk_size: int) -> AsyncIterator[Sequence[Row]]:
+    result = await db.stream(
+        select(*ITEM_COLUMNS).order_by(Item.id).execution_options(yield_per=chunk_size)
+    )
+    async for partition in result.partitions():
+        yield partition
@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import Numeric, Row, cast, func, insert, or_, select, update
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import cache
+from app.core.config import settings
+from app.crud import changes
+from app.crud.item import item_dict
+from app.crud.queries import ITEM_COLUMNS
+from app.models.item import Item
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+JOB_COLUMNS = tuple(Job.__table__.c)
+
+# Postgres SQLSTATEs of failures that a retry can get past: serialization
+# failure, deadlock, lock timeout.
+TRANSIENT_STATES = {"40001", "40P01", "55P03"}
+
+T = TypeVar("T")
+
+# Wakes idle runner workers in this process when a job is queued; other
+# processes pick it up on their next poll.
+notifier = changes.ChangeNotifier()
+
+
+class JobLost(Exception):
+    """Another worker took the job over after its heartbeat went stale."""
+
+
+# Each kind maps its params to the items it touches and the new values.
+# Prices are whole numbers (ItemResponse.price is an int), so a price change
+# rounds; through numeric, where Postgres and SQLite both round halves away
+# from zero (Postgres rounds a double precision half to even).
+
+def _price_change(params: dict[str, Any]) -> tuple[list, dict[str, Any]]:
+    where = [Item.category == params["category"]] if params.get("category") is not None else []
+    return where, {"price": func.round(cast(Item.price * (1 + params["percent"] / 100), Numeric))}
+
+
+def _recategorize(params: dict[str, Any]) -> tuple[list, dict[str, Any]]:
+    return [Item.category == params["from_category"]], {"category": params["to_category"]}
+
+
+JOB_KINDS = {
+    "price_change": _price_change,
+    "recategorize": _recategorize,
+}
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive UTC timestamps.
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def job_report(job: Row, now: Optional[datetime] = None) -> dict[str, Any]:
+    report = {column.name: getattr(job, column.name) for column in JOB_COLUMNS}
+    report.update(progress=None, rows_per_second=None, eta_seconds=None)
+    if job.status == SUCCEEDED:
+        report["progress"] = 1.0
+    elif job.total:
+        report["progress"] = round(min(1.0, job.processed / job.total), 4)
+
+    started = _utc(job.started_at)
+    if started is None or not job.processed:
+        return report
+    end = _utc(job.finished_at) or now or datetime.now(timezone.utc)
+    elapsed = (end - started).total_seconds()
+    if elapsed > 0:
+        rate = job.processed / elapsed
+        report["rows_per_second"] = round(rate, 1)
+        if job.status == RUNNING and job.total is not None:
+            report["eta_seconds"] = round(max(0, job.total - job.processed) / rate, 1)
+    return report
+
+
+async def create_job(db: AsyncSession, kind: str, params: dict[str, Any], created_by: str) -> dict[str, Any]:
+    result = await db.execute(
+        insert(Job).values(kind=kind, params=params, status=QUEUED, created_by=created_by).returning(*JOB_COLUMNS)
+    )
+    job = result.one()
+    await db.commit()
+    notifier.notify()
+    return job_report(job)
+
+
+async def get_job(db: AsyncSession, job_id: int) -> dict[str, Any]:
+    job = (await db.execute(select(*JOB_COLUMNS).where(Job.id == job_id))).one_or_none()
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job_report(job)
+
+
+# Takes the oldest queued job, or a running one whose worker stopped sending
+# heartbeats. SKIP LOCKED lets concurrent workers pass over a row another is
+# claiming instead of queueing behind it.
+async def claim_job(db: AsyncSession) -> Optional[Row]:
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.JOBS_STALE_SECONDS)
+    job_id = await db.scalar(
+        select(Job.id)
+        .where(or_(Job.status == QUEUED, (Job.status == RUNNING) & (Job.heartbeat_at < stale)))
+        .order_by(Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if job_id is None:
+        await db.rollback()
+        return None
+
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status=RUNNING, started_at=func.coalesce(Job.started_at, func.now()), heartbeat_at=func.now())
+        .returning(*JOB_COLUMNS)
+    )
+    job = result.one()
+    await db.commit()
+    return job
+
+
+# One chunk in one transaction: the item updates, their changelog entries
+# and the job's new cursor commit together, so a job stopped at any point
+# resumes after the last chunk it committed. Returns the new cursor, or None
+# when no matching items are left.
+async def run_chunk(db: AsyncSession, job: Row, cursor: int, chunk_size: int) -> Optional[int]:
+    where, values = JOB_KINDS[job.kind](job.params)
+    result = await db.execute(
+        select(Item.id).where(Item.id > cursor, *where).order_by(Item.id).limit(chunk_size)
+    )
+    ids = result.scalars().all()
+    if not ids:
+        await db.rollback()
+        return None
+
+    # The filter is repeated so items changed since the select are left
+    # alone, and items the job wouldn't change (a price that rounds back to
+    # itself) keep their version and get no changelog entry.
+    changed = or_(*(Item.__table__.c[column] != value for column, value in values.items()))
+    result = await db.execute(
+        update(Item.__table__)
+        .where(Item.id.in_(ids), *where, changed)
+        .values(**values, version=Item.version + 1, updated_at=func.now())
+        .returning(*ITEM_COLUMNS)
+    )
+    rows = result.all()
+
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == RUNNING, Job.cursor == cursor)
+        .values(cursor=ids[-1], processed=Job.processed + len(ids), heartbeat_at=func.now())
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise JobLost(job.id)
+    await changes.record_changes(db, [changes.upsert_change(item_dict(row)) for row in rows])
+    await db.commit()
+
+    await cache.item_cache.delete(*(row.id for row in rows))
+    changes.notifier.notify()
+    return ids[-1]
+
+
+async def _set_status(session_factory: Callable, job: Row, cursor: int, **values) -> None:
+    async with session_factory() as db:
+        await db.execute(
+            update(Job).where(Job.id == job.id, Job.status == RUNNING, Job.cursor == cursor).values(**values)
+        )
+        await db.commit()
+
+
+def _transient(error: DBAPIError) -> bool:
+    if isinstance(error, OperationalError):
+        return True
+    state = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None)
+    return state in TRANSIENT_STATES
+
+
+# Runs one step (each attempt in its own session, so a failed transaction is
+# thrown away), retrying transient database errors before giving up.
+async def _retrying(step: Callable[[], Awaitable[T]], job: Row) -> T:
+    for attempt in range(settings.JOBS_RETRIES + 1):
+        try:
+            return await step()
+        except DBAPIError as e:
+            if attempt == settings.JOBS_RETRIES or not _transient(e):
+                raise
+            logger.warning("job %s hit %s, retrying", job.id, type(e.orig).__name__)
+            await asyncio.sleep(settings.JOBS_RETRY_SECONDS * 2 ** attempt)
+
+
+# The count may scan every matching item, so the heartbeat is refreshed on
+# both sides of it; only a count longer than JOBS_STALE_SECONDS lets another
+# worker take the job over.
+async def _count_total(session_factory: Callable, job: Row) -> None:
+    await _set_status(session_factory, job, job.cursor, heartbeat_at=func.now())
+    where, _ = JOB_KINDS[job.kind](job.params)
+    async with session_factory() as db:
+        remaining = await db.scalar(select(func.count()).select_from(Item).where(Item.id > job.cursor, *where))
+        await db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == RUNNING, Job.cursor == job.cursor)
+            .values(total=job.processed + remaining, heartbeat_at=func.now())
+        )
+        await db.commit()
+
+
+async def _run_chunk(session_factory: Callable, job: Row, cursor: int, chunk_size: int) -> Optional[int]:
+    async with session_factory() as db:
+        return await run_chunk(db, job, cursor, chunk_size)
+
+
+async def process_job(
+        session_factory: Callable,
+        job: Row,
+        chunk_size: int = settings.JOBS_CHUNK_SIZE,
+        stopping: Optional[asyncio.Event] = None,
+) -> None:
+    cursor = job.cursor
+    try:
+        if job.total is None:
+            await _retrying(lambda: _count_total(session_factory, job), job)
+
+        while True:
+            if stopping is not None and stopping.is_set():
+                # Shutting down: hand the job back after its last committed
+                # chunk so any worker resumes it right away instead of after
+                # JOBS_STALE_SECONDS.
+                await _set_status(session_factory, job, cursor, status=QUEUED)
+                return
+            next_cursor = await _retrying(lambda: _run_chunk(session_factory, job, cursor, chunk_size), job)
+            if next_cursor is None:
+                break
+            cursor = next_cursor
+
+        await _set_status(session_factory, job, cursor, status=SUCCEEDED, finished_at=func.now())
+        logger.info("job %s finished", job.id)
+    except JobLost:
+        logger.warning("job %s was taken over by another worker", job.id)
+    except Exception as e:
+        logger.exception("job %s failed", job.id)
+        await _set_status(session_factory, job, cursor, status=FAILED, error=str(e), finished_at=func.now())
+
+
+# At most JOBS_POOL_SHARE of the primary pool (size + overflow), and at
+# least one worker when the share is positive.
+def jobs_concurrency(share: float = settings.JOBS_POOL_SHARE) -> int:
+    if share <= 0:
+        return 0
+    return max(1, math.floor(share * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)))
+
+
+# Each worker runs one job at a time and holds one pooled connection only
+# while a chunk is in flight, so the runner never takes more than
+# `concurrency` connections. Cancelling the runner stops it gracefully:
+# workers finish the statement or chunk in flight, requeue their job and
+# close their sessions before it returns.
+async def run_jobs(
+        session_factory: Callable, concurrency: int, poll_seconds: float, chunk_size: int = settings.JOBS_CHUNK_SIZE
+) -> None:
+    stopping = asyncio.Event()
+
+    async def worker():
+        while not stopping.is_set():
+            waiter = notifier.waiter()
+            try:
+                async with session_factory() as db:
+                    job = await claim_job(db)
+            except Exception:
+                logger.exception("claiming a job failed")
+                job = None
+
+            if job is None:
+                if not stopping.is_set():
+                    try:
+                        await asyncio.wait_for(waiter.wait(), poll_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+            await process_job(session_factory, job, chunk_size, stopping)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        # asyncio.wait, unlike gather, leaves the workers running when this
+        # task is cancelled.
+        await asyncio.wait(workers)
+    finally:
+        stopping.set()
+        notifier.notify()
+        await asyncio.wait(workers)
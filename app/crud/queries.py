@@ -0,0 +1,144 @@
+import functools
+from typing import Optional
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, any_, bindparam, delete, func, select, tuple_, update
+from sqlalchemy.dialects import postgresql
+
+from app.models.item import Item
+
+# The hot item statements are built once, with every value a bound parameter.
+# Reusing one statement object skips construction, lets SQLAlchemy use the
+# memoized cache key to find the compiled form, and always produces the same
+# SQL text, so asyncpg can reuse its prepared statement for it.
+
+# Plain columns rather than the entity, for queries and RETURNING clauses
+# that don't need ORM objects.
+ITEM_COLUMNS = (
+    Item.id, Item.name, Item.description, Item.category, Item.quantity, Item.price, Item.version, Item.updated_at
+)
+
+# Sort keys usable for keyset pagination; each is backed by an index and
+# tie-broken on the primary key so the ordering is total.
+SORT_KEYS = {
+    "id": Item.id,
+    "name": Item.name,
+}
+# Accepted values of the sort parameter: a key, or a key prefixed with a
+# single "-" for descending.
+SORT_ORDERS = frozenset(SORT_KEYS) | {f"-{key}" for key in SORT_KEYS}
+
+# Global name -> id registry that keeps names unique once items is hash
+# partitioned on id (a unique index there can only cover id). Created and
+# kept in sync by migration a7d3e5f9c182; not part of the model metadata.
+item_names = Table(
+    "item_names",
+    MetaData(),
+    Column("name", String, primary_key=True),
+    Column("item_id", Integer, nullable=False),
+)
+
+ITEM_BY_ID = select(*ITEM_COLUMNS).where(Item.id == bindparam("item_id"))
+
+ITEM_VALIDATORS_BY_ID = select(Item.version, Item.updated_at).where(Item.id == bindparam("item_id"))
+
+ITEM_ID_BY_ID = select(Item.id).where(Item.id == bindparam("item_id"))
+
+ITEM_ID_BY_NAME = select(Item.id).where(Item.name == bindparam("name"))
+
+# Name lookups on a partitioned table go through the registry, then by id,
+# so they touch one partition instead of every partition's name index.
+REGISTERED_ITEM_ID = select(item_names.c.item_id).where(item_names.c.name == bindparam("name"))
+
+# Locked in name order so concurrent upserts over the same names queue up
+# instead of deadlocking.
+REGISTERED_NAMES = (
+    select(item_names.c.name, item_names.c.item_id)
+    .where(item_names.c.name.in_(bindparam("names", expanding=True)))
+    .order_by(item_names.c.name)
+    .with_for_update()
+)
+
+# executemany'd by upserts on a partitioned table: one single-partition
+# UPDATE per existing item.
+UPDATE_ITEM_FIELDS = (
+    update(Item.__table__)
+    .where(Item.id == bindparam("item_id"))
+    .values(
+        description=bindparam("new_description"),
+        category=bindparam("new_category"),
+        quantity=bindparam("new_quantity"),
+        price=bindparam("new_price"),
+        version=Item.version + 1,
+        updated_at=func.now(),
+    )
+)
+
+# One array parameter on Postgres, so the text doesn't depend on how many ids
+# are asked for; elsewhere an expanding IN.
+ITEMS_BY_ID_ARRAY = select(*ITEM_COLUMNS).where(
+    Item.id == any_(bindparam("item_ids", type_=postgresql.ARRAY(Integer)))
+)
+ITEMS_BY_ID_LIST = select(*ITEM_COLUMNS).where(Item.id.in_(bindparam("item_ids", expanding=True)))
+
+# quantity = quantity + :delta; the WHERE clause keeps stock from going
+# negative without reading it first.
+ADJUST_STOCK = (
+    update(Item)
+    .where(Item.id == bindparam("item_id"), Item.quantity + bindparam("delta", type_=Integer) >= 0)
+    .values(quantity=Item.quantity + bindparam("delta", type_=Integer), version=Item.version + 1)
+    .returning(*ITEM_COLUMNS)
+    .execution_options(synchronize_session=False)
+)
+
+DELETE_ITEM = (
+    delete(Item)
+    .where(Item.id == bindparam("item_id"))
+    .returning(*ITEM_COLUMNS)
+    .execution_options(synchronize_session=False)
+)
+DELETE_ITEM_IF_VERSION = (
+    delete(Item)
+    .where(Item.id == bindparam("item_id"), Item.version.in_(bindparam("versions", expanding=True)))
+    .returning(*ITEM_COLUMNS)
+    .execution_options(synchronize_session=False)
+)
+
+
+def sort_columns(sort: str) -> tuple:
+    column = SORT_KEYS[sort.lstrip("-")]
+    if column is Item.id:
+        return (Item.id,)
+    return column, Item.id
+
+
+def _order_by(columns, descending: bool):
+    return [column.desc() if descending else column.asc() for column in columns]
+
+
+# Offset pages: limit and offset are parameters, one statement per sort.
+@functools.lru_cache(maxsize=len(SORT_ORDERS))
+def items_page(sort: str):
+    return (
+        select(*ITEM_COLUMNS)
+        .order_by(*_order_by(sort_columns(sort), sort.startswith("-")))
+        .limit(bindparam("limit", type_=Integer))
+        .offset(bindparam("offset", type_=Integer))
+    )
+
+
+# Keyset pages. seek is ">" or "<" to continue past the cursor position
+# (bound as cursor_value/cursor_id), or None for the first page.
+@functools.lru_cache(maxsize=len(SORT_ORDERS) * 3 * 2)
+def items_seek(sort: str, seek: Optional[str], descending: bool):
+    columns = sort_columns(sort)
+    query = select(*ITEM_COLUMNS)
+    if seek is not None:
+        if len(columns) > 1:
+            key = tuple_(*columns)
+            position = tuple_(
+                bindparam("cursor_value", type_=columns[0].type), bindparam("cursor_id", type_=Integer)
+            )
+        else:
+            key, position = columns[0], bindparam("cursor_id", type_=Integer)
+        query = query.where(key > position if seek == ">" else key < position)
+    return query.order_by(*_order_by(columns, descending)).limit(bindparam("limit", type_=Integer))
@@ -0,0 +1,82 @@
+import math
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.category_stats import CategoryStats
+from app.models.item import Item
+
+STATS_COLUMNS = ("item_count", "total_quantity", "total_value", "price_sum", "min_price", "max_price")
+
+
+def _category_dict(row) -> dict[str, Any]:
+    return {
+        "category": row.category,
+        "item_count": row.item_count,
+        "total_quantity": row.total_quantity,
+        "total_value": row.total_value,
+        "min_price": row.min_price,
+        "max_price": row.max_price,
+        "avg_price": row.price_sum / row.item_count if row.item_count else None,
+    }
+
+
+async def get_category_stats(db: AsyncSession) -> dict[str, Any]:
+    result = await db.execute(select(CategoryStats).order_by(CategoryStats.category))
+    categories = [_category_dict(row) for row in result.scalars()]
+    return {
+        "categories": categories,
+        "item_count": sum(category["item_count"] for category in categories),
+        "total_quantity": sum(category["total_quantity"] for category in categories),
+        "total_value": sum(category["total_value"] for category in categories),
+    }
+
+
+def _aggregates():
+    return select(
+        Item.category,
+        func.count().label("item_count"),
+        func.sum(Item.quantity).label("total_quantity"),
+        func.sum(Item.quantity * Item.price).label("total_value"),
+        func.sum(Item.price).label("price_sum"),
+        func.min(Item.price).label("min_price"),
+        func.max(Item.price).label("max_price"),
+    ).group_by(Item.category)
+
+
+def _same(left: dict[str, Any], right: dict[str, Any]) -> bool:
+    for column in STATS_COLUMNS:
+        a, b = left.get(column), right.get(column)
+        if a is None or b is None:
+            if a is not b:
+                return False
+        elif not math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6):
+            return False
+    return True
+
+
+# Recomputes the table from items and reports which categories had drifted.
+# On Postgres, SHARE mode lets reads continue but holds item writes (and with
+# them the triggers) off until the rebuild commits.
+async def rebuild_category_stats(db: AsyncSession) -> dict[str, Any]:
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text("LOCK TABLE items IN SHARE MODE"))
+
+    before = {
+        row.category: row._asdict()
+        for row in await db.execute(select(CategoryStats.category, *(getattr(CategoryStats, c) for c in STATS_COLUMNS)))
+    }
+    # On SQLite the delete takes the write lock, so the aggregates read after
+    # it can't miss a concurrent write.
+    await db.execute(delete(CategoryStats).execution_options(synchronize_session=False))
+    after = {row.category: row._asdict() for row in await db.execute(_aggregates())}
+    if after:
+        await db.execute(insert(CategoryStats), list(after.values()))
+    await db.commit()
+
+    drifted = sorted(
+        category for category in before.keys() | after.keys()
+        if category not in before or category not in after or not _same(before[category], after[category])
+    )
+    return {"categories": len(after), "drifted": drifted}
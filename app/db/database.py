@@ -1,35 +1,303 @@
+import asyncio
 import contextlib
-from typing import Any, AsyncIterator
+import itertools
+import logging
+import time
+from typing import Any, AsyncIterator, Optional
 
+from app.core import metrics
 from app.core.config import settings
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import default, make_url
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Errors that mean a replica can't serve reads right now. A pool timeout
+# (exc.TimeoutError) is not one of them: it means the replica is busy, not
+# down.
+REPLICA_ERRORS = (exc.DBAPIError, OSError)
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Records how long checkouts wait for a connection (including connecting
+    # a new one under overflow), which is where pool exhaustion shows up.
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            metrics.record_pool_wait(waited)
+            self.stats.checkouts += 1
+            self.stats.wait_seconds_total += waited
+            self.stats.wait_seconds_max = max(self.stats.wait_seconds_max, waited)
+
+
+def _pool_status(engine: AsyncEngine) -> dict[str, Any]:
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+        })
+    if isinstance(pool, TimedQueuePool):
+        status.update(pool.stats.as_dict())
+    if engine.sync_engine._compiled_cache is not None:
+        status["compiled_cache_entries"] = len(engine.sync_engine._compiled_cache)
+    return status
+
+
+# What SQLAlchemy reports in context.cache_hit: whether the statement's
+# compiled form came from the engine's compiled cache.
+CACHE_RESULTS = {
+    default.CACHE_HIT: "hit",
+    default.CACHE_MISS: "miss",
+    default.CACHING_DISABLED: "disabled",
+    default.NO_CACHE_KEY: "no_key",
+}
+
+
+# Times every statement for the request metrics and the slow-query log, a
+# cheaper always-on alternative to echo, and counts compiled cache hits.
+def instrument_engine(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._started
+        metrics.record_statement(elapsed)
+        metrics.record_compiled_cache(CACHE_RESULTS.get(context.cache_hit, "no_key"))
+        if settings.SLOW_QUERY_MS > 0 and elapsed * 1e3 >= settings.SLOW_QUERY_MS:
+            metrics.record_slow_statement(elapsed, statement)
+
+
+def _create_engine(host: str, engine_kwargs: dict[str, Any]) -> AsyncEngine:
+    engine_kwargs = dict(engine_kwargs)
+    if make_url(host).get_backend_name() != "sqlite":
+        engine_kwargs.setdefault("poolclass", TimedQueuePool)
+    engine = create_async_engine(host, **engine_kwargs)
+    instrument_engine(engine)
+    return engine
+
+
+class Replica:
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.healthy = True
+        self.retry_at = 0.0
+        self.in_use = 0
+
+    def mark_down(self, retry_seconds: float) -> None:
+        if self.healthy:
+            logger.warning("read replica %s marked down", self.engine.url.render_as_string())
+        self.healthy = False
+        self.retry_at = time.monotonic() + retry_seconds
+
+    def mark_up(self) -> None:
+        if not self.healthy:
+            logger.info("read replica %s is back", self.engine.url.render_as_string())
+        self.healthy = True
+
+    def status(self) -> dict[str, Any]:
+        return {"healthy": self.healthy, "in_use": self.in_use, **_pool_status(self.engine)}
+
+
+class ReadSession(AsyncSession):
+    """A read session that picks its replica on first use, not when opened.
+
+    A request rejected by auth or admission, or served from the item cache,
+    never takes a replica connection. Until then get_bind() answers with the
+    primary, which is enough for dialect checks.
+    """
+
+    def __init__(self, manager: "DatabaseSessionManager", **kw: Any):
+        super().__init__(bind=manager._engine, **kw)
+        self._manager = manager
+        self._routed = False
+        self.replica: Optional[Replica] = None
+
+    async def _route(self) -> None:
+        if not self._routed:
+            self._routed = True
+            self.replica = await self._manager._checkout_replica(self)
+
+    async def connection(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().connection(*args, **kw)
+
+    async def execute(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().execute(*args, **kw)
+
+    async def scalar(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().scalar(*args, **kw)
+
+    async def scalars(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().scalars(*args, **kw)
+
+    async def get(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().get(*args, **kw)
+
+    async def stream(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().stream(*args, **kw)
+
+    async def stream_scalars(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().stream_scalars(*args, **kw)
+
+    async def run_sync(self, *args: Any, **kw: Any):
+        await self._route()
+        return await super().run_sync(*args, **kw)
+
 
 class DatabaseSessionManager:
-    def __init__(self, host: str, engine_kwargs: dict[str, Any] = {}):
-        self._engine = create_async_engine(host, **engine_kwargs)
+    def __init__(
+            self,
+            host: str,
+            engine_kwargs: dict[str, Any] = {},
+            replica_hosts: list[str] = [],
+            replica_strategy: str = "round_robin",
+            replica_retry_seconds: float = 30,
+    ):
+        if replica_strategy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"Unknown replica strategy: {replica_strategy}")
+
+        self._host = host
+        self._engine_kwargs = engine_kwargs
+        self._replica_hosts = replica_hosts
+        self._engine: Optional[AsyncEngine] = None
+        self._sessionmaker: Optional[async_sessionmaker] = None
+        self._replicas: list[Replica] = []
+        self._replica_strategy = replica_strategy
+        self._replica_retry_seconds = replica_retry_seconds
+        self._round_robin = itertools.count()
+
+    # Engines are created on first use instead of at import time, so every
+    # server worker builds its own pool after it has been forked.
+    def init(self) -> None:
+        if self._engine is not None:
+            return
+        self._engine = _create_engine(self._host, self._engine_kwargs)
         self._sessionmaker = async_sessionmaker(autocommit=False, bind=self._engine)
+        self._replicas = [Replica(_create_engine(replica, self._engine_kwargs)) for replica in self._replica_hosts]
+
+    # Opens up to `connections` pooled connections per engine and hands them
+    # back, so the first requests after a start don't pay for connecting.
+    # A database that isn't reachable yet is only logged; the pool still
+    # connects on demand.
+    async def warm_up(self, connections: int) -> None:
+        self.init()
+        for engine in [self._engine, *(replica.engine for replica in self._replicas)]:
+            count = connections
+            if isinstance(engine.pool, QueuePool):
+                count = min(count, engine.pool.size())
+            try:
+                async with contextlib.AsyncExitStack() as stack:
+                    for _ in range(count):
+                        connection = await stack.enter_async_context(engine.connect())
+                        await connection.execute(text("SELECT 1"))
+            except (*REPLICA_ERRORS, asyncio.TimeoutError) as e:
+                logger.warning("pool warm-up for %s failed: %s", engine.url.render_as_string(), e)
+
+    def pool_status(self) -> dict[str, Any]:
+        self.init()
+
+        status = _pool_status(self._engine)
+        if self._replicas:
+            status["replicas"] = [replica.status() for replica in self._replicas]
+        return status
+
+    def _replica_candidates(self) -> list[Replica]:
+        now = time.monotonic()
+        # Replicas that were marked down get another chance once their retry
+        # time has passed; a successful checkout marks them up again.
+        candidates = [replica for replica in self._replicas if replica.healthy or replica.retry_at <= now]
+        if not candidates:
+            return []
+
+        if self._replica_strategy == "least_loaded":
+            return sorted(candidates, key=lambda replica: replica.in_use)
+
+        start = next(self._round_robin) % len(candidates)
+        return candidates[start:] + candidates[:start]
+
+    async def check_replicas(self) -> None:
+        self.init()
+        for replica in self._replicas:
+            try:
+                async with replica.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            except exc.TimeoutError:
+                # Every connection is busy serving reads: the replica is up.
+                continue
+            except REPLICA_ERRORS:
+                replica.mark_down(self._replica_retry_seconds)
+            else:
+                replica.mark_up()
+
+    async def run_replica_health_checks(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_replicas()
 
     async def close(self):
         if self._engine is None:
-            raise Exception("DatabaseSessionManager is not initialized")
+            return
         await self._engine.dispose()
+        for replica in self._replicas:
+            await replica.engine.dispose()
+        self._replicas = []
 
         self._engine = None
         self._sessionmaker = None
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
-        if self._engine is None:
-            raise Exception("DatabaseSessionManager is not initialized")
+        self.init()
 
         async with self._engine.begin() as connection:
             try:
@@ -40,8 +308,7 @@ class DatabaseSessionManager:
 
     @contextlib.asynccontextmanager
     async def session(self) -> AsyncIterator[AsyncSession]:
-        if self._sessionmaker is None:
-            raise Exception("DatabaseSessionManager is not initialized")
+        self.init()
 
         session = self._sessionmaker()
         try:
@@ -52,10 +319,86 @@ class DatabaseSessionManager:
         finally:
             await session.close()
 
+    # Read-only work goes to a replica; the primary serves it when no replica
+    # is configured or none can hand out a connection.
+    @contextlib.asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        self.init()
+
+        if not self._replicas:
+            async with self.session() as session:
+                yield session
+            return
+
+        session = ReadSession(self)
+        try:
+            yield session
+        except REPLICA_ERRORS as e:
+            if session.replica is not None and (
+                    getattr(e, "connection_invalidated", False) or isinstance(e, OSError)
+            ):
+                session.replica.mark_down(self._replica_retry_seconds)
+            await session.rollback()
+            raise
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            if session.replica is not None:
+                session.replica.in_use -= 1
+            await session.close()
+
+    # Binds `session` to the first candidate replica that hands out a
+    # connection, so a dead replica is skipped before any query runs on it,
+    # or to the primary when none does. A replica whose pool is exhausted is
+    # passed over without being marked down.
+    async def _checkout_replica(self, session: AsyncSession) -> Optional[Replica]:
+        for replica in self._replica_candidates():
+            session.sync_session.bind = replica.engine.sync_engine
+            try:
+                await AsyncSession.connection(session)
+            except exc.TimeoutError:
+                await AsyncSession.close(session)
+                continue
+            except REPLICA_ERRORS:
+                await AsyncSession.close(session)
+                replica.mark_down(self._replica_retry_seconds)
+                continue
+            replica.mark_up()
+            replica.in_use += 1
+            return replica
+        session.sync_session.bind = self._engine.sync_engine
+        return None
 
-sessionmanager = DatabaseSessionManager(settings.DATABASE_URL, {"echo": True})
+
+sessionmanager = DatabaseSessionManager(
+    settings.DATABASE_URL,
+    settings.engine_options(),
+    replica_hosts=settings.DATABASE_REPLICA_URLS,
+    replica_strategy=settings.DB_REPLICA_STRATEGY,
+    replica_retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
 
 
 async def get_db_session():
     async with sessionmanager.session() as session:
         yield session
+
+
+async def get_read_db_session():
+    async with sessionmanager.read_session() as session:
+        yield session
+
+
+# For streaming responses: a yielded session is closed before the body is
+# sent, so the endpoint opens its own session from the factory instead.
+def get_db_session_factory():
+    return sessionmanager.session
+
+
+def get_read_db_session_factory():
+    return sessionmanager.read_session
+
+
+def get_db_connection_factory():
+    return sessionmanager.connect
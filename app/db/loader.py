@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, AsyncIterator, Callable, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import BigInteger, Column, Float, Integer, MetaData, String, Table, Text, exists, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core import cache
+from app.core.config import settings
+from app.core.ingest import iter_csv_records, iter_ndjson_records, validation_detail
+from app.crud import changes
+from app.crud.queries import item_names
+from app.crud.item import ITEM_COLUMNS, item_dict
+from app.db.database import sessionmanager
+from app.models.item import Item
+from app.schemas.item import ItemCreate
+
+LOAD_COLUMNS = ("name", "description", "category", "quantity", "price")
+
+staging = Table(
+    "items_load",
+    MetaData(),
+    Column("ord", BigInteger, nullable=False),
+    Column("name", String, nullable=False),
+    Column("description", Text, nullable=False),
+    Column("category", String(255), nullable=False),
+    Column("quantity", Integer, nullable=False),
+    Column("price", Float, nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+RECORD_READERS = {
+    "csv": iter_csv_records,
+    "ndjson": iter_ndjson_records,
+}
+
+
+async def _copy_chunk(connection, rows: list[tuple]) -> None:
+    if connection.dialect.name == "postgresql":
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            staging.name, records=rows, columns=[column.name for column in staging.columns]
+        )
+    else:
+        keys = [column.name for column in staging.columns]
+        await connection.execute(staging.insert(), [dict(zip(keys, row)) for row in rows])
+
+
+# Runs last, right before the load commits: the first record_changes call
+# takes the changelog lock, which is held until then. The merge only returns
+# ids, so the rows are read back in chunks here.
+async def _record(connection, item_ids: list[int]) -> None:
+    for start in range(0, len(item_ids), settings.LOAD_CHUNK_SIZE):
+        chunk = item_ids[start:start + settings.LOAD_CHUNK_SIZE]
+        result = await connection.execute(select(*ITEM_COLUMNS).where(Item.id.in_(chunk)).order_by(Item.id))
+        await changes.record_changes(connection, [changes.upsert_change(item_dict(row)) for row in result])
+
+
+# A hash partitioned items table has no unique index on name, so the merge
+# is an UPDATE of the names already in the registry followed by an INSERT of
+# the rest. The update goes first so freshly inserted rows aren't touched
+# twice.
+async def _merge_partitioned(connection, source, on_conflict: str) -> list[int]:
+    item_ids = []
+    if on_conflict == "update":
+        latest = source.subquery()
+        stmt = (
+            update(Item.__table__)
+            .where(Item.id == item_names.c.item_id, item_names.c.name == latest.c.name)
+            .values(
+                **{column: latest.c[column] for column in LOAD_COLUMNS if column != "name"},
+                version=Item.version + 1,
+                updated_at=func.now(),
+            )
+        )
+        item_ids.extend((await connection.execute(stmt.returning(Item.id))).scalars())
+
+    new = source.where(~exists().where(item_names.c.name == staging.c.name))
+    stmt = Item.__table__.insert().from_select(list(LOAD_COLUMNS), new)
+    item_ids.extend((await connection.execute(stmt.returning(Item.id))).scalars())
+    return item_ids
+
+
+async def _merge(connection, on_conflict: str) -> tuple[int, int, list[int]]:
+    # Later rows win when the same name appears more than once in the input.
+    latest = select(func.max(staging.c.ord)).group_by(staging.c.name)
+    source = select(*(staging.c[column] for column in LOAD_COLUMNS)).where(staging.c.ord.in_(latest))
+
+    distinct = await connection.scalar(select(func.count()).select_from(source.subquery()))
+    names = item_names if settings.ITEMS_PARTITIONED else Item.__table__
+    existing = await connection.scalar(
+        select(func.count()).select_from(staging.join(names, names.c.name == staging.c.name))
+        .where(staging.c.ord.in_(latest))
+    )
+
+    if settings.ITEMS_PARTITIONED:
+        return distinct, existing, await _merge_partitioned(connection, source, on_conflict)
+
+    insert = postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert
+    stmt = insert(Item).from_select(list(LOAD_COLUMNS), source)
+    if on_conflict == "update":
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Item.name],
+            set_={
+                **{column: stmt.excluded[column] for column in LOAD_COLUMNS if column != "name"},
+                "version": Item.version + 1,
+                "updated_at": func.now(),
+            },
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Item.name])
+    item_ids = (await connection.execute(stmt.returning(Item.id))).scalars().all()
+
+    return distinct, existing, item_ids
+
+
+# Validates incoming records in chunks, COPYs the valid ones into a temporary
+# staging table and merges that into items on the unique name in one
+# statement. Everything runs in a single transaction on one connection.
+async def load_items(
+        records: AsyncIterator[Any],
+        connect: Callable = sessionmanager.connect,
+        on_conflict: str = "update",
+        chunk_size: int = settings.LOAD_CHUNK_SIZE,
+        progress: Optional[Callable[[dict[str, Any]], None]] = None,
+) -> dict[str, Any]:
+    started = time.perf_counter()
+    report = {
+        "received": 0,
+        "loaded": 0,
+        "inserted": 0,
+        "updated": 0,
+        "skipped": 0,
+        "duplicates": 0,
+        "rejected": 0,
+        "rejects": [],
+        "seconds": 0.0,
+        "rows_per_second": 0.0,
+    }
+
+    def tick():
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        report["rows_per_second"] = round(report["received"] / report["seconds"], 1) if report["seconds"] else 0.0
+
+    async with connect() as connection:
+        await connection.run_sync(staging.create)
+
+        chunk = []
+
+        async def flush():
+            rows = []
+            for ordinal, record in chunk:
+                try:
+                    if not isinstance(record, dict):
+                        raise TypeError
+                    item = ItemCreate(**record)
+                except (TypeError, ValidationError) as e:
+                    report["rejected"] += 1
+                    if len(report["rejects"]) < settings.LOAD_REJECT_SAMPLE:
+                        report["rejects"].append({"record": ordinal + 1, "detail": validation_detail(e)})
+                    continue
+                rows.append((ordinal, item.name, item.description, item.category, item.quantity, item.price))
+
+            if rows:
+                await _copy_chunk(connection, rows)
+            report["loaded"] += len(rows)
+            chunk.clear()
+            tick()
+            if progress is not None:
+                progress(report)
+
+        async for record in records:
+            chunk.append((report["received"], record))
+            report["received"] += 1
+            if len(chunk) >= chunk_size:
+                await flush()
+        await flush()
+
+        distinct, existing, item_ids = await _merge(connection, on_conflict)
+        await connection.run_sync(staging.drop)
+        await _record(connection, item_ids)
+
+    # The merge may touch any number of rows, so drop the whole item cache.
+    await cache.item_cache.clear()
+    changes.notifier.notify()
+
+    report["duplicates"] = report["loaded"] - distinct
+    report["inserted"] = distinct - existing
+    report["updated" if on_conflict == "update" else "skipped"] = existing
+    tick()
+    return report
+
+
+async def _file_chunks(path: str, block_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as source:
+        while block := source.read(block_size):
+            yield block
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    def progress(report):
+        print(
+            f"received={report['received']} loaded={report['loaded']} rejected={report['rejected']} "
+            f"rows/s={report['rows_per_second']}",
+            file=sys.stderr,
+        )
+
+    try:
+        return await load_items(
+            RECORD_READERS[args.format](_file_chunks(args.path)),
+            on_conflict=args.on_conflict,
+            chunk_size=args.chunk_size,
+            progress=progress,
+        )
+    finally:
+        await sessionmanager.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk load items from a CSV or NDJSON file.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(RECORD_READERS), default=None)
+    parser.add_argument("--on-conflict", choices=["update", "nothing"], default="update")
+    parser.add_argument("--chunk-size", type=int, default=settings.LOAD_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+    if args.format is None:
+        args.format = "csv" if args.path.endswith(".csv") else "ndjson"
+
+    report = asyncio.run(_main(args))
+    for reject in report["rejects"]:
+        print(f"rejected record {reject['record']}: {reject['detail']}", file=sys.stderr)
+    print(
+        f"inserted={report['inserted']} updated={report['updated']} skipped={report['skipped']} "
+        f"duplicates={report['duplicates']} rejected={report['rejected']} "
+        f"in {report['seconds']}s ({report['rows_per_second']} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
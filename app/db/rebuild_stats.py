@@ -0,0 +1,28 @@
+import argparse
+import asyncio
+from typing import Any, Optional
+
+from app.crud.stats import rebuild_category_stats
+from app.db.database import sessionmanager
+
+
+async def _main() -> dict[str, Any]:
+    try:
+        async with sessionmanager.session() as db:
+            return await rebuild_category_stats(db)
+    finally:
+        await sessionmanager.close()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute category_stats from items and report drift.")
+    parser.parse_args(argv)
+
+    report = asyncio.run(_main())
+    for category in report["drifted"]:
+        print(f"repaired drift in category {category!r}")
+    print(f"rebuilt {report['categories']} categories, {len(report['drifted'])} had drifted")
+
+
+if __name__ == "__main__":
+    main()
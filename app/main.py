@@ -1,9 +1,57 @@
+import asyncio
+import contextlib
+from datetime import timedelta
+
 from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi.responses import ORJSONResponse
 
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware
+from app.crud import changes, jobs
+from app.db.database import sessionmanager
 from app.routers.item import router as items_router
 from app.routers.account import router as accounts_router
+from app.routers.admin import router as admin_router
+from app.routers.job import router as jobs_router
+from app.routers.metrics import router as metrics_router
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in every worker after the fork, so each builds its own pool.
+    sessionmanager.init()
+    if settings.DB_POOL_WARMUP > 0:
+        await sessionmanager.warm_up(settings.DB_POOL_WARMUP)
+
+    tasks = []
+    if settings.DATABASE_REPLICA_URLS:
+        tasks.append(asyncio.create_task(
+            sessionmanager.run_replica_health_checks(settings.DB_REPLICA_HEALTH_INTERVAL)
+        ))
+    if settings.CHANGELOG_COMPACT_INTERVAL > 0:
+        tasks.append(asyncio.create_task(changes.run_compaction(
+            sessionmanager.session,
+            settings.CHANGELOG_COMPACT_INTERVAL,
+            timedelta(seconds=settings.CHANGELOG_RETENTION_SECONDS),
+        )))
+    if jobs.jobs_concurrency() > 0:
+        tasks.append(asyncio.create_task(jobs.run_jobs(
+            sessionmanager.session, jobs.jobs_concurrency(), settings.JOBS_POLL_SECONDS
+        )))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await sessionmanager.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(accounts_router)
 app.include_router(items_router)
+app.include_router(admin_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
@@ -0,0 +1,122 @@
+from sqlalchemy import BigInteger, Column, Float, Integer, String, event
+from app.db.database import Base
+
+
+class CategoryStats(Base):
+    """Per-category aggregates over items, maintained by the triggers below."""
+
+    __tablename__ = "category_stats"
+    category = Column(String(255), primary_key=True)
+    item_count = Column(Integer, nullable=False, default=0)
+    total_quantity = Column(BigInteger, nullable=False, default=0)
+    total_value = Column(Float, nullable=False, default=0)
+    # kept so the average price needs no scan
+    price_sum = Column(Float, nullable=False, default=0)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+
+
+# Counts and sums are applied as deltas. Min and max can't be undone by a
+# delta when the extreme row goes away, so they are re-read for the touched
+# categories through ix_items_category_price, which costs an index probe.
+# The upsert takes its row locks in category order, so two writes touching
+# overlapping categories queue behind each other instead of deadlocking; the
+# UPDATE and DELETE after it only touch rows it has already locked.
+#
+# Those locks are held until the writing transaction commits, so all writes
+# to items of one category, stock adjustments included, commit one at a
+# time. For a category hot enough for that to matter, the counts would have
+# to move to delta rows inserted per statement and summed on read.
+
+def _postgres_function(operation: str, sources: list[tuple[str, str]]) -> str:
+    changes = " UNION ALL ".join(
+        f"SELECT category, {sign}1 AS n, {sign}quantity AS q, {sign}(quantity * price) AS v, {sign}price AS p "
+        f"FROM {table}"
+        for table, sign in sources
+    )
+    return f"""
+        CREATE OR REPLACE FUNCTION category_stats_{operation}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO category_stats AS s (category, item_count, total_quantity, total_value, price_sum)
+            SELECT category, sum(n), sum(q), sum(v), sum(p) FROM ({changes}) AS changes
+            GROUP BY category ORDER BY category
+            ON CONFLICT (category) DO UPDATE SET
+                item_count = s.item_count + excluded.item_count,
+                total_quantity = s.total_quantity + excluded.total_quantity,
+                total_value = s.total_value + excluded.total_value,
+                price_sum = s.price_sum + excluded.price_sum;
+            UPDATE category_stats AS s SET
+                min_price = (SELECT min(price) FROM items WHERE items.category = s.category),
+                max_price = (SELECT max(price) FROM items WHERE items.category = s.category)
+            WHERE s.category IN (SELECT category FROM ({changes}) AS touched);
+            DELETE FROM category_stats WHERE item_count = 0;
+            RETURN NULL;
+        END $$
+    """
+
+
+# Statement-level triggers with transition tables: a bulk write updates each
+# category once instead of once per row.
+POSTGRES_TRIGGERS = [
+    _postgres_function("insert", [("new_rows", "")]),
+    _postgres_function("update", [("new_rows", ""), ("old_rows", "-")]),
+    _postgres_function("delete", [("old_rows", "-")]),
+    """
+    CREATE TRIGGER category_stats_insert AFTER INSERT ON items
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_stats_insert()
+    """,
+    """
+    CREATE TRIGGER category_stats_update AFTER UPDATE ON items
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_stats_update()
+    """,
+    """
+    CREATE TRIGGER category_stats_delete AFTER DELETE ON items
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION category_stats_delete()
+    """,
+]
+
+_SQLITE_ADD = """
+    INSERT INTO category_stats (category, item_count, total_quantity, total_value, price_sum, min_price, max_price)
+    VALUES (NEW.category, 1, NEW.quantity, NEW.quantity * NEW.price, NEW.price, NEW.price, NEW.price)
+    ON CONFLICT (category) DO UPDATE SET
+        item_count = item_count + 1,
+        total_quantity = total_quantity + excluded.total_quantity,
+        total_value = total_value + excluded.total_value,
+        price_sum = price_sum + excluded.price_sum,
+        min_price = (SELECT min(price) FROM items WHERE category = excluded.category),
+        max_price = (SELECT max(price) FROM items WHERE category = excluded.category);
+"""
+
+_SQLITE_REMOVE = """
+    UPDATE category_stats SET
+        item_count = item_count - 1,
+        total_quantity = total_quantity - OLD.quantity,
+        total_value = total_value - OLD.quantity * OLD.price,
+        price_sum = price_sum - OLD.price,
+        min_price = (SELECT min(price) FROM items WHERE category = OLD.category),
+        max_price = (SELECT max(price) FROM items WHERE category = OLD.category)
+    WHERE category = OLD.category;
+    DELETE FROM category_stats WHERE category = OLD.category AND item_count <= 0;
+"""
+
+# SQLite has no statement-level triggers, so these run per row.
+SQLITE_TRIGGERS = [
+    f"CREATE TRIGGER category_stats_insert AFTER INSERT ON items BEGIN {_SQLITE_ADD} END",
+    f"CREATE TRIGGER category_stats_update AFTER UPDATE OF category, quantity, price ON items "
+    f"BEGIN {_SQLITE_REMOVE} {_SQLITE_ADD} END",
+    f"CREATE TRIGGER category_stats_delete AFTER DELETE ON items BEGIN {_SQLITE_REMOVE} END",
+]
+
+
+# Migrations install the Postgres triggers; this covers create_all (tests,
+# benchmarks) when it creates the stats table.
+@event.listens_for(Base.metadata, "after_create")
+def _create_triggers(target, connection, tables=(), **kw):
+    if CategoryStats.__table__ not in tables:
+        return
+    statements = {"postgresql": POSTGRES_TRIGGERS, "sqlite": SQLITE_TRIGGERS}.get(connection.dialect.name, [])
+    for statement in statements:
+        connection.exec_driver_sql(statement)
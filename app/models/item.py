@@ -1,12 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, Text
+from sqlalchemy import Column, DateTime, Index, Integer, String, Float, Text, func
 from app.db.database import Base
 
 
 class Item(Base):
     __tablename__ = "items"
+    # The Postgres-only search_vector column and its GIN index are created by
+    # migration 3f1c9a7d2b64 and deliberately left unmapped.
+    __table_args__ = (
+        Index("ix_items_category_price", "category", "price"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     description = Column(Text, nullable=False)
     category = Column(String(255), nullable=False)
     quantity = Column(Integer, nullable=False)
-    price = Column(Float, nullable=False)
\ No newline at end of file
+    price = Column(Float, nullable=False)
+    # bumped on every write; exposed as the item's ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # set by the database on insert and on every update; sent as Last-Modified
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,23 @@
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Integer, String, func
+from app.db.database import Base
+
+# BIGINT has no rowid alias on SQLite, so it would not autoincrement there.
+Seq = BigInteger().with_variant(Integer, "sqlite")
+
+
+class ItemChange(Base):
+    __tablename__ = "item_changes"
+    # ascending in commit order, see app.crud.changes.record_changes
+    seq = Column(Seq, primary_key=True, autoincrement=True)
+    item_id = Column(Integer, nullable=False, index=True)
+    # "upsert" carries the item as it is after the change, "delete" carries nothing
+    op = Column(String(16), nullable=False)
+    data = Column(JSON(none_as_null=True), nullable=True)
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+
+class ChangelogState(Base):
+    __tablename__ = "changelog_state"
+    id = Column(Integer, primary_key=True)
+    # changes up to here may have been dropped by retention
+    compacted_seq = Column(Seq, nullable=False, default=0, server_default="0")
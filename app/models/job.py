@@ -0,0 +1,30 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text, func
+from app.db.database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    # the runner claims the oldest runnable job first
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+    id = Column(Integer, primary_key=True)
+    # "price_change" or "recategorize", see app.crud.jobs.JOB_KINDS
+    kind = Column(String(32), nullable=False)
+    params = Column(JSON, nullable=False)
+    # queued -> running -> succeeded or failed
+    status = Column(String(16), nullable=False, default="queued", server_default="queued")
+    # id of the last item processed; a resumed job continues after it
+    cursor = Column(Integer, nullable=False, default=0, server_default="0")
+    # matching items counted when the job first starts
+    total = Column(Integer, nullable=True)
+    # matching items gone through, including those the job left unchanged
+    processed = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    created_by = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    # moved on every committed chunk; a running job whose heartbeat goes stale
+    # was left by a worker that died, and is claimed again
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
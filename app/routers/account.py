@@ -1,6 +1,7 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Form
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core import auth
@@ -28,11 +29,14 @@ async def register_account(
     except ValueError as e:
         raise HTTPException(detail=str(e))
 
+    # Hash before opening the transaction so it isn't held across the hash.
+    hashed_password = await auth.hash_password(account.password)
+
     async with session.begin():
         new_item = User(
             name=account.name,
             email=account.email,
-            hashed_password=auth.get_password_hash(account.password)
+            hashed_password=hashed_password
         )
         session.add(new_item)
         await session.commit()
@@ -51,14 +55,26 @@ async def authorization(
     account = await auth.get_account_by_email_or_name(
         db, email=form_data.username, name=form_data.username
     )
+    account_id, hashed_password = (account.id, account.hashed_password) if account else (None, None)
+    # Give the connection back before the hash, which can take a few hundred
+    # milliseconds.
+    await db.rollback()
+
+    valid, new_hash = False, None
+    if account_id is not None:
+        valid, new_hash = await auth.verify_and_update_password(form_data.password, hashed_password)
 
-    if not account or not auth.verify_password(form_data.password, account.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if new_hash:
+        async with db.begin():
+            await db.execute(update(User).where(User.id == account_id).values(hashed_password=new_hash))
+
     access_token_expires = timedelta(minutes=Settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = auth.create_access_token(
         data={"sub": form_data.username}, expires_delta=access_token_expires
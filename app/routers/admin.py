@@ -0,0 +1,66 @@
+from datetime import timedelta
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import cache
+from app.core.auth import get_current_admin, token_cache
+from app.core.config import settings
+from app.crud import changes, stats
+from app.db import loader
+from app.db.database import get_db_connection_factory, get_db_session, sessionmanager
+from app.schemas.item import CategoryStatsRebuild, ChangelogCompaction, LoadReport
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    responses={403: {"description": "Admin access required"}},
+)
+
+
+@router.post("/items/load", status_code=status.HTTP_200_OK, response_model=LoadReport)
+async def load_items(
+        request: Request,
+        format: Literal["csv", "ndjson"] = Query("ndjson", description="csv or ndjson"),
+        on_conflict: Literal["update", "nothing"] = Query("update"),
+        connect=Depends(get_db_connection_factory),
+        current_account: dict = Depends(get_current_admin),
+):
+    return await loader.load_items(
+        loader.RECORD_READERS[format](request.stream()),
+        connect=connect,
+        on_conflict=on_conflict,
+    )
+
+
+@router.get("/cache", status_code=status.HTTP_200_OK)
+async def cache_stats(current_account: dict = Depends(get_current_admin)):
+    return {
+        "items": cache.item_cache.stats.as_dict(),
+        "tokens": {**token_cache.stats.as_dict(), "size": len(token_cache)},
+    }
+
+
+@router.get("/db/pool", status_code=status.HTTP_200_OK)
+async def pool_status(current_account: dict = Depends(get_current_admin)):
+    return sessionmanager.pool_status()
+
+
+@router.post("/changes/compact", status_code=status.HTTP_200_OK, response_model=ChangelogCompaction)
+async def compact_changes(
+        retention_seconds: int = Query(
+            settings.CHANGELOG_RETENTION_SECONDS, ge=0, description="drop changes older than this"
+        ),
+        session: AsyncSession = Depends(get_db_session),
+        current_account: dict = Depends(get_current_admin),
+):
+    return await changes.compact_changes(session, timedelta(seconds=retention_seconds))
+
+
+@router.post("/items/stats/rebuild", status_code=status.HTTP_200_OK, response_model=CategoryStatsRebuild)
+async def rebuild_item_stats(
+        session: AsyncSession = Depends(get_db_session),
+        current_account: dict = Depends(get_current_admin),
+):
+    return await stats.rebuild_category_stats(session)
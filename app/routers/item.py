@@ -1,15 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, Form, Query, status
+from typing import Any, AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Form, Header, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.auth import get_current_account
-from app.db.database import get_db_session
-from app.schemas.item import ItemCreate, ItemResponse, ItemUpdate
+from app.core import conditional, etag, export, pagination
+from app.core.admission import get_admitted_account
+from app.core.ingest import iter_ndjson_records, validation_detail
+from app.core.config import settings
+from app.db.database import get_db_session, get_read_db_session, get_read_db_session_factory
+from app.schemas.item import (
+    BulkItemResponse,
+    ItemBatchGet,
+    ItemBatchResponse,
+    ItemChangesPage,
+    ItemCreate,
+    ItemResponse,
+    ItemSearchResponse,
+    ItemStatsResponse,
+    ItemUpdate,
+    StockAdjustment,
+    StockAdjustmentBatch,
+)
+from app.crud import changes, stats
 from app.crud import item as crud
 
 router = APIRouter(
     prefix="/items",
     tags=["items"],
-    responses={404: {"description": "Not found"}},
+    responses={404: {"description": "Not found"}, 429: {"description": "Rate limit exceeded"}},
 )
 
 
@@ -20,8 +40,8 @@ async def create_item(
         category: str = Form(...),
         quantity: int = Form(...),
         price: int = Form(...),
+        current_account: dict = Depends(get_admitted_account),
         session: AsyncSession = Depends(get_db_session),
-        current_account: dict = Depends(get_current_account),
 ):
     try:
         item_schema = ItemCreate(
@@ -42,37 +62,288 @@ async def create_item(
     return new_item
 
 
-@router.get("", status_code=status.HTTP_200_OK, response_model=list[ItemResponse])
-async def get_items(
-        limit: int = Query(10, description="items to retrieve"),
-        offset: int = Query(0, description="items to skip"),
+async def _bulk_records(request: Request) -> AsyncIterator[Any]:
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        async for record in iter_ndjson_records(request.stream()):
+            yield record
+        return
+
+    try:
+        records = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed JSON body")
+    if not isinstance(records, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of items")
+    for record in records:
+        yield record
+
+
+@router.post("/bulk", status_code=status.HTTP_200_OK, response_model=BulkItemResponse)
+async def bulk_upsert_items(
+        request: Request,
+        on_conflict: Literal["update", "nothing"] = Query(
+            "update", description="update existing items with the same name, or leave them untouched"
+        ),
+        current_account: dict = Depends(get_admitted_account),
         session: AsyncSession = Depends(get_db_session),
-        current_account: dict = Depends(get_current_account)
 ):
-    items = await crud.get_items(session, limit, offset)
+    results = []
+    batch, batch_indexes, seen = [], [], set()
+
+    async def flush():
+        outcomes = await crud.upsert_items(session, batch, on_conflict)
+        for index, outcome in zip(batch_indexes, outcomes):
+            results.append({"index": index, **outcome})
+        batch.clear()
+        batch_indexes.clear()
+
+    total = 0
+    async for record in _bulk_records(request):
+        index = total
+        total += 1
+        try:
+            if not isinstance(record, dict):
+                raise TypeError
+            item_schema = ItemCreate(**record)
+        except (TypeError, ValidationError) as e:
+            name = record.get("name") if isinstance(record, dict) else None
+            results.append({"index": index, "name": name, "status": "invalid", "detail": validation_detail(e)})
+            continue
+
+        # Postgres refuses to touch the same row twice in one statement, and a
+        # repeated name within one request is almost always a client bug.
+        if item_schema.name in seen:
+            results.append({
+                "index": index, "name": item_schema.name, "status": "duplicate",
+                "detail": "Name already appears earlier in this request",
+            })
+            continue
+        seen.add(item_schema.name)
+
+        batch.append(item_schema)
+        batch_indexes.append(index)
+        if len(batch) >= settings.BULK_BATCH_SIZE:
+            await flush()
+
+    if batch:
+        await flush()
+
+    results.sort(key=lambda result: result["index"])
+    counts = {key: 0 for key in ("inserted", "updated", "skipped")}
+    for result in results:
+        if result["status"] in counts:
+            counts[result["status"]] += 1
+
+    return {**counts, "rejected": total - sum(counts.values()), "results": results}
+
+
+@router.post("/batch_get", status_code=status.HTTP_200_OK, response_model=ItemBatchResponse)
+async def batch_get_items(
+        batch: ItemBatchGet,
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_read_db_session),
+):
+    items, missing = await crud.get_items_by_ids(session, batch.ids)
+    return {"items": items, "missing": missing}
+
+
+@router.post("/adjust", status_code=status.HTTP_200_OK, response_model=list[ItemResponse])
+async def adjust_stock_batch(
+        batch: StockAdjustmentBatch,
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_db_session),
+):
+    deltas = {}
+    for line in batch.adjustments:
+        deltas[line.item_id] = deltas.get(line.item_id, 0) + line.delta
+    return await crud.adjust_stock_batch(session, deltas)
+
+
+@router.post("/{item_id}/adjust", status_code=status.HTTP_200_OK, response_model=ItemResponse)
+async def adjust_stock(
+        item_id: int,
+        adjustment: StockAdjustment,
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_db_session),
+):
+    return await crud.adjust_stock(session, item_id, adjustment.delta)
+
+
+@router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=list[ItemResponse],
+    responses={200: {"content": {"application/msgpack": {}}}},
+)
+async def get_items(
+        response: Response,
+        limit: int = Query(10, ge=1, description="items to retrieve"),
+        offset: int = Query(0, ge=0, description="items to skip"),
+        cursor: Optional[str] = Query(
+            None, description="opaque cursor taken from the X-Next-Cursor/X-Prev-Cursor headers"
+        ),
+        sort: str = Query("id", description="sort key: id, name; prefix with '-' for descending"),
+        if_none_match: Optional[str] = Header(None),
+        accept: Optional[str] = Header(None),
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_read_db_session)
+):
+    if cursor is not None:
+        if offset:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="cursor and offset cannot be combined",
+            )
+        items, next_cursor, prev_cursor = await crud.get_items_page(session, limit, cursor, sort)
+    else:
+        items = await crud.get_items(session, limit, offset, sort)
+        # Offset pages hand out cursors too, so clients can switch to seeking
+        # after the first request.
+        next_cursor = pagination.cursor_for(items[-1], sort, pagination.NEXT) if len(items) == limit else None
+        prev_cursor = pagination.cursor_for(items[0], sort, pagination.PREV) if offset else None
+
+    # No Last-Modified on pages: an item leaving the page changes it without
+    # moving any timestamp forward.
+    as_msgpack = export.wants_msgpack(accept)
+    headers = conditional.validator_headers(conditional.list_etag(items, "msgpack" if as_msgpack else None))
+    headers["Vary"] = "Accept"
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        headers["X-Prev-Cursor"] = prev_cursor
+
+    if conditional.not_modified(if_none_match, None, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # The rows come from our own columns, so re-checking each one against
+    # ItemResponse buys nothing; returning a response skips that step.
+    if as_msgpack:
+        return export.MsgpackResponse([export.response_item(item) for item in items], headers=headers)
+    if settings.ITEM_TRUSTED_SERIALIZATION:
+        return ORJSONResponse([export.response_item(item) for item in items], headers=headers)
+
+    response.headers.update(headers)
     return items
 
 
-@router.get("/{id}", status_code=status.HTTP_200_OK, response_model=ItemResponse)
+@router.get("/search", status_code=status.HTTP_200_OK, response_model=ItemSearchResponse)
+async def search_items(
+        q: Optional[str] = Query(None, description="free text matched against name and description"),
+        category: Optional[str] = Query(None),
+        min_price: Optional[float] = Query(None, ge=0),
+        max_price: Optional[float] = Query(None, ge=0),
+        in_stock: bool = Query(False, description="only items with quantity > 0"),
+        limit: int = Query(10, ge=1, le=100, description="items to retrieve"),
+        offset: int = Query(0, ge=0, description="items to skip"),
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_read_db_session)
+):
+    return await crud.search_items(
+        session,
+        q=q,
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+        limit=limit,
+        offset=offset,
+    )
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK, response_model=ItemStatsResponse)
+async def item_stats(
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_read_db_session)
+):
+    return await stats.get_category_stats(session)
+
+
+@router.get("/export", status_code=status.HTTP_200_OK, response_class=StreamingResponse)
+async def export_items(
+        format: Literal["ndjson", "csv", "msgpack"] = Query("ndjson", description="ndjson, csv or msgpack"),
+        current_account: dict = Depends(get_admitted_account),
+        session_factory=Depends(get_read_db_session_factory)
+):
+    if format not in export.available_formats():
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"{format} export needs the {format} package installed",
+        )
+
+    async def partitions():
+        async with session_factory() as session:
+            async for rows in crud.stream_item_rows(session, settings.EXPORT_CHUNK_SIZE):
+                yield rows
+
+    return StreamingResponse(
+        export.ENCODERS[format](partitions()),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="items.{format}"'},
+    )
+
+
+@router.get("/changes", status_code=status.HTTP_200_OK, response_model=ItemChangesPage)
+async def list_item_changes(
+        since: int = Query(0, ge=0, description="last seq already applied; 0 for the start of the log"),
+        limit: int = Query(settings.CHANGES_PAGE_SIZE, ge=1, le=settings.CHANGES_PAGE_SIZE),
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_read_db_session)
+):
+    return await changes.list_changes(session, since, limit)
+
+
+@router.get("/changes/stream", status_code=status.HTTP_200_OK, response_class=StreamingResponse)
+async def stream_item_changes(
+        since: int = Query(0, ge=0, description="last seq already applied"),
+        last_event_id: Optional[int] = Header(None, ge=0, description="sent by EventSource when reconnecting"),
+        current_account: dict = Depends(get_admitted_account),
+        session_factory=Depends(get_read_db_session_factory)
+):
+    if last_event_id is not None:
+        since = last_event_id
+    # Fail with a status code while one can still be sent.
+    async with session_factory() as session:
+        await changes.list_changes(session, since, 1)
+
+    return StreamingResponse(
+        changes.stream_changes(session_factory, since, settings.CHANGES_POLL_SECONDS, settings.CHANGES_PAGE_SIZE),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{item_id}", status_code=status.HTTP_200_OK, response_model=ItemResponse)
 async def get_item_by_id(
         item_id: int,
-        session: AsyncSession = Depends(get_db_session),
-        current_account: dict = Depends(get_current_account)
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        if_modified_since: Optional[str] = Header(None),
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_read_db_session)
 ):
+    if if_none_match is not None or if_modified_since is not None:
+        version, updated_at = await crud.get_item_validators(session, item_id)
+        headers = conditional.validator_headers(etag.item_etag(version), updated_at)
+        if conditional.not_modified(if_none_match, if_modified_since, headers["ETag"], updated_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     item = await crud.get_item(session, item_id)
+    response.headers.update(conditional.validator_headers(etag.item_etag(item["version"]), item["updated_at"]))
     return item
 
 
-@router.put("/{id}", status_code=status.HTTP_200_OK, response_model=ItemResponse)
+@router.put("/{item_id}", status_code=status.HTTP_200_OK, response_model=ItemResponse)
 async def update_item_by_id(
         item_id: int,
+        response: Response,
         name: str = Form(None),
         description: str = Form(None),
         category: str = Form(None),
         quantity: int = Form(None),
         price: int = Form(None),
-        session: AsyncSession = Depends(get_db_session),
-        current_account: dict = Depends(get_current_account)
+        if_match: Optional[str] = Header(None),
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_db_session)
 ):
     try:
         item_schema = ItemUpdate(
@@ -86,16 +357,18 @@ async def update_item_by_id(
         raise HTTPException(detail=str(e))
 
     updated_item = await crud.update_item(
-        session, item_id, item_schema
+        session, item_id, item_schema, etag.parse_if_match(if_match)
     )
+    response.headers["ETag"] = etag.item_etag(updated_item["version"])
     return updated_item
 
 
-@router.delete("/{id}", status_code=status.HTTP_200_OK, response_model=ItemResponse)
+@router.delete("/{item_id}", status_code=status.HTTP_200_OK, response_model=ItemResponse)
 async def delete_item_by_id(
         item_id: int,
-        session: AsyncSession = Depends(get_db_session),
-        current_account: dict = Depends(get_current_account)
+        if_match: Optional[str] = Header(None),
+        current_account: dict = Depends(get_admitted_account),
+        session: AsyncSession = Depends(get_db_session)
 ):
-    deleted_item = await crud.delete_item(session, item_id)
+    deleted_item = await crud.delete_item(session, item_id, etag.parse_if_match(if_match))
     return deleted_item
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import get_current_admin
+from app.crud import jobs
+from app.db.database import get_db_session
+from app.schemas.job import JobResponse, PriceChangeJob, RecategorizeJob
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    responses={403: {"description": "Admin access required"}, 404: {"description": "Not found"}},
+)
+
+
+# Jobs are queued and answered with 202 straight away; progress is polled
+# from the Location given.
+async def _queue(session: AsyncSession, response: Response, kind: str, params: dict, account: dict) -> dict:
+    job = await jobs.create_job(session, kind, params, account["email"])
+    response.headers["Location"] = f"/jobs/{job['id']}"
+    return job
+
+
+@router.post("/price-change", status_code=status.HTTP_202_ACCEPTED, response_model=JobResponse)
+async def price_change(
+        body: PriceChangeJob,
+        response: Response,
+        session: AsyncSession = Depends(get_db_session),
+        current_account: dict = Depends(get_current_admin),
+):
+    return await _queue(session, response, "price_change", body.model_dump(), current_account)
+
+
+@router.post("/recategorize", status_code=status.HTTP_202_ACCEPTED, response_model=JobResponse)
+async def recategorize(
+        body: RecategorizeJob,
+        response: Response,
+        session: AsyncSession = Depends(get_db_session),
+        current_account: dict = Depends(get_current_admin),
+):
+    return await _queue(session, response, "recategorize", body.model_dump(), current_account)
+
+
+@router.get("/{job_id}", status_code=status.HTTP_200_OK, response_model=JobResponse)
+async def get_job(
+        job_id: int,
+        session: AsyncSession = Depends(get_db_session),
+        current_account: dict = Depends(get_current_admin),
+):
+    return await jobs.get_job(session, job_id)
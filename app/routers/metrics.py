@@ -0,0 +1,69 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core import admission, cache, metrics
+from app.core.auth import token_cache
+from app.db.database import sessionmanager
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+POOL_GAUGES = ("size", "checked_in", "checked_out", "overflow")
+# pool_status key -> counter name
+POOL_COUNTERS = {
+    "checkouts": "db_pool_checkouts_total",
+    "timeouts": "db_pool_timeouts_total",
+    "wait_seconds_total": "db_pool_wait_seconds_total",
+}
+
+
+def _cache_metrics():
+    counters = {
+        name: metrics.Counter(f"cache_{name}_total", f"Cache {name}.", ("cache",))
+        for name in ("hits", "misses", "evictions", "expirations")
+    }
+    size = metrics.Gauge("cache_entries", "Entries held by in-process caches.", ("cache",))
+    for label, stats in (("items", cache.item_cache.stats), ("tokens", token_cache.stats)):
+        for name, value in stats.as_dict().items():
+            counters[name].inc(value, cache=label)
+    size.set(len(token_cache), cache="tokens")
+    return [*counters.values(), size]
+
+
+def _pool_metrics():
+    status = sessionmanager.pool_status()
+    pools = [("primary", status)]
+    pools += [(f"replica{index}", replica) for index, replica in enumerate(status.get("replicas", []))]
+
+    gauges = {name: metrics.Gauge(f"db_pool_{name}", f"Connection pool {name}.", ("database",)) for name in POOL_GAUGES}
+    counters = {key: metrics.Counter(name, f"Connection pool {key}.", ("database",)) for key, name in POOL_COUNTERS.items()}
+    compiled = metrics.Gauge("db_compiled_cache_entries", "Statements in the compiled cache.", ("database",))
+    for database, pool in pools:
+        if "compiled_cache_entries" in pool:
+            compiled.set(pool["compiled_cache_entries"], database=database)
+        for key, gauge in gauges.items():
+            if key in pool:
+                gauge.set(pool[key], database=database)
+        for key, counter in counters.items():
+            if key in pool:
+                counter.inc(pool[key], database=database)
+    return [*gauges.values(), *counters.values(), compiled]
+
+
+def _admission_metrics():
+    in_flight = metrics.Gauge("admission_in_flight", "Requests holding an in-flight slot.")
+    queued = metrics.Gauge("admission_queued", "Requests waiting for an in-flight slot.")
+    in_flight.set(admission.in_flight.in_flight)
+    queued.set(admission.in_flight.queued)
+    return [in_flight, queued]
+
+
+metrics.registry.register_collector(_cache_metrics)
+metrics.registry.register_collector(_pool_metrics)
+metrics.registry.register_collector(_admission_metrics)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=CONTENT_TYPE)
@@ -9,9 +9,9 @@ class LoginResponse(BaseModel):
 class AccountResponse(BaseModel):
     name: str
     email: str
-    password: str
 
 
 class AccountRegister(BaseModel):
     name: str
     email: str
+    password: str
@@ -1,5 +1,9 @@
+from datetime import datetime
+from typing import Any, Literal, Optional
+
 from pydantic import BaseModel, Field
-from typing import Optional
+
+from app.core.config import settings
 
 
 class ItemCreate(BaseModel):
@@ -25,3 +29,116 @@ class ItemResponse(BaseModel):
     category: str
     quantity: int
     price: int
+    version: int
+    updated_at: datetime
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    name: Optional[str] = None
+    status: Literal["inserted", "updated", "skipped", "duplicate", "invalid"]
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class BulkItemResponse(BaseModel):
+    inserted: int
+    updated: int
+    skipped: int
+    rejected: int
+    results: list[BulkItemResult]
+
+
+class LoadReject(BaseModel):
+    record: int
+    detail: str
+
+
+class LoadReport(BaseModel):
+    received: int
+    loaded: int
+    inserted: int
+    updated: int
+    skipped: int
+    duplicates: int
+    rejected: int
+    rejects: list[LoadReject]
+    seconds: float
+    rows_per_second: float
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class ItemSearchResponse(BaseModel):
+    total: int
+    items: list[ItemResponse]
+    facets: dict[str, list[FacetCount]]
+
+
+class ItemBatchGet(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=settings.BATCH_GET_MAX_IDS)
+
+
+class ItemBatchResponse(BaseModel):
+    items: list[ItemResponse]
+    missing: list[int]
+
+
+class StockAdjustment(BaseModel):
+    delta: int
+
+
+class StockAdjustmentLine(BaseModel):
+    item_id: int
+    delta: int
+
+
+class StockAdjustmentBatch(BaseModel):
+    adjustments: list[StockAdjustmentLine] = Field(
+        ..., min_length=1, max_length=settings.STOCK_ADJUST_MAX_ITEMS
+    )
+
+
+class ItemChangeResponse(BaseModel):
+    seq: int
+    item_id: int
+    op: Literal["upsert", "delete"]
+    data: Optional[dict[str, Any]] = None
+    changed_at: datetime
+
+
+class ItemChangesPage(BaseModel):
+    changes: list[ItemChangeResponse]
+    next_since: int
+    latest_seq: int
+
+
+class ChangelogCompaction(BaseModel):
+    superseded: int
+    expired: int
+    compacted_seq: int
+
+
+class CategoryStatsResponse(BaseModel):
+    category: str
+    item_count: int
+    total_quantity: int
+    total_value: float
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    avg_price: Optional[float] = None
+
+
+class ItemStatsResponse(BaseModel):
+    categories: list[CategoryStatsResponse]
+    item_count: int
+    total_quantity: int
+    total_value: float
+
+
+class CategoryStatsRebuild(BaseModel):
+    categories: int
+    drifted: list[str]
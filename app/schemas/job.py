@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PriceChangeJob(BaseModel):
+    # +10 raises prices by 10%, -25 cuts them by a quarter
+    percent: float = Field(..., gt=-100, le=1000)
+    # only items in this category; every item when omitted
+    category: Optional[str] = None
+
+
+class RecategorizeJob(BaseModel):
+    from_category: str = Field(..., min_length=1)
+    to_category: str = Field(..., min_length=1)
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: Literal["price_change", "recategorize"]
+    params: dict[str, Any]
+    status: Literal["queued", "running", "succeeded", "failed"]
+    processed: int
+    total: Optional[int] = None
+    progress: Optional[float] = None
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
+    created_by: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
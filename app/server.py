@@ -0,0 +1,98 @@
+import importlib.util
+import logging
+import math
+import os
+from typing import Optional
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# cgroup v2, then v1: "<quota> <period>" in one file, or one value per file.
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_CPU_QUOTA = ("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+# The container's CPU limit (docker --cpus, a Kubernetes limit), rounded up,
+# or None when there is none.
+def cpu_quota(cpu_max: str = CGROUP_CPU_MAX, v1_quota: tuple[str, str] = CGROUP_V1_CPU_QUOTA) -> Optional[int]:
+    values = _read(cpu_max)
+    if values is not None:
+        quota, _, period = values.partition(" ")
+    else:
+        quota, period = _read(v1_quota[0]), _read(v1_quota[1])
+    try:
+        quota, period = int(quota), int(period)
+    except (TypeError, ValueError):
+        # "max", or -1 on v1: no limit
+        return None
+    if quota <= 0 or period <= 0:
+        return None
+    return max(1, math.ceil(quota / period))
+
+
+# Sized to the CPUs this process may actually run on: a container's cpuset
+# and its CPU quota, neither of which os.cpu_count() takes into account.
+def worker_count(concurrency: int = settings.WEB_CONCURRENCY) -> int:
+    if concurrency > 0:
+        return concurrency
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = cpu_quota()
+    return min(cpus, quota) if quota is not None else cpus
+
+
+# The memory item cache lives in each worker, so a write handled by one
+# worker would leave the others serving, and validating ETags against, the
+# old item until ITEM_CACHE_TTL runs out. With several workers the cache is
+# turned off unless it is shared (redis).
+def item_cache_backend(workers: int, backend: str = settings.ITEM_CACHE_BACKEND) -> str:
+    if workers > 1 and backend == "memory":
+        logger.warning(
+            "ITEM_CACHE_BACKEND=memory is not shared between %d workers; item cache disabled, use redis", workers
+        )
+        return "none"
+    return backend
+
+
+# uvloop and httptools are compiled extensions; fall back to the pure Python
+# implementations where they aren't available.
+def server_options() -> dict:
+    return {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": worker_count(),
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_SECONDS,
+        "timeout_graceful_shutdown": settings.GRACEFUL_SHUTDOWN_SECONDS,
+        "access_log": settings.SERVER_ACCESS_LOG,
+        "proxy_headers": True,
+    }
+
+
+# Each worker imports the app by path after the fork and runs its lifespan,
+# so engines and pools are never shared between processes. On SIGTERM
+# uvicorn stops accepting, drains in-flight requests for up to
+# GRACEFUL_SHUTDOWN_SECONDS and then runs the lifespan shutdown.
+def main() -> None:
+    options = server_options()
+    # Workers are spawned, so they read their settings from this environment.
+    os.environ["ITEM_CACHE_BACKEND"] = item_cache_backend(options["workers"], settings.ITEM_CACHE_BACKEND)
+    uvicorn.run("app.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
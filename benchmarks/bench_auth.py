@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.core import auth
+
+
+def test_create_access_token(benchmark):
+    assert benchmark(auth.create_access_token, {"sub": "bench@example.com"})
+
+
+def test_get_current_account_cold(benchmark, run):
+    token = auth.create_access_token({"sub": "bench@example.com"})
+
+    async def decode():
+        auth.token_cache.clear()
+        return await auth.get_current_account(token)
+
+    assert benchmark(run(decode))["email"] == "bench@example.com"
+
+
+def test_get_current_account_cached(benchmark, run):
+    token = auth.create_access_token({"sub": "bench@example.com"})
+
+    async def decode():
+        return await auth.get_current_account(token)
+
+    assert benchmark(run(decode))["email"] == "bench@example.com"
+
+
+# bcrypt is deliberately slow; a handful of rounds is enough to see the cost
+# of the configured work factor.
+def test_bcrypt_hash(benchmark):
+    benchmark.pedantic(auth.get_password_hash, args=("correct horse battery",), rounds=5)
+
+
+def test_bcrypt_verify(benchmark):
+    hashed = auth.get_password_hash("correct horse battery")
+    assert benchmark.pedantic(auth.verify_password, args=("correct horse battery", hashed), rounds=5)
@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.core import compression, export
+
+from conftest import item_schemas
+
+NOW = datetime.now(timezone.utc)
+ROWS = [
+    {"id": index, **schema.model_dump(), "version": 1, "updated_at": NOW}
+    for index, schema in enumerate(item_schemas(500))
+]
+PAGE = orjson.dumps(ROWS)
+
+# (coding, level): the CPU side of the tradeoff is the benchmark time, the
+# bytes side is the ratio stored in extra_info.
+CODINGS = {
+    "gzip": (compression.GzipCompressor, (1, 6, 9)),
+    "br": (compression.BrotliCompressor, (1, 4, 11)),
+    "zstd": (compression.ZstdCompressor, (1, 3, 19)),
+}
+CASES = [(coding, level) for coding, (_, levels) in CODINGS.items() for level in levels]
+
+
+@pytest.mark.parametrize("coding,level", CASES)
+def test_compress_json_page(benchmark, coding, level):
+    factory, _ = CODINGS[coding]
+    if coding not in compression.available_codings():
+        pytest.skip(f"{coding} is not installed")
+
+    def compress():
+        compressor = factory(level)
+        return compressor.compress(PAGE, flush=False) + compressor.finish()
+
+    body = benchmark(compress)
+    benchmark.extra_info.update({"bytes": len(body), "ratio": round(len(PAGE) / len(body), 2)})
+
+
+@pytest.mark.parametrize("coding", ["gzip", "zstd"])
+def test_compress_streamed_export(benchmark, coding):
+    # Export chunks are flushed one by one, which costs some ratio.
+    factory, _ = CODINGS[coding]
+    if coding not in compression.available_codings():
+        pytest.skip(f"{coding} is not installed")
+    chunks = [PAGE[offset:offset + 8192] for offset in range(0, len(PAGE), 8192)]
+
+    def compress():
+        compressor = factory(3 if coding == "zstd" else 6)
+        return b"".join(compressor.compress(chunk) for chunk in chunks) + compressor.finish()
+
+    body = benchmark(compress)
+    benchmark.extra_info.update({"bytes": len(body), "ratio": round(len(PAGE) / len(body), 2)})
+
+
+@pytest.mark.parametrize("encoding", ["json", "msgpack"])
+def test_encode_page(benchmark, encoding):
+    if encoding == "msgpack" and export.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    encode = orjson.dumps if encoding == "json" else export.packb
+
+    body = benchmark(encode, ROWS)
+    benchmark.extra_info["bytes"] = len(body)
+
+
+@pytest.mark.parametrize("encoding", ["json", "msgpack"])
+def test_decode_page(benchmark, encoding):
+    # Client parse time for the same page.
+    if encoding == "msgpack" and export.msgpack is None:
+        pytest.skip("msgpack is not installed")
+    body = orjson.dumps(ROWS) if encoding == "json" else export.packb(ROWS)
+    decode = orjson.loads if encoding == "json" else export.msgpack.unpackb
+
+    assert len(benchmark(decode, body)) == len(ROWS)
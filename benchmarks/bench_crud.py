@@ -0,0 +1,79 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.core import cache
+from app.crud import item as crud
+
+from conftest import SEED_ITEMS, item_schemas
+
+
+def test_get_item(benchmark, run, session_factory, no_item_cache):
+    async def get():
+        async with session_factory() as db:
+            return await crud.get_item(db, SEED_ITEMS // 2)
+
+    assert benchmark(run(get))["id"] == SEED_ITEMS // 2
+
+
+def test_get_item_cached(benchmark, run, session_factory, monkeypatch):
+    monkeypatch.setattr(cache, "item_cache", cache.MemoryBackend(max_size=100, ttl=None))
+
+    async def get():
+        async with session_factory() as db:
+            return await crud.get_item(db, 1)
+
+    assert benchmark(run(get))["id"] == 1
+
+
+@pytest.mark.parametrize("limit", [50, 500])
+def test_get_items_offset(benchmark, run, session_factory, limit):
+    async def get():
+        async with session_factory() as db:
+            return await crud.get_items(db, limit, SEED_ITEMS // 2, "name")
+
+    assert len(benchmark(run(get))) == limit
+
+
+def test_get_items_cursor(benchmark, run, session_factory, loop):
+    async def first_page():
+        async with session_factory() as db:
+            return await crud.get_items_page(db, 500, None, "name")
+
+    _, cursor, _ = loop.run_until_complete(first_page())
+
+    async def get():
+        async with session_factory() as db:
+            return await crud.get_items_page(db, 500, cursor, "name")
+
+    items, _, _ = benchmark(run(get))
+    assert len(items) == 500
+
+
+def test_search_items(benchmark, run, session_factory):
+    async def search():
+        async with session_factory() as db:
+            return await crud.search_items(db, q="thermal", category="Category 3", limit=50)
+
+    assert benchmark(run(search))["total"] > 0
+
+
+def test_upsert_items(benchmark, run, session_factory, no_item_cache):
+    schemas = item_schemas(200)
+
+    async def upsert():
+        async with session_factory() as db:
+            return await crud.upsert_items(db, schemas, "update")
+
+    assert len(benchmark(run(upsert))) == 200
+
+
+def test_stream_item_rows(benchmark, run, session_factory):
+    async def export():
+        count = 0
+        async with session_factory() as db:
+            async for rows in crud.stream_item_rows(db, 1000):
+                count += len(rows)
+        return count
+
+    assert benchmark(run(export)) == SEED_ITEMS
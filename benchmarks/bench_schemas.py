@@ -0,0 +1,51 @@
+import json
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core import export
+from app.schemas.item import ItemCreate, ItemResponse
+
+from conftest import item_schemas
+
+PAGE = TypeAdapter(list[ItemResponse])
+NOW = datetime.now(timezone.utc)
+ROWS = [
+    {"id": index, **schema.model_dump(), "version": 1, "updated_at": NOW}
+    for index, schema in enumerate(item_schemas(500))
+]
+
+
+def test_item_create_validation(benchmark):
+    record = {key: value for key, value in ROWS[0].items() if key not in ("id", "version", "updated_at")}
+    assert benchmark(ItemCreate, **record).name == ROWS[0]["name"]
+
+
+def test_page_validated_stdlib_json(benchmark):
+    benchmark(lambda: json.dumps(jsonable_encoder(PAGE.validate_python(ROWS))))
+
+
+def test_page_validated_orjson(benchmark):
+    benchmark(lambda: orjson.dumps(PAGE.dump_python(PAGE.validate_python(ROWS), mode="json")))
+
+
+def test_page_trusted_orjson(benchmark):
+    benchmark(orjson.dumps, ROWS)
+
+
+def test_export_ndjson_chunk(benchmark, run):
+    rows = [tuple(row[field] for field in export.EXPORT_FIELDS) for row in ROWS]
+
+    async def partitions():
+        yield rows
+
+    async def encode():
+        return [chunk async for chunk in export.ndjson_chunks(partitions())]
+
+    assert benchmark(run(encode))
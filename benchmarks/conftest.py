@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import cache
+from app.crud.item import upsert_items
+from app.db.database import Base
+from app.schemas.item import ItemCreate
+
+SEED_ITEMS = 2000
+
+
+def item_schemas(count: int, start: int = 0) -> list[ItemCreate]:
+    return [
+        ItemCreate(
+            name=f"Item {index:05d}",
+            description=f"Military grade implant number {index} with thermal overlay",
+            category=f"Category {index % 10}",
+            quantity=index % 50,
+            price=100 + index % 900,
+        )
+        for index in range(start, start + count)
+    ]
+
+
+# pytest-benchmark times plain callables, so coroutines are driven to
+# completion on one loop shared by the whole session.
+@pytest.fixture(scope="session")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    return lambda make_coro: (lambda: loop.run_until_complete(make_coro()))
+
+
+@pytest.fixture(scope="session")
+def db_engine(loop, tmp_path_factory):
+    path = tmp_path_factory.mktemp("bench") / "bench.db"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+    async def seed():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        async with factory() as db:
+            await upsert_items(db, item_schemas(SEED_ITEMS), "nothing")
+
+    previous, cache.item_cache = cache.item_cache, cache.NullBackend()
+    try:
+        loop.run_until_complete(seed())
+    finally:
+        cache.item_cache = previous
+    yield engine
+    loop.run_until_complete(engine.dispose())
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return async_sessionmaker(bind=db_engine, autocommit=False, expire_on_commit=False)
+
+
+# Database benchmarks measure the query path, not the item cache.
+@pytest.fixture
+def no_item_cache(monkeypatch):
+    monkeypatch.setattr(cache, "item_cache", cache.NullBackend())
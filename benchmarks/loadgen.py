@@ -0,0 +1,221 @@
+"""Drive the real ASGI app with concurrent requests and report latency per endpoint.
+
+Requests go through httpx's ASGI transport, so routing, dependencies,
+validation and serialization are all exercised without a network hop. The
+database is a throwaway SQLite file unless --database-url points at a
+migrated Postgres.
+
+    python -m benchmarks.loadgen --requests 500 --concurrency 16 --save sqlite
+    python -m benchmarks.loadgen --compare sqlite --tolerance 0.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import admission, cache
+from app.core.auth import create_access_token
+from app.crud.item import upsert_items
+from app.db.database import (
+    Base,
+    get_db_connection_factory,
+    get_db_session,
+    get_db_session_factory,
+    get_read_db_session,
+    get_read_db_session_factory,
+)
+from app.main import app
+from app.schemas.item import ItemCreate
+
+BASELINES = Path(__file__).parent / "baselines"
+
+# name -> builds (method, url, request kwargs) for one request
+SCENARIOS: dict[str, Callable[[random.Random, int], tuple[str, str, dict[str, Any]]]] = {
+    "GET /items": lambda rng, seeded: ("GET", "/items", {"params": {"limit": 50}}),
+    "GET /items (500)": lambda rng, seeded: ("GET", "/items", {"params": {"limit": 500, "sort": "name"}}),
+    "GET /items/{item_id}": lambda rng, seeded: ("GET", f"/items/{rng.randint(1, seeded)}", {}),
+    "GET /items/search": lambda rng, seeded: (
+        "GET", "/items/search", {"params": {"q": "thermal", "category": f"Category {rng.randrange(10)}"}}
+    ),
+    "POST /items/{item_id}/adjust": lambda rng, seeded: (
+        "POST", f"/items/{rng.randint(1, seeded)}/adjust", {"json": {"delta": 1}}
+    ),
+}
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def seed(engine, count: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with factory() as db:
+        await upsert_items(db, [
+            ItemCreate(
+                name=f"Item {index:05d}",
+                description=f"Military grade implant number {index} with thermal overlay",
+                category=f"Category {index % 10}",
+                quantity=index % 50,
+                price=100 + index % 900,
+            )
+            for index in range(count)
+        ], "nothing")
+
+
+def use_engine(engine) -> None:
+    factory = async_sessionmaker(bind=engine, autocommit=False, expire_on_commit=False)
+
+    async def session():
+        async with factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db_session] = session
+    app.dependency_overrides[get_read_db_session] = session
+    app.dependency_overrides[get_db_session_factory] = lambda: factory
+    app.dependency_overrides[get_read_db_session_factory] = lambda: factory
+    app.dependency_overrides[get_db_connection_factory] = lambda: engine.begin
+
+
+async def run_scenario(
+        client: httpx.AsyncClient, build: Callable, requests: int, concurrency: int, seeded: int, rng: random.Random
+) -> dict[str, Any]:
+    planned = [build(rng, seeded) for _ in range(requests)]
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        while planned:
+            method, url, kwargs = planned.pop()
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1e3, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1e3, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1e3, 3),
+    }
+
+
+async def run(args: argparse.Namespace, database_url: str) -> dict[str, Any]:
+    engine = create_async_engine(database_url, poolclass=NullPool if database_url.startswith("sqlite") else None)
+    try:
+        await seed(engine, args.items)
+        use_engine(engine)
+        cache.item_cache = cache.build_item_cache()
+        if not args.admission:
+            # One account at full speed would only measure the rate limiter.
+            admission.rate_limiter.rate = 0
+            admission.in_flight.limit = 0
+
+        rng = random.Random(args.seed)
+        token = create_access_token(data={"sub": "loadgen@example.com"})
+        transport = httpx.ASGITransport(app=app)
+        results = {}
+        async with httpx.AsyncClient(
+                transport=transport, base_url="http://loadgen", headers={"Authorization": f"Bearer {token}"}
+        ) as client:
+            for name in args.endpoint or SCENARIOS:
+                # One untimed pass warms caches, compiled statements and connections.
+                await run_scenario(client, SCENARIOS[name], args.concurrency, args.concurrency, args.items, rng)
+                results[name] = await run_scenario(
+                    client, SCENARIOS[name], args.requests, args.concurrency, args.items, rng
+                )
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+    return {
+        "database": engine.dialect.name,
+        "items": args.items,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        if result["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {base['p99_ms']}ms -> {result['p99_ms']}ms")
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {base['rps']} -> {result['rps']}")
+    return regressions
+
+
+def print_report(report: dict[str, Any], baseline: Optional[dict[str, Any]] = None) -> None:
+    print(f"{report['database']}: {report['requests']} requests per endpoint, concurrency {report['concurrency']}")
+    print(f"{'endpoint':<30} {'p50 ms':>9} {'p99 ms':>9} {'rps':>9} {'errors':>7}")
+    for name, result in report["results"].items():
+        line = f"{name:<30} {result['p50_ms']:>9} {result['p99_ms']:>9} {result['rps']:>9} {result['errors']:>7}"
+        base = (baseline or {}).get("results", {}).get(name)
+        if base:
+            line += f"   (baseline p99 {base['p99_ms']}, rps {base['rps']})"
+        print(line)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Load-test the items API through the ASGI app.")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--items", type=int, default=2000, help="items seeded before the run")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--endpoint", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--admission", action="store_true", help="keep rate limiting and the in-flight cap on")
+    parser.add_argument("--save", metavar="NAME", help="store the results as benchmarks/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against benchmarks/baselines/NAME.json")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads((BASELINES / f"{args.compare}.json").read_text())
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(directory, 'loadgen.db')}"
+        report = asyncio.run(run(args, database_url))
+
+    print_report(report, baseline)
+
+    if args.save:
+        BASELINES.mkdir(exist_ok=True)
+        (BASELINES / f"{args.save}.json").write_text(json.dumps(report, indent=2) + "\n")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Item lookup latency on a plain items table against a hash partitioned one.
+
+Both layouts are built side by side in their own schemas of a scratch
+Postgres database and seeded with generate_series, so row counts in the
+hundreds of millions are practical (seeding is what takes the time). Each
+lookup is run as the app runs it: by id, by name (through the item_names
+registry on the partitioned layout) and a keyset page.
+
+    python -m benchmarks.partitioning --database-url postgresql+asyncpg://... --rows 100000000 --partitions 16
+    python -m benchmarks.partitioning --database-url ... --skip-seed   # reuse the tables of the last run
+    python -m benchmarks.partitioning --database-url ... --save partitioning-postgres
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from benchmarks.loadgen import BASELINES, percentile
+
+LAYOUTS = ("heap", "hash")
+
+TABLE = """
+    CREATE TABLE {schema}.items (
+        id integer NOT NULL, name varchar, description text NOT NULL, category varchar(255) NOT NULL,
+        quantity integer NOT NULL, price double precision NOT NULL, version integer NOT NULL DEFAULT 1,
+        updated_at timestamptz NOT NULL DEFAULT now()
+    ) {partition_by}
+"""
+
+SEED = """
+    INSERT INTO {schema}.items (id, name, description, category, quantity, price)
+    SELECT n, 'Item ' || n, 'Military grade optical implant', 'Category ' || (n % 10), n % 50, 1000 + n % 997
+    FROM generate_series({start}, {stop}) AS n
+"""
+
+# Lookups as crud.item issues them for each layout.
+QUERIES = {
+    "heap": {
+        "by id": "SELECT * FROM bench_heap.items WHERE id = $1",
+        "by name": "SELECT * FROM bench_heap.items WHERE name = $1",
+        "keyset page": "SELECT * FROM bench_heap.items WHERE id > $1 ORDER BY id LIMIT 50",
+    },
+    "hash": {
+        "by id": "SELECT * FROM bench_hash.items WHERE id = $1",
+        "by name": (
+            "SELECT * FROM bench_hash.items WHERE id = "
+            "(SELECT item_id FROM bench_hash.item_names WHERE name = $1)"
+        ),
+        "keyset page": "SELECT * FROM bench_hash.items WHERE id > $1 ORDER BY id LIMIT 50",
+    },
+}
+
+
+async def seed(connection, layout: str, rows: int, partitions: int, batch: int) -> None:
+    schema = f"bench_{layout}"
+    await connection.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    await connection.execute(text(f"CREATE SCHEMA {schema}"))
+    partition_by = "PARTITION BY HASH (id)" if layout == "hash" else ""
+    await connection.execute(text(TABLE.format(schema=schema, partition_by=partition_by)))
+    if layout == "hash":
+        for remainder in range(partitions):
+            await connection.execute(text(
+                f"CREATE TABLE {schema}.items_p{remainder} PARTITION OF {schema}.items "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            ))
+
+    for start in range(1, rows + 1, batch):
+        await connection.execute(text(SEED.format(schema=schema, start=start, stop=min(rows, start + batch - 1))))
+        await connection.commit()
+
+    # Indexes after the load, as the migration builds them.
+    await connection.execute(text(f"ALTER TABLE {schema}.items ADD PRIMARY KEY (id)"))
+    if layout == "hash":
+        await connection.execute(text(f"CREATE INDEX ON {schema}.items (name)"))
+        await connection.execute(text(
+            f"CREATE TABLE {schema}.item_names (name varchar PRIMARY KEY, item_id integer NOT NULL)"
+        ))
+        await connection.execute(text(f"INSERT INTO {schema}.item_names SELECT name, id FROM {schema}.items"))
+    else:
+        await connection.execute(text(f"CREATE UNIQUE INDEX ON {schema}.items (name)"))
+    await connection.execute(text(f"ANALYZE {schema}.items"))
+    await connection.commit()
+
+
+async def measure(raw, sql: str, arguments: list, repeat: int) -> list[float]:
+    statement = await raw.prepare(sql)
+    for argument in arguments[:100]:
+        await statement.fetch(argument)
+    samples = []
+    for index in range(repeat):
+        started = time.perf_counter()
+        await statement.fetch(arguments[index % len(arguments)])
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def run(args: argparse.Namespace) -> dict:
+    engine = create_async_engine(args.database_url)
+    report = {"database": None, "rows": args.rows, "partitions": args.partitions, "repeat": args.repeat, "results": {}}
+    try:
+        async with engine.connect() as connection:
+            if not args.skip_seed:
+                for layout in LAYOUTS:
+                    started = time.perf_counter()
+                    await seed(connection, layout, args.rows, args.partitions, args.batch)
+                    print(f"seeded {layout}: {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+            report["database"] = f"postgresql {await connection.scalar(text('SHOW server_version'))}"
+            raw = (await connection.get_raw_connection()).driver_connection
+            rng = random.Random(args.seed)
+            ids = [rng.randint(1, args.rows) for _ in range(args.repeat)]
+            arguments = {"by id": ids, "by name": [f"Item {n}" for n in ids], "keyset page": ids}
+
+            print(f"{'lookup':<14}{'layout':<8}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+            for lookup in QUERIES["heap"]:
+                for layout in LAYOUTS:
+                    samples = await measure(raw, QUERIES[layout][lookup], arguments[lookup], args.repeat)
+                    report["results"][f"{lookup} ({layout})"] = {
+                        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+                        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+                        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+                    }
+                    print(
+                        f"{lookup:<14}{layout:<8}{percentile(samples, 0.5) * 1000:>10.3f}"
+                        f"{percentile(samples, 0.99) * 1000:>10.3f}{statistics.mean(samples) * 1000:>10.3f}"
+                    )
+    finally:
+        await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True, help="a scratch Postgres database (asyncpg driver)")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--partitions", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=1_000_000, help="rows seeded per transaction")
+    parser.add_argument("--repeat", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--save", metavar="NAME", help="store the results as benchmarks/baselines/NAME.json")
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+    if args.save:
+        BASELINES.mkdir(exist_ok=True)
+        (BASELINES / f"{args.save}.json").write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Per-row CPU cost of serializing an item page.
+
+Compares the default path (pydantic revalidation through ItemResponse, then
+JSON encoding) with the trusted path (orjson straight from row dicts).
+
+    python -m benchmarks.serialization --rows 500 --repeat 200
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.item import ItemResponse
+
+PAGE = TypeAdapter(list[ItemResponse])
+
+
+def make_rows(count: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": index,
+            "name": f"Item {index}",
+            "description": "Military grade optical implant with thermal overlay",
+            "category": "Implants",
+            "quantity": index % 50,
+            "price": 1000 + index,
+            "version": 1,
+            "updated_at": now,
+        }
+        for index in range(count)
+    ]
+
+
+def stdlib_validated(rows):
+    return json.dumps(jsonable_encoder(PAGE.validate_python(rows))).encode()
+
+
+def orjson_validated(rows):
+    return orjson.dumps(PAGE.dump_python(PAGE.validate_python(rows), mode="json"))
+
+
+def orjson_trusted(rows):
+    return orjson.dumps(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    for encode in (stdlib_validated, orjson_validated, orjson_trusted):
+        seconds = min(timeit.repeat(lambda: encode(rows), number=args.repeat, repeat=3)) / args.repeat
+        print(f"{encode.__name__:<18} {seconds * 1e3:8.3f} ms/page {seconds / args.rows * 1e6:8.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import admission, cache
+from app.core.auth import create_access_token
+from app.crud.item import create_item
+from app.core.config import settings
+from app.db.database import (
+    Base,
+    get_db_connection_factory,
+    get_db_session,
+    get_db_session_factory,
+    get_read_db_session,
+    get_read_db_session_factory,
+    instrument_engine,
+)
+from app.main import app
+from app.schemas.item import ItemCreate
+
+
+async def _create_schema(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+@pytest.fixture(autouse=True)
+def item_cache(monkeypatch):
+    backend = cache.MemoryBackend(max_size=100, ttl=None)
+    monkeypatch.setattr(cache, "item_cache", backend)
+    return backend
+
+
+@pytest.fixture(autouse=True)
+def rate_limiter(monkeypatch):
+    limiter = admission.RateLimiter(
+        admission.MemoryRateStore(max_keys=100), settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST
+    )
+    monkeypatch.setattr(admission, "rate_limiter", limiter)
+    return limiter
+
+
+# A fresh SQLite file per test; NullPool keeps connections from leaking across
+# the event loops used by pytest-asyncio and the TestClient portal.
+@pytest.fixture
+def db_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    instrument_engine(engine)
+    asyncio.run(_create_schema(engine))
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return async_sessionmaker(bind=db_engine, autocommit=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def client(db_engine, session_factory):
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db_session] = override_get_db
+    app.dependency_overrides[get_read_db_session] = override_get_db
+    app.dependency_overrides[get_db_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_read_db_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_db_connection_factory] = lambda: db_engine.begin
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+
+@pytest.fixture
+def auth_headers():
+    token = create_access_token(data={"sub": "tester@example.com"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def admin_headers(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_ACCOUNTS", ["admin@example.com"])
+    token = create_access_token(data={"sub": "admin@example.com"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def create_items(session_factory):
+    def create(*names, **fields):
+        async def insert():
+            async with session_factory() as db:
+                return [
+                    await create_item(db, ItemCreate(**{
+                        "name": name,
+                        "description": "Description",
+                        "category": "Category",
+                        "quantity": 1,
+                        "price": 10,
+                        **fields,
+                    }))
+                    for name in names
+                ]
+
+        return asyncio.run(insert())
+
+    return create
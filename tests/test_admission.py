@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import admission
+from app.core.auth import create_access_token
+from app.db.database import get_db_session, get_db_session_factory, get_read_db_session, get_read_db_session_factory
+from app.main import app
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Runs the token bucket script's arithmetic in Python."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.buckets = {}
+        self.calls = []
+
+    async def eval(self, script, numkeys, key, rate, burst, cost):
+        assert script == admission.TOKEN_BUCKET_SCRIPT and numkeys == 1
+        self.calls.append(key)
+        now = self.clock()
+        tokens, updated = self.buckets.get(key, (burst, now))
+        tokens, retry_after = admission._take(tokens, now - updated, rate, burst, cost)
+        self.buckets[key] = (tokens, now)
+        return str(retry_after).encode()
+
+
+class BrokenRedis:
+    async def eval(self, *args):
+        raise ConnectionError("redis is down")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("shared", [False, True])
+async def test_token_bucket_refills_over_time(shared):
+    clock = FakeClock()
+    store = admission.RedisRateStore(FakeRedis(clock)) if shared else admission.MemoryRateStore(10, clock)
+
+    assert [await store.take("a", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert await store.take("a", rate=2, burst=3) == pytest.approx(0.5)
+    assert await store.take("b", rate=2, burst=3) == 0
+
+    clock.now += 0.5
+    assert await store.take("a", rate=2, burst=3) == 0
+    assert await store.take("a", rate=2, burst=3) > 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_rejects_with_retry_after_and_fails_open():
+    limiter = admission.RateLimiter(admission.MemoryRateStore(10, FakeClock()), rate=0.5, burst=1)
+    await limiter.check("a@example.com")
+    with pytest.raises(HTTPException) as excinfo:
+        await limiter.check("a@example.com")
+    assert excinfo.value.status_code == 429
+    assert excinfo.value.headers["Retry-After"] == "2"
+
+    await admission.RateLimiter(admission.RedisRateStore(BrokenRedis()), rate=0.5, burst=1).check("a@example.com")
+
+
+def test_item_routes_are_rate_limited_per_account(client, auth_headers, create_items, rate_limiter, monkeypatch):
+    create_items("Item")
+    monkeypatch.setattr(rate_limiter, "rate", 0.1)
+    monkeypatch.setattr(rate_limiter, "burst", 2)
+
+    statuses = [client.get("/items", headers=auth_headers).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    assert client.get("/items", headers=auth_headers).headers["Retry-After"] == "10"
+
+    token = create_access_token(data={"sub": "other@example.com"})
+    assert client.get("/items", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+def test_shed_requests_never_open_a_session(client, auth_headers, monkeypatch):
+    opened = []
+    for dependency in (get_db_session, get_read_db_session, get_db_session_factory, get_read_db_session_factory):
+        monkeypatch.setitem(app.dependency_overrides, dependency, lambda: opened.append(1))
+    # Full, with no queue: every request is shed on arrival.
+    full = admission.InFlightLimiter(limit=1, max_queue=0, max_wait=0)
+    full.in_flight = 1
+    monkeypatch.setattr(admission, "in_flight", full)
+
+    requests = [
+        ("POST", "/items"), ("POST", "/items/bulk"), ("POST", "/items/batch_get"), ("POST", "/items/adjust"),
+        ("POST", "/items/1/adjust"), ("GET", "/items"), ("GET", "/items/search"), ("GET", "/items/stats"),
+        ("GET", "/items/export"), ("GET", "/items/changes"), ("GET", "/items/changes/stream"),
+        ("GET", "/items/1"), ("PUT", "/items/1"), ("DELETE", "/items/1"),
+    ]
+    statuses = {path: client.request(method, path, headers=auth_headers).status_code for method, path in requests}
+    assert set(statuses.values()) == {503}, statuses
+    assert opened == []
+
+
+@pytest.mark.asyncio
+async def test_in_flight_cap_queues_then_sheds():
+    limiter = admission.InFlightLimiter(limit=1, max_queue=1, max_wait=0.05)
+    await limiter.acquire()
+
+    # A queued request gets the slot as soon as it is released.
+    waiting = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException) as excinfo:
+        await limiter.acquire()
+    assert excinfo.value.status_code == 503
+    assert "Retry-After" in excinfo.value.headers
+
+    limiter.release()
+    await waiting
+    assert (limiter.in_flight, limiter.queued) == (1, 0)
+
+    # Nobody releases: the queued request is shed once max_wait has passed.
+    with pytest.raises(HTTPException):
+        await limiter.acquire()
+    assert (limiter.in_flight, limiter.queued) == (1, 0)
+
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limiter = admission.InFlightLimiter(limit=1, max_queue=5, max_wait=10)
+    async with limiter.slot():
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert limiter.queued == 0
+    assert limiter.in_flight == 0
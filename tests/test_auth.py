@@ -0,0 +1,131 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core import auth
+
+
+@pytest.fixture(autouse=True)
+def token_cache(monkeypatch):
+    cache = auth.LRUCache(max_size=2, ttl=60)
+    monkeypatch.setattr(auth, "token_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    decode = auth.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_token_is_decoded_once(decode_calls, token_cache):
+    token = auth.create_access_token(data={"sub": "tester@example.com"})
+
+    assert await auth.get_current_account(token) == {"email": "tester@example.com"}
+    assert await auth.get_current_account(token) == {"email": "tester@example.com"}
+
+    assert len(decode_calls) == 1
+    assert (token_cache.stats.hits, token_cache.stats.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded(token_cache):
+    for index in range(3):
+        await auth.get_current_account(auth.create_access_token(data={"sub": f"user{index}"}))
+
+    assert len(token_cache) == 2
+    assert token_cache.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_tokens_are_not_cached(token_cache):
+    expired = auth.create_access_token(data={"sub": "tester@example.com"}, expires_delta=timedelta(minutes=-1))
+
+    for token in (expired, "garbage"):
+        with pytest.raises(auth.HTTPException) as error:
+            await auth.get_current_account(token)
+        assert error.value.status_code == 401
+
+    assert len(token_cache) == 0
+
+
+@pytest.fixture
+def fast_hashing(monkeypatch):
+    context = auth.CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+    monkeypatch.setattr(auth, "pwd_context", context)
+    return context
+
+
+def register(client, name="runner"):
+    return client.post(
+        "/account_register",
+        data={"name": name, "email": f"{name}@example.com", "password": "hunter22"},
+    )
+
+
+def test_register_and_login(client, fast_hashing):
+    response = register(client)
+    assert response.status_code == 200
+    assert response.json() == {"name": "runner", "email": "runner@example.com"}
+
+    response = client.post("/token", data={"username": "runner", "password": "hunter22"})
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    assert client.get("/items", headers={"Authorization": f"Bearer {token}"}).status_code == 404
+
+    response = client.post("/token", data={"username": "runner", "password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_login_rehashes_when_cost_changes(client, session_factory, fast_hashing, monkeypatch):
+    register(client)
+    monkeypatch.setattr(
+        auth, "pwd_context", auth.CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+    )
+
+    response = client.post("/token", data={"username": "runner", "password": "hunter22"})
+    assert response.status_code == 200
+
+    async def stored_hash():
+        async with session_factory() as db:
+            account = await auth.get_account_by_email_or_name(db, email="runner", name="runner")
+            return account.hashed_password
+
+    assert asyncio.run(stored_hash()).startswith("$2b$05$")
+
+
+def test_login_holds_no_connection_while_verifying(client, db_engine, fast_hashing, monkeypatch):
+    register(client)
+    checked_out = []
+    event.listen(db_engine.sync_engine, "checkout", lambda *args: checked_out.append(1))
+    event.listen(db_engine.sync_engine, "checkin", lambda *args: checked_out.pop())
+
+    held = []
+    verify = auth.verify_and_update_password
+
+    async def recording_verify(*args):
+        held.append(len(checked_out))
+        return await verify(*args)
+
+    monkeypatch.setattr(auth, "verify_and_update_password", recording_verify)
+    assert client.post("/token", data={"username": "runner", "password": "hunter22"}).status_code == 200
+    assert client.post("/token", data={"username": "runner", "password": "wrong"}).status_code == 401
+    assert held == [0, 0]
+
+
+def test_hash_pool_sheds_load(client, fast_hashing, monkeypatch):
+    monkeypatch.setattr(auth, "password_pool", auth.PasswordHashPool(max_workers=1, max_pending=0))
+
+    response = register(client)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
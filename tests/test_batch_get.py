@@ -0,0 +1,33 @@
+from app.core.config import settings
+
+
+def test_batch_get_preserves_order_and_reports_missing(client, auth_headers, create_items):
+    first, second, third = create_items("Deck", "Blade", "Implant")
+
+    response = client.post(
+        "/items/batch_get", json={"ids": [third["id"], 999, first["id"], third["id"]]}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()["items"]] == ["Implant", "Deck"]
+    assert response.json()["missing"] == [999]
+
+
+def test_batch_get_fills_and_uses_the_cache(client, auth_headers, create_items, item_cache):
+    first, second = create_items("Deck", "Blade")
+    client.get(f"/items/{first['id']}", headers=auth_headers)
+
+    response = client.post("/items/batch_get", json={"ids": [first["id"], second["id"]]}, headers=auth_headers)
+    assert [item["id"] for item in response.json()["items"]] == [first["id"], second["id"]]
+    assert item_cache.stats.hits == 1
+
+    client.post("/items/batch_get", json={"ids": [second["id"]]}, headers=auth_headers)
+    assert item_cache.stats.hits == 2
+
+
+def test_batch_get_limits(client, auth_headers):
+    response = client.post("/items/batch_get", json={"ids": []}, headers=auth_headers)
+    assert response.status_code == 422
+
+    ids = list(range(settings.BATCH_GET_MAX_IDS + 1))
+    response = client.post("/items/batch_get", json={"ids": ids}, headers=auth_headers)
+    assert response.status_code == 422
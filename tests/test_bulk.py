@@ -0,0 +1,57 @@
+import json
+
+
+def test_bulk_insert_and_update(client, auth_headers, create_items):
+    create_items("Existing", quantity=1)
+    payload = [
+        {"name": "Existing", "description": "Restocked", "category": "Category", "quantity": 50, "price": 12},
+        {"name": "New", "description": "Fresh", "category": "Category", "quantity": 5, "price": 3},
+    ]
+
+    response = client.post("/items/bulk", json=payload, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["inserted"], data["updated"], data["skipped"], data["rejected"]) == (1, 1, 0, 0)
+    assert [result["status"] for result in data["results"]] == ["updated", "inserted"]
+
+    existing_id = data["results"][0]["id"]
+    response = client.get(f"/items/{existing_id}", headers=auth_headers)
+    assert response.json()["quantity"] == 50
+
+
+def test_bulk_do_nothing_skips_existing(client, auth_headers, create_items):
+    create_items("Existing", quantity=1)
+    payload = [{"name": "Existing", "description": "x", "category": "c", "quantity": 50, "price": 1}]
+
+    response = client.post(
+        "/items/bulk", params={"on_conflict": "nothing"}, json=payload, headers=auth_headers
+    )
+    data = response.json()
+    assert data["skipped"] == 1
+    assert data["results"][0]["status"] == "skipped"
+
+
+def test_bulk_ndjson_reports_rejects(client, auth_headers):
+    lines = [
+        json.dumps({"name": "A", "description": "d", "category": "c", "quantity": 1, "price": 1}),
+        "{not json",
+        json.dumps({"name": "B", "description": "d", "category": "c", "quantity": "many", "price": 1}),
+        json.dumps({"name": "A", "description": "d", "category": "c", "quantity": 2, "price": 1}),
+    ]
+
+    response = client.post(
+        "/items/bulk",
+        content="\n".join(lines),
+        headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["inserted"] == 1
+    assert data["rejected"] == 3
+    assert [result["status"] for result in data["results"]] == ["inserted", "invalid", "invalid", "duplicate"]
+    assert "quantity" in data["results"][2]["detail"]
+
+
+def test_bulk_requires_array(client, auth_headers):
+    response = client.post("/items/bulk", json={"name": "A"}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,118 @@
+import fnmatch
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.cache import LRUCache, RedisBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+
+    async def execute(self):
+        for key, value in self.commands:
+            await self.client.set(key, value)
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(max_size=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.stats.as_dict() == {"hits": 2, "misses": 1, "evictions": 1, "expirations": 0}
+
+
+def test_lru_expires_entries():
+    clock = FakeClock()
+    lru = LRUCache(max_size=10, ttl=5, clock=clock)
+    lru.set("a", 1)
+    lru.set("b", 2, expires_at=20)
+
+    clock.now = 6
+    assert lru.get("a") is None
+    assert lru.get("b") == 2
+    assert lru.stats.expirations == 1
+    assert len(lru) == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_roundtrip():
+    client = FakeRedis()
+    backend = RedisBackend(client, ttl=30)
+
+    assert await backend.get(1) is None
+    item = {"id": 1, "name": "Deck", "updated_at": datetime(2026, 1, 2, tzinfo=timezone.utc)}
+    await backend.set(1, item)
+    assert await backend.get(1) == item
+
+    await backend.clear()
+    assert client.data == {}
+    assert backend.stats.hits == 1
+    assert backend.stats.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_many():
+    backend = RedisBackend(FakeRedis(), ttl=30)
+
+    await backend.set_many({1: {"id": 1}, 2: {"id": 2}})
+    assert await backend.get_many([2, 3, 1]) == {1: {"id": 1}, 2: {"id": 2}}
+    assert (backend.stats.hits, backend.stats.misses) == (2, 1)
+
+
+def test_get_item_reads_through_and_invalidates(client, auth_headers, create_items, item_cache):
+    item = create_items("Deck")[0]
+
+    assert client.get(f"/items/{item['id']}", headers=auth_headers).status_code == 200
+    assert client.get(f"/items/{item['id']}", headers=auth_headers).status_code == 200
+    assert (item_cache.stats.hits, item_cache.stats.misses) == (1, 1)
+
+    response = client.put(f"/items/{item['id']}", data={"quantity": 7}, headers=auth_headers)
+    assert response.status_code == 200
+    assert client.get(f"/items/{item['id']}", headers=auth_headers).json()["quantity"] == 7
+
+    assert client.delete(f"/items/{item['id']}", headers=auth_headers).status_code == 200
+    assert client.get(f"/items/{item['id']}", headers=auth_headers).status_code == 404
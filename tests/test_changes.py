@@ -0,0 +1,111 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+
+from app.crud import changes
+from app.crud.item import create_item
+from app.db.loader import load_items
+from app.schemas.item import ItemCreate
+
+
+def item_fields(name, **fields):
+    return {"name": name, "description": "d", "category": "c", "quantity": 5, "price": 10, **fields}
+
+
+def test_every_write_appends_to_the_changelog(client, auth_headers, create_items):
+    deck, blade = create_items("Deck", "Blade")
+    client.put(f"/items/{deck['id']}", data={"quantity": 3}, headers=auth_headers)
+    client.post(f"/items/{blade['id']}/adjust", json={"delta": -1}, headers=auth_headers)
+    client.post("/items/bulk", json=[item_fields("Implant")], headers=auth_headers)
+    client.delete(f"/items/{blade['id']}", headers=auth_headers)
+
+    response = client.get("/items/changes", headers=auth_headers)
+    assert response.status_code == 200
+    page = response.json()
+    assert [(change["item_id"], change["op"]) for change in page["changes"]] == [
+        (deck["id"], "upsert"),
+        (blade["id"], "upsert"),
+        (deck["id"], "upsert"),
+        (blade["id"], "upsert"),
+        (blade["id"] + 1, "upsert"),
+        (blade["id"], "delete"),
+    ]
+    assert page["changes"][2]["data"]["quantity"] == 3
+    assert page["changes"][-1]["data"] is None
+    assert [change["seq"] for change in page["changes"]] == sorted(change["seq"] for change in page["changes"])
+    assert page["next_since"] == page["latest_seq"] == page["changes"][-1]["seq"]
+
+    response = client.get("/items/changes", params={"since": page["changes"][3]["seq"], "limit": 1}, headers=auth_headers)
+    assert [change["item_id"] for change in response.json()["changes"]] == [blade["id"] + 1]
+
+    response = client.get("/items/changes", params={"since": page["next_since"]}, headers=auth_headers)
+    assert response.json()["changes"] == []
+
+
+def test_compaction_and_retention(client, auth_headers, admin_headers, create_items):
+    deck, blade = create_items("Deck", "Blade")
+    client.put(f"/items/{deck['id']}", data={"quantity": 3}, headers=auth_headers)
+
+    response = client.post("/admin/changes/compact", params={"retention_seconds": 3600}, headers=admin_headers)
+    assert response.json() == {"superseded": 1, "expired": 0, "compacted_seq": 0}
+    page = client.get("/items/changes", headers=auth_headers).json()
+    assert [(change["item_id"], change["data"]["quantity"]) for change in page["changes"]] == [
+        (blade["id"], 1), (deck["id"], 3)
+    ]
+
+    response = client.post("/admin/changes/compact", params={"retention_seconds": 0}, headers=admin_headers)
+    assert response.json()["expired"] == 2
+    compacted_seq = response.json()["compacted_seq"]
+    assert compacted_seq == page["latest_seq"]
+
+    response = client.get("/items/changes", params={"since": 0}, headers=auth_headers)
+    assert response.status_code == 410
+    assert response.headers["X-Compacted-Seq"] == str(compacted_seq)
+    response = client.get("/items/changes/stream", params={"since": 0}, headers=auth_headers)
+    assert response.status_code == 410
+
+    response = client.get("/items/changes", params={"since": compacted_seq}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["latest_seq"] == compacted_seq
+
+
+@pytest.mark.asyncio
+async def test_stream_pushes_new_changes(session_factory):
+    async with session_factory() as db:
+        deck = await create_item(db, ItemCreate(**item_fields("Deck")))
+
+    stream = changes.stream_changes(session_factory, 0, poll_seconds=0.05, page_size=10)
+    first = await stream.__anext__()
+    assert first.startswith(b"id: 1\nevent: upsert\ndata: ")
+    assert json.loads(first.split(b"data: ")[1])["item_id"] == deck["id"]
+
+    assert await stream.__anext__() == b": keepalive\n\n"
+
+    pending = asyncio.ensure_future(stream.__anext__())
+    await asyncio.sleep(0)
+    async with session_factory() as db:
+        blade = await create_item(db, ItemCreate(**item_fields("Blade")))
+    event = await asyncio.wait_for(pending, 1)
+    assert event.startswith(b"id: 2\n")
+    change = json.loads(event.split(b"data: ")[1])
+    assert (change["item_id"], change["data"]["name"]) == (blade["id"], "Blade")
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_load_records_changes(db_engine, session_factory):
+    async def records():
+        yield item_fields("Deck")
+        yield item_fields("Blade")
+
+    await load_items(records(), connect=db_engine.begin)
+
+    async with session_factory() as db:
+        page = await changes.list_changes(db, 0, 10)
+    assert [change["data"]["name"] for change in page["changes"]] == ["Deck", "Blade"]
+
+    async with session_factory() as db:
+        report = await changes.compact_changes(db, timedelta(seconds=3600))
+    assert report == {"superseded": 0, "expired": 0, "compacted_seq": 0}
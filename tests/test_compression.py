@@ -0,0 +1,132 @@
+import gzip
+import io
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate
+from app.core.config import settings
+
+
+def test_negotiate_honours_weights_and_preference():
+    preference = ["zstd", "br", "gzip"]
+    assert negotiate(None, preference) is None
+    assert negotiate("gzip, deflate", preference) == "gzip"
+    assert negotiate("gzip, br", preference) == "br"
+    assert negotiate("br;q=0.5, gzip", preference) == "gzip"
+    assert negotiate("*, zstd;q=0", preference) == "br"
+    assert negotiate("identity", preference) is None
+
+
+def test_large_list_is_compressed_and_small_item_is_not(client, auth_headers, create_items):
+    create_items(*(f"Item {index}" for index in range(50)), description="Surplus thermal optics " * 10)
+
+    response = client.get("/items", params={"limit": 50}, headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content) / 5
+    assert len(response.json()) == 50
+
+    response = client.get("/items/1", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    response = client.get("/items", params={"limit": 50}, headers={**auth_headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_encoded_responses_get_their_own_etag(client, auth_headers, create_items):
+    create_items(*(f"Item {index}" for index in range(50)), description="Surplus thermal optics " * 10)
+    gzip_headers = {**auth_headers, "Accept-Encoding": "gzip"}
+
+    plain = client.get("/items", params={"limit": 50}, headers={**auth_headers, "Accept-Encoding": "identity"})
+    encoded = client.get("/items", params={"limit": 50}, headers=gzip_headers)
+    assert encoded.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+
+    # Either tag revalidates; the 304 echoes the one the client holds.
+    for etag in (encoded.headers["ETag"], plain.headers["ETag"]):
+        response = client.get("/items", params={"limit": 50}, headers={**gzip_headers, "If-None-Match": etag})
+        assert (response.status_code, response.headers["ETag"]) == (304, etag)
+
+    # If-Match still matches the item version behind an encoded tag.
+    response = client.put("/items/1", data={"quantity": 5}, headers={**auth_headers, "If-Match": '"1-gzip"'})
+    assert (response.status_code, response.json()["version"]) == (200, 2)
+
+
+def test_export_is_compressed_while_streaming(client, auth_headers, create_items, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 10)
+    create_items(*(f"Item {index}" for index in range(35)))
+
+    with client.stream("GET", "/items/export", headers={**auth_headers, "Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        raw = b"".join(response.iter_raw())
+    # Every exported chunk ends in a sync flush marker.
+    assert raw.count(b"\x00\x00\xff\xff") == 4
+    assert gzip.decompress(raw).count(b"\n") == 35
+
+
+@pytest.mark.parametrize("coding", ["br", "zstd"])
+def test_optional_codings(client, auth_headers, create_items, coding):
+    module = pytest.importorskip({"br": "brotli", "zstd": "zstandard"}[coding])
+    create_items(*(f"Item {index}" for index in range(30)))
+
+    headers = {**auth_headers, "Accept-Encoding": coding}
+    with client.stream("GET", "/items", params={"limit": 30}, headers=headers) as response:
+        assert response.headers["content-encoding"] == coding
+        raw = b"".join(response.iter_raw())
+    if coding == "br":
+        body = module.decompress(raw)
+    else:
+        body = module.ZstdDecompressor().decompressobj().decompress(raw)
+    assert body.count(b'"name"') == 30
+
+
+async def event_stream(scope, receive, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"text/event-stream")],
+    })
+    for index in range(3):
+        await send({"type": "http.response.body", "body": b"data: %d\n\n" % index * 500, "more_body": True})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def test_event_streams_are_not_compressed():
+    client = TestClient(CompressionMiddleware(event_stream, minimum_size=10, codings=["gzip"]))
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.content.startswith(b"data: 0")
+    with pytest.raises(zlib.error):
+        zlib.decompress(response.content)
+
+
+def test_msgpack_representation(client, auth_headers, create_items):
+    msgpack = pytest.importorskip("msgpack")
+    create_items("Item 1", "Item 2")
+
+    response = client.get("/items", headers={**auth_headers, "Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    items = msgpack.unpackb(response.content)
+    json_page = client.get("/items", headers=auth_headers)
+    assert items == json_page.json()
+    assert type(items[0]["price"]) is int
+
+    # Each representation has its own tag, and a 304 varies like the 200.
+    msgpack_etag = response.headers["ETag"]
+    assert msgpack_etag != json_page.headers["ETag"]
+    response = client.get("/items", headers={
+        **auth_headers, "Accept": "application/msgpack", "If-None-Match": json_page.headers["ETag"],
+    })
+    assert response.status_code == 200
+    response = client.get("/items", headers={
+        **auth_headers, "Accept": "application/msgpack", "If-None-Match": msgpack_etag,
+    })
+    assert response.status_code == 304
+    assert response.headers["Vary"] == "Accept, Accept-Encoding"
+
+    response = client.get("/items/export", params={"format": "msgpack"}, headers=auth_headers)
+    assert [row["name"] for row in msgpack.Unpacker(io.BytesIO(response.content))] == ["Item 1", "Item 2"]
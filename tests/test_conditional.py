@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core import conditional
+
+
+def test_not_modified_rules():
+    modified = datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc)
+    since = conditional.http_date(modified)
+
+    assert conditional.not_modified('W/"3", "4"', None, '"4"')
+    assert conditional.not_modified("*", None, '"4"')
+    assert not conditional.not_modified('"3"', since, '"4"', modified)
+    assert conditional.not_modified(None, since, '"4"', modified)
+    assert conditional.not_modified(None, since, '"4"', modified.replace(tzinfo=None))
+    assert not conditional.not_modified(None, since, '"4"', modified + timedelta(seconds=1))
+    assert not conditional.not_modified(None, "yesterday", '"4"', modified)
+
+
+def test_get_item_revalidates_with_etag(client, auth_headers, create_items):
+    item = create_items("Deck")[0]
+
+    response = client.get(f"/items/{item['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1"'
+    assert "Last-Modified" in response.headers
+
+    response = client.get(f"/items/{item['id']}", headers={**auth_headers, "If-None-Match": '"1"'})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == '"1"'
+
+    client.put(f"/items/{item['id']}", data={"quantity": 3}, headers=auth_headers)
+    response = client.get(f"/items/{item['id']}", headers={**auth_headers, "If-None-Match": '"1"'})
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 3
+
+
+def test_get_item_revalidates_with_last_modified(client, auth_headers, create_items):
+    item = create_items("Deck")[0]
+    last_modified = client.get(f"/items/{item['id']}", headers=auth_headers).headers["Last-Modified"]
+
+    response = client.get(f"/items/{item['id']}", headers={**auth_headers, "If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    response = client.get(
+        f"/items/{item['id']}", headers={**auth_headers, "If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/items/999", headers={**auth_headers, "If-None-Match": '"1"'})
+    assert response.status_code == 404
+
+
+def test_item_page_etag_follows_versions(client, auth_headers, create_items):
+    first, _ = create_items("Deck", "Blade")
+
+    response = client.get("/items", headers=auth_headers)
+    page_etag = response.headers["ETag"]
+
+    response = client.get("/items", headers={**auth_headers, "If-None-Match": page_etag})
+    assert response.status_code == 304
+
+    client.post(f"/items/{first['id']}/adjust", json={"delta": 1}, headers=auth_headers)
+    response = client.get("/items", headers={**auth_headers, "If-None-Match": page_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != page_etag
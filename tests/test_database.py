@@ -0,0 +1,153 @@
+import pytest
+from sqlalchemy import exc, text
+
+from app.core.config import Settings
+from app.db.database import DatabaseSessionManager, TimedQueuePool
+
+
+def test_engine_options_default_profile():
+    options = Settings().engine_options()
+    assert options["echo"] is False
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["prepared_statement_cache_size"] == 100
+    assert options["query_cache_size"] == 500
+
+
+def test_pgbouncer_profile_uses_unnamed_statement_cache():
+    profile = Settings()
+    profile.DB_PGBOUNCER = True
+    connect_args = profile.engine_options()["connect_args"]
+    assert connect_args["prepared_statement_cache_size"] == 0
+    assert connect_args["statement_cache_size"] == 0
+    names = {connect_args["prepared_statement_name_func"]() for _ in range(2)}
+    assert len(names) == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_status_tracks_checkouts_and_timeouts(tmp_path):
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        {"poolclass": TimedQueuePool, "pool_size": 1, "max_overflow": 0, "pool_timeout": 0.05},
+    )
+    try:
+        async with manager.session() as session:
+            await session.execute(text("SELECT 1"))
+            status = manager.pool_status()
+            assert (status["checked_out"], status["size"], status["max_overflow"]) == (1, 1, 0)
+
+            with pytest.raises(exc.TimeoutError):
+                async with manager.session() as other:
+                    await other.execute(text("SELECT 1"))
+
+        status = manager.pool_status()
+        assert status["checked_out"] == 0
+        assert status["checkouts"] == 2
+        assert status["timeouts"] == 1
+        assert status["wait_seconds_max"] >= 0.05
+    finally:
+        await manager.close()
+
+
+async def make_db(path, name):
+    manager = DatabaseSessionManager(f"sqlite+aiosqlite:///{path}")
+    async with manager.connect() as connection:
+        await connection.execute(text("CREATE TABLE whoami (name TEXT)"))
+        await connection.execute(text("INSERT INTO whoami VALUES (:name)"), {"name": name})
+    await manager.close()
+    return f"sqlite+aiosqlite:///{path}"
+
+
+async def read_name(manager):
+    async with manager.read_session() as session:
+        return await session.scalar(text("SELECT name FROM whoami"))
+
+
+@pytest.mark.asyncio
+async def test_reads_are_spread_over_replicas(tmp_path):
+    primary = await make_db(tmp_path / "primary.db", "primary")
+    replicas = [await make_db(tmp_path / f"replica{index}.db", f"replica{index}") for index in range(2)]
+    manager = DatabaseSessionManager(primary, replica_hosts=replicas)
+    try:
+        names = [await read_name(manager) for _ in range(4)]
+        assert sorted(names) == ["replica0", "replica0", "replica1", "replica1"]
+
+        async with manager.session() as session:
+            assert await session.scalar(text("SELECT name FROM whoami")) == "primary"
+    finally:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_least_loaded_prefers_idle_replica(tmp_path):
+    primary = await make_db(tmp_path / "primary.db", "primary")
+    replicas = [await make_db(tmp_path / f"replica{index}.db", f"replica{index}") for index in range(2)]
+    manager = DatabaseSessionManager(primary, replica_hosts=replicas, replica_strategy="least_loaded")
+    try:
+        async with manager.read_session() as busy:
+            busy_name = await busy.scalar(text("SELECT name FROM whoami"))
+            assert await read_name(manager) != busy_name
+    finally:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_primary(tmp_path):
+    primary = await make_db(tmp_path / "primary.db", "primary")
+    broken = f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    manager = DatabaseSessionManager(primary, replica_hosts=[broken], replica_retry_seconds=60)
+    try:
+        assert await read_name(manager) == "primary"
+        assert manager.pool_status()["replicas"][0]["healthy"] is False
+
+        await manager.check_replicas()
+        assert manager.pool_status()["replicas"][0]["healthy"] is False
+    finally:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_read_session_checks_out_lazily_and_busy_replica_stays_up(tmp_path):
+    primary = await make_db(tmp_path / "primary.db", "primary")
+    replica = await make_db(tmp_path / "replica.db", "replica")
+    manager = DatabaseSessionManager(
+        primary,
+        {"poolclass": TimedQueuePool, "pool_size": 1, "max_overflow": 0, "pool_timeout": 0.05},
+        replica_hosts=[replica],
+    )
+    try:
+        # Opened but never queried, as for a request rejected by admission.
+        async with manager.read_session():
+            pass
+        assert manager.pool_status()["replicas"][0]["checkouts"] == 0
+
+        async with manager.read_session() as busy:
+            assert await busy.scalar(text("SELECT name FROM whoami")) == "replica"
+            # The replica's only connection is taken: the read goes to the
+            # primary, and the replica is not marked down.
+            assert await read_name(manager) == "primary"
+            assert manager.pool_status()["replicas"][0]["healthy"] is True
+    finally:
+        await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_is_created_on_first_use_and_warmed_up(tmp_path):
+    manager = DatabaseSessionManager(
+        f"sqlite+aiosqlite:///{tmp_path / 'lazy.db'}",
+        {"poolclass": TimedQueuePool, "pool_size": 2, "max_overflow": 0},
+    )
+    assert manager._engine is None
+    await manager.close()
+
+    try:
+        await manager.warm_up(5)
+        status = manager.pool_status()
+        assert status["checkouts"] == 2
+        assert (status["checked_in"], status["checked_out"]) == (2, 0)
+    finally:
+        await manager.close()
+    assert manager._engine is None
+
+    async with manager.session() as session:
+        assert await session.scalar(text("SELECT 1")) == 1
+    await manager.close()
@@ -0,0 +1,35 @@
+import csv
+import io
+import json
+
+
+def test_export_ndjson(client, auth_headers, create_items):
+    create_items("Item 1", "Item 2", "Item 3")
+
+    response = client.get("/items/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == ["Item 1", "Item 2", "Item 3"]
+    assert set(rows[0]) == {"id", "name", "description", "category", "quantity", "price", "version", "updated_at"}
+
+
+def test_export_csv(client, auth_headers, create_items):
+    create_items("Item 1", "Item 2")
+
+    response = client.get("/items/export", params={"format": "csv"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["name"] for row in rows] == ["Item 1", "Item 2"]
+
+
+def test_export_empty_table_csv_has_header(client, auth_headers):
+    response = client.get("/items/export", params={"format": "csv"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.text.strip() == "id,name,description,category,quantity,price,version,updated_at"
+
+
+def test_export_rejects_unknown_format(client, auth_headers):
+    response = client.get("/items/export", params={"format": "xml"}, headers=auth_headers)
+    assert response.status_code == 422
@@ -0,0 +1,168 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from app.core.config import settings
+from app.crud import jobs
+
+
+async def run_queued(session_factory, chunk_size=settings.JOBS_CHUNK_SIZE):
+    while True:
+        async with session_factory() as db:
+            job = await jobs.claim_job(db)
+        if job is None:
+            return
+        await jobs.process_job(session_factory, job, chunk_size)
+
+
+def test_price_change_job(client, admin_headers, auth_headers, create_items, session_factory):
+    create_items("Deck", "Blade", category="Cyberware", price=100)
+    # 1.125 rounds back to 1: left alone
+    create_items("Chip", category="Cyberware", price=1)
+    visor, = create_items("Visor", category="Apparel", price=100)
+
+    body = {"percent": 12.5, "category": "Cyberware"}
+    assert client.post("/jobs/price-change", json=body, headers=auth_headers).status_code == 403
+    response = client.post("/jobs/price-change", json=body, headers=admin_headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert response.headers["Location"] == f"/jobs/{job['id']}"
+    assert (job["status"], job["processed"], job["progress"]) == ("queued", 0, None)
+
+    asyncio.run(run_queued(session_factory, chunk_size=1))
+
+    job = client.get(f"/jobs/{job['id']}", headers=admin_headers).json()
+    assert (job["status"], job["total"], job["processed"], job["progress"]) == ("succeeded", 3, 3, 1.0)
+    assert job["eta_seconds"] is None
+    items = client.get("/items", params={"sort": "name"}, headers=auth_headers).json()
+    # 112.5 rounds half away from zero, as on Postgres through numeric.
+    assert [(item["name"], item["price"], item["version"]) for item in items] == [
+        ("Blade", 113, 2), ("Chip", 1, 1), ("Deck", 113, 2), ("Visor", 100, 1),
+    ]
+    assert client.get("/jobs/999", headers=admin_headers).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_stale_job_resumes_after_its_cursor(db_engine, session_factory, create_items):
+    first, second, third = await asyncio.to_thread(create_items, "A", "B", "C", category="Old")
+    async with session_factory() as db:
+        job = await jobs.create_job(db, "recategorize", {"from_category": "Old", "to_category": "New"}, "admin")
+    async with session_factory() as db:
+        claimed = await jobs.claim_job(db)
+    async with session_factory() as db:
+        await jobs.run_chunk(db, claimed, 0, chunk_size=1)
+
+    # A running job with a fresh heartbeat belongs to its worker.
+    async with session_factory() as db:
+        assert await jobs.claim_job(db) is None
+
+    # The worker died; once the heartbeat is stale the job is taken over and
+    # continues after the first item.
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.JOBS_STALE_SECONDS + 60)
+    async with db_engine.begin() as connection:
+        await connection.execute(text("UPDATE jobs SET heartbeat_at = :stale"), {"stale": stale})
+    async with session_factory() as db:
+        resumed = await jobs.claim_job(db)
+    assert (resumed.id, resumed.cursor, resumed.processed) == (job["id"], first["id"], 1)
+    await jobs.process_job(session_factory, resumed)
+
+    async with session_factory() as db:
+        report = await jobs.get_job(db, job["id"])
+    assert (report["status"], report["processed"], report["total"]) == ("succeeded", 3, 3)
+    async with db_engine.connect() as connection:
+        rows = dict((await connection.execute(text("SELECT name, version FROM items WHERE category = 'New'"))).all())
+    assert rows == {"A": 2, "B": 2, "C": 2}
+
+
+@pytest.mark.asyncio
+async def test_runner_picks_up_queued_jobs(session_factory, create_items):
+    await asyncio.to_thread(create_items, "A", category="Old")
+    runner = asyncio.create_task(jobs.run_jobs(session_factory, concurrency=2, poll_seconds=60))
+    try:
+        async with session_factory() as db:
+            job = await jobs.create_job(db, "recategorize", {"from_category": "Old", "to_category": "New"}, "admin")
+        for _ in range(100):
+            async with session_factory() as db:
+                report = await jobs.get_job(db, job["id"])
+            if report["status"] == jobs.SUCCEEDED:
+                break
+            await asyncio.sleep(0.01)
+        assert report["status"] == jobs.SUCCEEDED
+    finally:
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_stopping_hands_the_job_back(session_factory, create_items):
+    await asyncio.to_thread(create_items, "A", "B", category="Old")
+    async with session_factory() as db:
+        job = await jobs.create_job(db, "recategorize", {"from_category": "Old", "to_category": "New"}, "admin")
+    async with session_factory() as db:
+        claimed = await jobs.claim_job(db)
+
+    stopping = asyncio.Event()
+    stopping.set()
+    await jobs.process_job(session_factory, claimed, stopping=stopping)
+
+    async with session_factory() as db:
+        assert (await jobs.get_job(db, job["id"]))["status"] == jobs.QUEUED
+        assert (await jobs.claim_job(db)).id == job["id"]
+
+
+class Deadlock(Exception):
+    sqlstate = "40P01"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error, retried, status", [
+    (OperationalError("UPDATE", {}, Exception("connection lost")), True, jobs.SUCCEEDED),
+    (DBAPIError("UPDATE", {}, Deadlock()), True, jobs.SUCCEEDED),
+    (DBAPIError("UPDATE", {}, Exception("constraint")), False, jobs.FAILED),
+])
+async def test_transient_errors_are_retried(session_factory, create_items, monkeypatch, error, retried, status):
+    monkeypatch.setattr(settings, "JOBS_RETRY_SECONDS", 0)
+    await asyncio.to_thread(create_items, "A", category="Old")
+    async with session_factory() as db:
+        job = await jobs.create_job(db, "recategorize", {"from_category": "Old", "to_category": "New"}, "admin")
+    async with session_factory() as db:
+        claimed = await jobs.claim_job(db)
+
+    calls = []
+    run_chunk = jobs.run_chunk
+
+    async def failing_once(*args):
+        calls.append(1)
+        if len(calls) == 1:
+            raise error
+        return await run_chunk(*args)
+
+    monkeypatch.setattr(jobs, "run_chunk", failing_once)
+    await jobs.process_job(session_factory, claimed)
+
+    async with session_factory() as db:
+        report = await jobs.get_job(db, job["id"])
+    assert report["status"] == status
+    assert (len(calls) > 1) == retried
+
+
+def test_report_throughput_and_eta():
+    started = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    job = SimpleNamespace(
+        id=1, kind="price_change", params={}, status="running", cursor=400, total=1000, processed=400, error=None,
+        created_by="admin", created_at=started, started_at=started, heartbeat_at=None, finished_at=None,
+    )
+    report = jobs.job_report(job, now=started + timedelta(seconds=20))
+    assert (report["progress"], report["rows_per_second"], report["eta_seconds"]) == (0.4, 20.0, 30.0)
+
+
+def test_concurrency_is_a_share_of_the_pool(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+    assert jobs.jobs_concurrency(0.2) == 3
+    assert jobs.jobs_concurrency(0.01) == 1
+    assert jobs.jobs_concurrency(0) == 0
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from app.core.ingest import iter_csv_records, iter_ndjson_records
+from app.crud.item import create_item
+from app.db.loader import load_items
+from app.schemas.item import ItemCreate
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.asyncio
+async def test_csv_records_handle_quoted_newlines():
+    source = chunks(b'name,description\r\n"Deck","multi\nline, ', b'text"\r\nPlain,x\r\n')
+    records = [record async for record in iter_csv_records(source)]
+    assert records == [{"name": "Deck", "description": "multi\nline, text"}, {"name": "Plain", "description": "x"}]
+
+
+@pytest.mark.asyncio
+async def test_load_merges_and_reports(db_engine, session_factory):
+    async with session_factory() as db:
+        await create_item(db, ItemCreate(name="Existing", description="d", category="c", quantity=1, price=2))
+    lines = [
+        {"name": "Existing", "description": "d", "category": "c", "quantity": 9, "price": 2},
+        {"name": "New", "description": "d", "category": "c", "quantity": 1, "price": 2},
+        {"name": "New", "description": "d", "category": "c", "quantity": 3, "price": 2},
+        {"name": "Bad", "description": "d", "category": "c", "quantity": "lots", "price": 2},
+    ]
+    payload = "\n".join(json.dumps(line) for line in lines).encode()
+    progress = []
+    report = await load_items(
+        iter_ndjson_records(chunks(payload)), connect=db_engine.begin, chunk_size=2, progress=progress.append,
+    )
+
+    assert (report["received"], report["loaded"], report["rejected"]) == (4, 3, 1)
+    assert (report["inserted"], report["updated"], report["duplicates"]) == (1, 1, 1)
+    assert report["rejects"][0]["record"] == 4
+    assert len(progress) == 3
+
+    async with db_engine.connect() as connection:
+        rows = dict((await connection.exec_driver_sql("SELECT name, quantity FROM items")).all())
+    assert rows == {"Existing": 9, "New": 3}
+
+    # One changelog entry per merged item, after the one create_item wrote.
+    async with db_engine.connect() as connection:
+        logged = (await connection.exec_driver_sql("SELECT op, data FROM item_changes ORDER BY seq")).all()
+    assert sorted((op, json.loads(data)["name"], json.loads(data)["quantity"]) for op, data in logged[1:]) == [
+        ("upsert", "Existing", 9), ("upsert", "New", 3),
+    ]
+
+
+def test_admin_load_endpoint(client, admin_headers, auth_headers):
+    body = "name,description,category,quantity,price\nDeck,d,c,2,5\nChip,d,c,x,5\n"
+
+    response = client.post("/admin/items/load", params={"format": "csv"}, content=body, headers=admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["inserted"], data["rejected"]) == (1, 1)
+
+    response = client.post("/admin/items/load", params={"format": "csv"}, content=body, headers=auth_headers)
+    assert response.status_code == 403
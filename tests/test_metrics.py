@@ -0,0 +1,63 @@
+import asyncio
+import logging
+
+from app.core import metrics
+from app.core.config import settings
+from app.crud import item as crud
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1))
+    histogram.observe(0.05, route="/items")
+    histogram.observe(0.5, route="/items")
+    histogram.observe(5, route="/items")
+
+    lines = histogram.render().splitlines()
+    assert lines[:2] == ["# HELP latency_seconds Latency.", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{route="/items",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/items",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{route="/items",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/items"} 5.55' in lines
+    assert 'latency_seconds_count{route="/items"} 3' in lines
+
+
+def test_request_metrics_count_statements_per_route(client, auth_headers, create_items):
+    item = create_items("Item 1")[0]
+    before = metrics.REQUEST_DB_STATEMENTS._values.get(("GET", "/items/{item_id}"), [None, 0.0, 0])[1]
+
+    client.get(f"/items/{item['id']}", headers=auth_headers)
+
+    _, statements, count = metrics.REQUEST_DB_STATEMENTS._values[("GET", "/items/{item_id}")]
+    assert statements - before >= 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}",status="200"}' in response.text
+    assert "db_statements_total" in response.text
+    assert 'cache_misses_total{cache="items"}' in response.text
+
+
+def test_slow_queries_are_logged(client, auth_headers, create_items, monkeypatch, caplog):
+    create_items("Item 1")
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        client.get("/items", headers=auth_headers)
+
+    assert any("slow query" in record.message and "GET /items" in record.message for record in caplog.records)
+
+
+def test_hot_item_statements_hit_the_compiled_cache(session_factory, create_items, item_cache):
+    items = create_items("Item 1", "Item 2", "Item 3")
+
+    async def read_all():
+        async with session_factory() as db:
+            for item in items:
+                await item_cache.clear()
+                await crud.get_item(db, item["id"])
+
+    hits = metrics.DB_COMPILED_CACHE._values.get(("hit",), 0)
+    asyncio.run(read_all())
+    # The first lookup may compile; the rest reuse the prebuilt statement.
+    assert metrics.DB_COMPILED_CACHE._values[("hit",)] - hits >= len(items) - 1
@@ -0,0 +1,53 @@
+def test_update_bumps_version_and_returns_etag(client, auth_headers, create_items):
+    item = create_items("Deck")[0]
+    assert item["version"] == 1
+
+    response = client.put(f"/items/{item['id']}", data={"quantity": 3}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.json()["name"] == "Deck"
+    assert response.headers["ETag"] == '"2"'
+
+
+def test_update_with_stale_if_match_is_rejected(client, auth_headers, create_items):
+    item = create_items("Deck")[0]
+    url = f"/items/{item['id']}"
+
+    response = client.put(url, data={"quantity": 3}, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 200
+
+    response = client.put(url, data={"quantity": 4}, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 412
+    assert client.get(url, headers=auth_headers).json()["quantity"] == 3
+
+    response = client.put(url, data={"quantity": 4}, headers={**auth_headers, "If-Match": "*"})
+    assert response.status_code == 200
+
+
+def test_update_missing_item_and_duplicate_name(client, auth_headers, create_items):
+    first, second = create_items("Deck", "Chip")
+
+    response = client.put("/items/999", data={"quantity": 1}, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 404
+
+    response = client.put(f"/items/{second['id']}", data={"name": "Deck"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_delete_with_if_match(client, auth_headers, create_items):
+    item = create_items("Deck")[0]
+    url = f"/items/{item['id']}"
+
+    assert client.delete(url, headers={**auth_headers, "If-Match": '"7"'}).status_code == 412
+    response = client.delete(url, headers={**auth_headers, "If-Match": '"1"'})
+    assert response.status_code == 200
+    assert response.json()["name"] == "Deck"
+    assert client.delete(url, headers=auth_headers).status_code == 404
+
+
+def test_bulk_upsert_bumps_version(client, auth_headers, create_items):
+    item = create_items("Deck")[0]
+    payload = [{"name": "Deck", "description": "d", "category": "c", "quantity": 9, "price": 1}]
+
+    client.post("/items/bulk", json=payload, headers=auth_headers)
+    assert client.get(f"/items/{item['id']}", headers=auth_headers).json()["version"] == 2
@@ -0,0 +1,79 @@
+import pytest
+
+from app.core.pagination import encode_cursor
+from app.crud import queries
+
+
+@pytest.fixture
+def items(create_items):
+    create_items(*(f"Item {index}" for index in range(6, -1, -1)))
+
+
+def walk(client, headers, sort, limit=3):
+    pages = []
+    response = client.get("/items", params={"limit": limit, "sort": sort}, headers=headers)
+    while True:
+        assert response.status_code == 200
+        pages.append([item["name"] for item in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages, response
+        response = client.get(
+            "/items", params={"limit": limit, "sort": sort, "cursor": cursor}, headers=headers
+        )
+
+
+def test_cursor_walk_by_id(client, auth_headers, items):
+    pages, last = walk(client, auth_headers, "id")
+    assert pages == [["Item 6", "Item 5", "Item 4"], ["Item 3", "Item 2", "Item 1"], ["Item 0"]]
+
+    response = client.get(
+        "/items", params={"limit": 3, "cursor": last.headers["X-Prev-Cursor"]}, headers=auth_headers
+    )
+    assert [item["name"] for item in response.json()] == ["Item 3", "Item 2", "Item 1"]
+    assert "X-Next-Cursor" in response.headers
+    assert "X-Prev-Cursor" in response.headers
+
+
+def test_cursor_walk_by_name_descending(client, auth_headers, items):
+    pages, _ = walk(client, auth_headers, "-name", limit=4)
+    assert pages == [["Item 6", "Item 5", "Item 4", "Item 3"], ["Item 2", "Item 1", "Item 0"]]
+
+
+def test_offset_mode_is_ordered_and_returns_cursor(client, auth_headers, items):
+    response = client.get("/items", params={"limit": 2, "offset": 2}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()] == ["Item 4", "Item 3"]
+
+    response = client.get(
+        "/items", params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]}, headers=auth_headers
+    )
+    assert [item["name"] for item in response.json()] == ["Item 2", "Item 1"]
+
+
+def test_invalid_cursor(client, auth_headers, items):
+    response = client.get("/items", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
+
+    first = client.get("/items", params={"limit": 2}, headers=auth_headers)
+    response = client.get(
+        "/items", params={"sort": "name", "cursor": first.headers["X-Next-Cursor"]}, headers=auth_headers
+    )
+    assert response.status_code == 400
+
+    # Well-formed cursors whose values don't fit the sort column.
+    for sort, values in [
+        ("id", ["x", {"a": 1}]), ("id", [None, 1]), ("id", [1, True]), ("name", ["Item 1", "2"]), ("name", [3, 1]),
+    ]:
+        cursor = encode_cursor(sort, values)
+        response = client.get("/items", params={"sort": sort, "cursor": cursor}, headers=auth_headers)
+        assert response.status_code == 400, (sort, values)
+    cursor = encode_cursor("name", [None, 1])
+    assert client.get("/items", params={"sort": "name", "cursor": cursor}, headers=auth_headers).status_code != 400
+
+
+def test_unsupported_sort(client, auth_headers, items):
+    for sort in ("--id", "---name", "price", "-"):
+        for params in ({"sort": sort}, {"sort": sort, "offset": 0}):
+            assert client.get("/items", params=params, headers=auth_headers).status_code == 400, params
+    assert queries.items_page.cache_info().maxsize == len(queries.SORT_ORDERS)
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.ingest import iter_ndjson_records
+from app.crud.item import upsert_items
+from app.crud.queries import item_names
+from app.db.loader import load_items
+from app.schemas.item import ItemCreate
+
+# SQLite stand-in for the registry trigger migration a7d3e5f9c182 installs on
+# Postgres.
+SQLITE_REGISTRY_TRIGGERS = [
+    "CREATE TRIGGER item_names_insert AFTER INSERT ON items WHEN NEW.name IS NOT NULL "
+    "BEGIN INSERT INTO item_names (name, item_id) VALUES (NEW.name, NEW.id); END",
+    "CREATE TRIGGER item_names_update AFTER UPDATE OF name ON items "
+    "BEGIN DELETE FROM item_names WHERE name = OLD.name; "
+    "INSERT INTO item_names (name, item_id) VALUES (NEW.name, NEW.id); END",
+    "CREATE TRIGGER item_names_delete AFTER DELETE ON items "
+    "BEGIN DELETE FROM item_names WHERE name = OLD.name; END",
+]
+
+
+@pytest.fixture
+def partitioned(db_engine, monkeypatch):
+    async def create():
+        async with db_engine.begin() as connection:
+            await connection.run_sync(item_names.create)
+            for statement in SQLITE_REGISTRY_TRIGGERS:
+                await connection.exec_driver_sql(statement)
+
+    asyncio.run(create())
+    monkeypatch.setattr(settings, "ITEMS_PARTITIONED", True)
+
+
+async def registry(db_engine):
+    async with db_engine.connect() as connection:
+        return dict((await connection.exec_driver_sql("SELECT name, item_id FROM item_names")).all())
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def item(name, quantity=1):
+    return ItemCreate(name=name, description="d", category="c", quantity=quantity, price=2)
+
+
+@pytest.mark.asyncio
+async def test_upsert_goes_through_registry(partitioned, db_engine, session_factory):
+    async with session_factory() as db:
+        first = await upsert_items(db, [item("Deck"), item("Blade")])
+    assert [outcome["status"] for outcome in first] == ["inserted", "inserted"]
+
+    async with session_factory() as db:
+        second = await upsert_items(db, [item("Blade", quantity=7), item("Visor")])
+    assert [outcome["status"] for outcome in second] == ["updated", "inserted"]
+    assert second[0]["id"] == first[1]["id"]
+
+    async with session_factory() as db:
+        skipped = await upsert_items(db, [item("Deck", quantity=9)], on_conflict="nothing")
+    assert skipped == [{"name": "Deck", "id": None, "status": "skipped"}]
+
+    assert await registry(db_engine) == {"Deck": first[0]["id"], "Blade": first[1]["id"], "Visor": second[1]["id"]}
+    async with db_engine.connect() as connection:
+        rows = dict((await connection.exec_driver_sql("SELECT name, version FROM items")).all())
+    assert rows == {"Deck": 1, "Blade": 2, "Visor": 1}
+
+
+def test_create_and_rename_keep_names_unique(partitioned, client, auth_headers, create_items, db_engine):
+    deck, = create_items("Deck")
+
+    payload = {"name": "Deck", "description": "d", "category": "c", "quantity": 1, "price": 1}
+    assert client.post("/items", data=payload, headers=auth_headers).status_code == 400
+
+    client.put(f"/items/{deck['id']}", data={"name": "Cyberdeck"}, headers=auth_headers)
+    assert asyncio.run(registry(db_engine)) == {"Cyberdeck": deck["id"]}
+    assert client.post("/items", data=payload, headers=auth_headers).status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_load_merges_through_registry(partitioned, db_engine, session_factory):
+    async with session_factory() as db:
+        await upsert_items(db, [item("Existing")])
+    lines = [
+        {"name": "Existing", "description": "d", "category": "c", "quantity": 9, "price": 2},
+        {"name": "New", "description": "d", "category": "c", "quantity": 1, "price": 2},
+        {"name": "New", "description": "d", "category": "c", "quantity": 3, "price": 2},
+    ]
+    payload = "\n".join(json.dumps(line) for line in lines).encode()
+    report = await load_items(iter_ndjson_records(chunks(payload)), connect=db_engine.begin)
+
+    assert (report["inserted"], report["updated"], report["duplicates"]) == (1, 1, 1)
+    async with db_engine.connect() as connection:
+        rows = {
+            name: (quantity, version) for name, quantity, version in
+            (await connection.exec_driver_sql("SELECT name, quantity, version FROM items")).all()
+        }
+    assert rows == {"Existing": (9, 2), "New": (3, 1)}
+    assert set(await registry(db_engine)) == {"Existing", "New"}
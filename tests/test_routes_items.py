@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
@@ -6,7 +8,7 @@ from app.main import app  # Import your FastAPI app
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemUpdate
 from app.crud.item import create_item, get_item, get_items, update_item, delete_item
-from app.db.database import get_db_session, Base
+from app.db.database import get_db_session, get_read_db_session, Base
 
 # Define an SQLite in-memory database for testing
 DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -24,6 +26,7 @@ async def override_get_db():
 
 
 app.dependency_overrides[get_db_session] = override_get_db
+app.dependency_overrides[get_read_db_session] = override_get_db
 
 
 # Initialize the database
@@ -34,6 +37,13 @@ def setup_db():
     Base.metadata.drop_all(bind=engine)
 
 
+# Close the module's engine, so its aiosqlite thread doesn't outlive the run
+@pytest.fixture(scope="module", autouse=True)
+def dispose_engine():
+    yield
+    asyncio.run(engine.dispose())
+
+
 # Initialize the TestClient
 client = TestClient(app)
 
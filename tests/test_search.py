@@ -0,0 +1,46 @@
+import pytest
+
+
+@pytest.fixture
+def catalog(create_items):
+    create_items("Mantis Blades", description="Arm-mounted blades", category="Cyberware", quantity=2, price=500)
+    create_items("Gorilla Arms", description="Heavy arm implants", category="Cyberware", quantity=0, price=800)
+    create_items("Kiroshi Optics", description="Eye implants 100% zoom", category="Optics", quantity=4, price=300)
+    create_items("Unity Pistol", description="Reliable sidearm", category="Weapons", quantity=9, price=50)
+
+
+def search(client, headers, **params):
+    response = client.get("/items/search", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_text_search_matches_name_and_description(client, auth_headers, catalog):
+    data = search(client, auth_headers, q="arm")
+    assert {item["name"] for item in data["items"]} == {"Mantis Blades", "Gorilla Arms", "Unity Pistol"}
+    assert data["total"] == 3
+
+    data = search(client, auth_headers, q="arm implants")
+    assert [item["name"] for item in data["items"]] == ["Gorilla Arms"]
+
+    assert search(client, auth_headers, q="100%")["total"] == 1
+    assert search(client, auth_headers, q="1_0")["total"] == 0
+
+
+def test_filters_and_facets(client, auth_headers, catalog):
+    data = search(client, auth_headers, category="Cyberware", in_stock=True)
+    assert [item["name"] for item in data["items"]] == ["Mantis Blades"]
+    assert data["total"] == 1
+    assert data["facets"]["category"] == [
+        {"value": "Cyberware", "count": 1},
+        {"value": "Optics", "count": 1},
+        {"value": "Weapons", "count": 1},
+    ]
+
+    data = search(client, auth_headers, min_price=100, max_price=600)
+    assert {item["name"] for item in data["items"]} == {"Mantis Blades", "Kiroshi Optics"}
+
+
+def test_search_without_matches(client, auth_headers, catalog):
+    data = search(client, auth_headers, q="netrunner")
+    assert data == {"total": 0, "items": [], "facets": {"category": []}}
@@ -0,0 +1,33 @@
+import pytest
+
+from app.core.config import settings
+
+
+def test_trusted_pages_match_validated_pages_byte_for_byte(client, auth_headers, create_items, monkeypatch):
+    create_items("Item 1", "Item 2", "Item 3")
+    bodies = {}
+    for trusted in (False, True):
+        monkeypatch.setattr(settings, "ITEM_TRUSTED_SERIALIZATION", trusted)
+        response = client.get("/items", params={"sort": "name"}, headers=auth_headers)
+        bodies[trusted] = response.content
+    assert bodies[True] == bodies[False]
+    assert b'"price":10,' in bodies[True]
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_item_pages_serialize_the_same_either_way(client, auth_headers, create_items, monkeypatch, trusted):
+    create_items("Item 1", "Item 2", "Item 3")
+    monkeypatch.setattr(settings, "ITEM_TRUSTED_SERIALIZATION", trusted)
+
+    response = client.get("/items", params={"limit": 2}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert [item["name"] for item in response.json()] == ["Item 1", "Item 2"]
+    assert set(response.json()[0]) == {"id", "name", "description", "category", "quantity", "price", "version", "updated_at"}
+    assert "X-Next-Cursor" in response.headers
+
+    response = client.get(
+        "/items", params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]}, headers=auth_headers
+    )
+    assert [item["name"] for item in response.json()] == ["Item 3"]
+    assert "X-Prev-Cursor" in response.headers
@@ -0,0 +1,63 @@
+import os
+
+from app import server
+
+
+def test_worker_count_follows_cpu_affinity(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1, 2}, raising=False)
+    monkeypatch.setattr(server, "cpu_quota", lambda: None)
+    assert server.worker_count(0) == 3
+    assert server.worker_count(2) == 2
+
+
+def test_worker_count_without_affinity(monkeypatch):
+    monkeypatch.delattr(os, "sched_getaffinity", raising=False)
+    monkeypatch.setattr(os, "cpu_count", lambda: 6)
+    monkeypatch.setattr(server, "cpu_quota", lambda: None)
+    assert server.worker_count(0) == 6
+
+
+def test_worker_count_follows_cpu_quota(monkeypatch):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(64)), raising=False)
+    monkeypatch.setattr(server, "cpu_quota", lambda: 2)
+    assert server.worker_count(0) == 2
+
+
+def test_cpu_quota_from_cgroup_files(tmp_path):
+    missing = str(tmp_path / "missing")
+    cpu_max = tmp_path / "cpu.max"
+    quota, period = tmp_path / "cfs_quota_us", tmp_path / "cfs_period_us"
+
+    cpu_max.write_text("150000 100000\n")
+    assert server.cpu_quota(str(cpu_max), (missing, missing)) == 2
+    cpu_max.write_text("max 100000\n")
+    assert server.cpu_quota(str(cpu_max), (missing, missing)) is None
+
+    quota.write_text("50000\n")
+    period.write_text("100000\n")
+    assert server.cpu_quota(missing, (str(quota), str(period))) == 1
+    quota.write_text("-1\n")
+    assert server.cpu_quota(missing, (str(quota), str(period))) is None
+    assert server.cpu_quota(missing, (missing, missing)) is None
+
+
+def test_memory_cache_is_disabled_across_workers():
+    assert server.item_cache_backend(1, "memory") == "memory"
+    assert server.item_cache_backend(4, "memory") == "none"
+    assert server.item_cache_backend(4, "redis") == "redis"
+
+
+def test_main_runs_app_by_import_path(monkeypatch):
+    calls = []
+    monkeypatch.setattr(server.uvicorn, "run", lambda app, **options: calls.append((app, options)))
+    monkeypatch.setattr(server, "worker_count", lambda: 4)
+    monkeypatch.setattr(server.settings, "ITEM_CACHE_BACKEND", "memory")
+    monkeypatch.delenv("ITEM_CACHE_BACKEND", raising=False)
+    server.main()
+
+    [(app, options)] = calls
+    assert app == "app.main:app"
+    assert options["workers"] == 4
+    assert options["timeout_graceful_shutdown"] == server.settings.GRACEFUL_SHUTDOWN_SECONDS
+    # Read by the spawned workers.
+    assert os.environ["ITEM_CACHE_BACKEND"] == "none"
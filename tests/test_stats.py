@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+
+from app.crud.stats import rebuild_category_stats
+
+
+def test_stats_follow_every_write(client, auth_headers, create_items):
+    deck, blade = create_items("Deck", "Blade", category="Cyberware", quantity=2, price=10)
+    create_items("Jacket", category="Apparel", quantity=1, price=50)
+
+    client.put(f"/items/{blade['id']}", data={"price": 30, "quantity": 4}, headers=auth_headers)
+    client.post(f"/items/{deck['id']}/adjust", json={"delta": 3}, headers=auth_headers)
+    client.post("/items/bulk", json=[{
+        "name": "Visor", "description": "d", "category": "Apparel", "quantity": 5, "price": 20,
+    }], headers=auth_headers)
+
+    response = client.get("/items/stats", headers=auth_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["categories"] == [
+        {
+            "category": "Apparel", "item_count": 2, "total_quantity": 6, "total_value": 150.0,
+            "min_price": 20.0, "max_price": 50.0, "avg_price": 35.0,
+        },
+        {
+            "category": "Cyberware", "item_count": 2, "total_quantity": 9, "total_value": 170.0,
+            "min_price": 10.0, "max_price": 30.0, "avg_price": 20.0,
+        },
+    ]
+    assert (body["item_count"], body["total_quantity"], body["total_value"]) == (4, 15, 320.0)
+
+    # Moving the cheapest item out and deleting the last one in a category.
+    client.put(f"/items/{deck['id']}", data={"category": "Apparel"}, headers=auth_headers)
+    client.delete(f"/items/{blade['id']}", headers=auth_headers)
+    categories = client.get("/items/stats", headers=auth_headers).json()["categories"]
+    assert [(c["category"], c["item_count"], c["min_price"]) for c in categories] == [("Apparel", 3, 10.0)]
+
+
+@pytest.mark.asyncio
+async def test_rebuild_repairs_drift(session_factory):
+    async with session_factory() as db:
+        await db.execute(text(
+            "INSERT INTO items (name, description, category, quantity, price) VALUES ('Deck', 'd', 'Decks', 2, 10)"
+        ))
+        await db.execute(text("UPDATE category_stats SET total_value = 999"))
+        await db.execute(text(
+            "INSERT INTO category_stats (category, item_count, total_quantity, total_value, price_sum) "
+            "VALUES ('Ghost', 1, 1, 1, 1)"
+        ))
+        await db.commit()
+
+    async with session_factory() as db:
+        assert await rebuild_category_stats(db) == {"categories": 1, "drifted": ["Decks", "Ghost"]}
+    async with session_factory() as db:
+        assert await rebuild_category_stats(db) == {"categories": 1, "drifted": []}
+
+
+def test_rebuild_endpoint_requires_admin(client, auth_headers, admin_headers):
+    assert client.post("/admin/items/stats/rebuild", headers=auth_headers).status_code == 403
+    response = client.post("/admin/items/stats/rebuild", headers=admin_headers)
+    assert response.json() == {"categories": 0, "drifted": []}
@@ -0,0 +1,67 @@
+def test_adjust_stock(client, auth_headers, create_items):
+    item = create_items("Implant", quantity=5)[0]
+
+    response = client.post(f"/items/{item['id']}/adjust", json={"delta": -3}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 2
+    assert response.json()["version"] == 2
+
+    response = client.post(f"/items/{item['id']}/adjust", json={"delta": 4}, headers=auth_headers)
+    assert response.json()["quantity"] == 6
+
+
+def test_adjust_stock_never_goes_negative(client, auth_headers, create_items):
+    item = create_items("Implant", quantity=2)[0]
+
+    response = client.post(f"/items/{item['id']}/adjust", json={"delta": -3}, headers=auth_headers)
+    assert response.status_code == 409
+
+    response = client.get(f"/items/{item['id']}", headers=auth_headers)
+    assert response.json()["quantity"] == 2
+
+    response = client.post("/items/999/adjust", json={"delta": 1}, headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_adjust_stock_invalidates_cache(client, auth_headers, create_items, item_cache):
+    item = create_items("Implant", quantity=5)[0]
+    client.get(f"/items/{item['id']}", headers=auth_headers)
+
+    client.post(f"/items/{item['id']}/adjust", json={"delta": -1}, headers=auth_headers)
+    response = client.get(f"/items/{item['id']}", headers=auth_headers)
+    assert response.json()["quantity"] == 4
+
+
+def test_batch_adjust_merges_duplicate_ids(client, auth_headers, create_items):
+    first, second = create_items("Deck", "Blade", quantity=5)
+
+    response = client.post("/items/adjust", json={"adjustments": [
+        {"item_id": second["id"], "delta": -2},
+        {"item_id": first["id"], "delta": -1},
+        {"item_id": second["id"], "delta": -2},
+    ]}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [(item["id"], item["quantity"]) for item in response.json()] == [
+        (first["id"], 4), (second["id"], 1)
+    ]
+
+
+def test_batch_adjust_is_all_or_nothing(client, auth_headers, create_items):
+    first, second = create_items("Deck", "Blade", quantity=5)
+
+    response = client.post("/items/adjust", json={"adjustments": [
+        {"item_id": first["id"], "delta": -1},
+        {"item_id": second["id"], "delta": -6},
+        {"item_id": 999, "delta": 1},
+    ]}, headers=auth_headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == [
+        {"item_id": second["id"], "reason": "insufficient_stock"},
+        {"item_id": 999, "reason": "not_found"},
+    ]
+
+    response = client.get(f"/items/{first['id']}", headers=auth_headers)
+    assert response.json()["quantity"] == 5
+
+    response = client.post("/items/adjust", json={"adjustments": []}, headers=auth_headers)
+    assert response.status_code == 422